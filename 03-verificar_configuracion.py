@@ -39,6 +39,16 @@ def verificar_librerias():
             print(f'   ❌ {libreria:20} - NO INSTALADA ({descripcion})')
             todas_ok = False
     
+    opcionales = {
+        'pyarrow': 'Caché Parquet del archivo de inscritos'
+    }
+    for libreria, descripcion in opcionales.items():
+        try:
+            __import__(libreria)
+            print(f'   ✅ {libreria:20} - OK ({descripcion})')
+        except ImportError:
+            print(f'   ⚠️  {libreria:20} - NO INSTALADA, opcional ({descripcion})')
+    
     return todas_ok
 
 def verificar_firefox():
@@ -77,10 +87,8 @@ def verificar_archivo_excel():
         
         # Intentar leerlo
         try:
-            import pandas as pd
-            df = pd.read_excel(ruta, skiprows=3)
-            df.columns = df.iloc[0]
-            df = df[1:].reset_index(drop=True)
+            from estudiantes_icfes import tabla_inscritos
+            df = tabla_inscritos(ruta)
             print(f'   ✅ Archivo legible - {len(df)} estudiantes encontrados')
             return True
         except Exception as e:
@@ -5,31 +5,63 @@ Autor: Automatización ICFES
 Fecha: 2025-10-14
 """
 
-import pandas as pd
 import time
 import os
+from contextlib import nullcontext
+import base64
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from selenium import webdriver
+from urllib.parse import urlparse
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.firefox.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.firefox import GeckoDriverManager
+from esperas_icfes import EsperasICFES, XPATH_BOTON_IMPRIMIR
+from descargas_firefox import archivos_en_carpeta, esperar_descarga_completa
+from telemetria_icfes import Telemetria
+from pool_navegadores import (PoolNavegadores, ConsolaOperador, crear_driver_firefox,
+                              RECICLAR_CADA_POR_DEFECTO)
+from estudiantes_icfes import cargar_estudiantes
+from estado_descargas import (EstadoDescargas, pdf_completo,
+                              ESTADO_EXITOSO, ESTADO_SIN_RESULTADOS, ESTADO_ERROR)
 
 # Configuración
-EXCEL_PATH = '/home/proyectos/Escritorio/Resultados-ICFES-2025/INSCRITOS_EXAMEN SABER 11 (36).xls'
-URL_ICFES = 'http://resultadossaber11.icfes.edu.co/'
+EXCEL_PATH = os.environ.get(
+    'ICFES_INSCRITOS', '/home/proyectos/Escritorio/Resultados-ICFES-2025/INSCRITOS_EXAMEN SABER 11 (36).xls')
+# ICFES_URL permite apuntar al sitio simulado (sitio_simulado_icfes.py)
+URL_ICFES = os.environ.get('ICFES_URL', 'http://resultadossaber11.icfes.edu.co/')
 CARPETA_PDFS = 'pdfs_descargados'
 CARPETA_LOGS = 'logs'
-DELAY_ENTRE_ESTUDIANTES = 3  # segundos
+ARCHIVO_ESTADO = os.path.join(CARPETA_LOGS, 'estado_descargas.jsonl')
+DELAY_ENTRE_ESTUDIANTES = 0  # segundos (las esperas por eventos ya garantizan el login listo)
+# 'imprimir' = re-renderizar la página con print_page (por defecto: en el portal real
+#              "Imprimir PDF" abre el diálogo de impresión y no descarga nada)
+# 'descarga' = intentar primero el PDF original del botón "Imprimir PDF" vía la
+#              carpeta de descargas de Firefox (print_page queda de respaldo)
+MODO_CAPTURA_PDF = os.environ.get('ICFES_MODO_CAPTURA', 'imprimir')
+TIMEOUT_DESCARGA = 30  # segundos máximos esperando el PDF original
+# Subcarpetas de CARPETA_PDFS donde Firefox descarga: nunca se mezclan con los PDF guardados
+SUBCARPETA_DESCARGAS = '.descargas'
+SUBCARPETA_SESIONES = '.sesiones'
 
 # Crear carpetas si no existen
 os.makedirs(CARPETA_PDFS, exist_ok=True)
 os.makedirs(CARPETA_LOGS, exist_ok=True)
 
 
+def carpeta_descargas_ventana(numero_ventana=None):
+    """
+    Carpeta de descargas propia de una ventana del navegador
+
+    Es una subcarpeta de CARPETA_PDFS: así un PDF que otro hilo acaba de
+    guardar nunca se confunde con la descarga que se está esperando.
+    """
+    return os.path.abspath(os.path.join(CARPETA_PDFS, SUBCARPETA_DESCARGAS,
+                                        f'ventana_{numero_ventana or 1}'))
+
+
 class DescargadorICFES:
     """Clase para manejar la descarga de resultados del ICFES"""
     
@@ -42,6 +74,18 @@ class DescargadorICFES:
         """
         self.modo_headless = modo_headless
         self.driver = None
+        self.esperas = None
+        self.consola = None
+        self.numero_ventana = None
+        self.carpeta_descargas = None
+        self.estado = None
+        # Carpeta de salida por documento (orquestador de varios listados)
+        self.destinos = {}
+        self.ultimo_pdf = None
+        self.estudiante_actual = None
+        self.telemetria = None
+        self.medicion = None
+        self._candado = threading.Lock()
         self.estudiantes_exitosos = []
         self.estudiantes_error = []
         self.estudiantes_sin_resultados = []
@@ -49,42 +93,44 @@ class DescargadorICFES:
     def iniciar_navegador(self):
         """Inicia el navegador Firefox"""
         print('\n🌐 Iniciando navegador Firefox...')
+        if self.carpeta_descargas is None:
+            self.carpeta_descargas = carpeta_descargas_ventana(self.numero_ventana)
+        print(f'   📁 Carpeta de descargas: {self.carpeta_descargas}')
 
-        firefox_options = Options()
-        if self.modo_headless:
-            firefox_options.add_argument('--headless')
-
-        # Configurar carpeta de descargas
-        download_dir = os.path.abspath(CARPETA_PDFS)
-
-        # Configuraciones para descargar PDFs automáticamente
-        firefox_options.set_preference('browser.download.folderList', 2)
-        firefox_options.set_preference('browser.download.dir', download_dir)
-        firefox_options.set_preference('browser.download.useDownloadDir', True)
-        firefox_options.set_preference('browser.download.manager.showWhenStarting', False)
-
-        # Configurar para descargar PDFs automáticamente sin preguntar
-        firefox_options.set_preference('browser.helperApps.neverAsk.saveToDisk', 'application/pdf')
-        firefox_options.set_preference('browser.helperApps.neverAsk.openFile', 'application/pdf')
-
-        # Deshabilitar el visor de PDF integrado de Firefox
-        firefox_options.set_preference('pdfjs.disabled', True)
-
-        # Configurar para que no abra PDFs en el navegador
-        firefox_options.set_preference('browser.download.open_pdf_attachments_inline', False)
-
-        # Deshabilitar la vista previa de impresión
-        firefox_options.set_preference('print.always_print_silent', True)
-        firefox_options.set_preference('print.show_print_progress', False)
-
-        print(f'   📁 Carpeta de descargas: {download_dir}')
-
-        service = Service(GeckoDriverManager().install())
-        self.driver = webdriver.Firefox(service=service, options=firefox_options)
-        self.driver.maximize_window()
+        # Las preferencias de descarga/impresión y el geckodriver (instalado
+        # una sola vez por proceso) se comparten con el pool de navegadores
+        self.usar_driver(crear_driver_firefox(self.carpeta_descargas, self.modo_headless))
 
         print('✅ Navegador iniciado correctamente')
     
+    def usar_driver(self, driver, carpeta_descargas=None):
+        """
+        Asocia un driver ya iniciado (por ejemplo, una sesión del pool)
+        
+        Args:
+            driver: Instancia de WebDriver
+            carpeta_descargas: Carpeta de descargas configurada en ese navegador
+        """
+        self.driver = driver
+        self.esperas = EsperasICFES(driver)
+        if carpeta_descargas:
+            self.carpeta_descargas = carpeta_descargas
+    
+    def compartir_registro(self, coordinador):
+        """
+        Hace que esta instancia registre sus resultados en los del coordinador
+        
+        Se usa para los trabajadores del modo concurrente: cada uno maneja su
+        navegador, pero los logs y el diario de estado son únicos.
+        """
+        self.estado = coordinador.estado
+        self.destinos = coordinador.destinos
+        self.telemetria = coordinador.telemetria
+        self._candado = coordinador._candado
+        self.estudiantes_exitosos = coordinador.estudiantes_exitosos
+        self.estudiantes_error = coordinador.estudiantes_error
+        self.estudiantes_sin_resultados = coordinador.estudiantes_sin_resultados
+    
     def cerrar_navegador(self):
         """Cierra el navegador"""
         if self.driver:
@@ -92,77 +138,57 @@ class DescargadorICFES:
             print('\n🔒 Navegador cerrado')
     
     def leer_excel(self):
-        """Lee el archivo Excel y retorna un DataFrame con los estudiantes"""
+        """Lee el archivo Excel y retorna la lista de estudiantes (estudiantes_icfes)"""
         print(f'\n📖 Leyendo archivo Excel: {EXCEL_PATH}')
         
-        # Leer el archivo saltando las primeras 3 filas de encabezado
-        df = pd.read_excel(EXCEL_PATH, skiprows=3)
-        
-        # La primera fila contiene los nombres de las columnas
-        df.columns = df.iloc[0]
-        df = df[1:].reset_index(drop=True)
+        estudiantes = list(cargar_estudiantes(EXCEL_PATH))
         
-        print(f'✅ Se encontraron {len(df)} estudiantes')
+        print(f'✅ Se encontraron {len(estudiantes)} estudiantes')
         
-        return df
-    
-    def construir_nombre_archivo(self, estudiante):
-        """
-        Construye el nombre del archivo PDF basado en los datos del estudiante
-        
-        Args:
-            estudiante: Serie de pandas con los datos del estudiante
-            
-        Returns:
-            Nombre del archivo sin extensión
-        """
-        primer_apellido = str(estudiante['Primer Apellido']).strip().upper()
-        segundo_apellido = str(estudiante['Segundo Apellido']).strip().upper()
-        primer_nombre = str(estudiante['Primer Nombre']).strip().upper()
-        segundo_nombre = str(estudiante['Segundo Nombre ']).strip().upper()
-        num_documento = str(estudiante['Número de documento']).strip()
-        
-        # Construir nombre completo
-        apellidos = f"{primer_apellido}_{segundo_apellido}"
-        
-        if segundo_nombre != 'NAN':
-            nombres = f"{primer_nombre}_{segundo_nombre}"
-        else:
-            nombres = primer_nombre
-        
-        nombre_archivo = f"{apellidos}_{nombres}_{num_documento}"
-        
-        # Limpiar caracteres no válidos
-        caracteres_invalidos = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
-        for char in caracteres_invalidos:
-            nombre_archivo = nombre_archivo.replace(char, '_')
-        
-        return nombre_archivo
+        return estudiantes
     
     def navegar_a_login(self):
         """Navega a la página de login del ICFES"""
         print(f'\n📍 Navegando a: {URL_ICFES}')
         self.driver.get(URL_ICFES)
         
-        # Esperar a que la página cargue
-        time.sleep(3)
-        
-        print('✅ Página cargada')
+        # Esperar a que Angular termine de cargar el formulario
+        if self.esperar_login():
+            print('✅ Página cargada')
+
+    def esperar_login(self):
+        """
+        Espera el formulario de login sin fallar si la página tarda
+
+        Si no aparece en el tiempo normal, recarga la página una vez y vuelve
+        a esperar; el llenado del formulario tiene sus propias esperas.
+
+        Returns:
+            bool: True si el formulario quedó listo
+        """
+        if self.esperas.esperar_formulario_login(obligatoria=False) is not None:
+            return True
+        print('   ⚠️  El formulario de login tarda en cargar, recargando la página...')
+        self.driver.get(URL_ICFES)
+        if self.esperas.esperar_formulario_login(obligatoria=False) is not None:
+            return True
+        print('   ⚠️  El formulario de login sigue sin cargar')
+        return False
     
     def llenar_formulario(self, estudiante):
         """
         Llena el formulario de login con los datos del estudiante
 
         Args:
-            estudiante: Serie de pandas con los datos del estudiante
+            estudiante: Estudiante (estudiantes_icfes)
         """
         wait = WebDriverWait(self.driver, 10)
 
-        tipo_doc = str(estudiante['Tipo documento']).strip().upper()
-        num_doc = str(estudiante['Número de documento']).strip()
-        num_registro = str(estudiante['Número de registro']).strip()
+        tipo_doc = estudiante.tipo_documento
+        num_doc = estudiante.documento
+        num_registro = estudiante.registro
 
-        print(f'\n📝 Llenando formulario para: {estudiante["Primer Nombre"]} {estudiante["Primer Apellido"]}')
+        print(f'\n📝 Llenando formulario para: {estudiante.primer_nombre} {estudiante.primer_apellido}')
         print(f'   Tipo doc: {tipo_doc}, Núm doc: {num_doc}, Núm registro: {num_registro}')
 
         # Mapeo de tipos de documento del Excel a las opciones del formulario web
@@ -187,10 +213,9 @@ class DescargadorICFES:
             # Hacer clic en el ng-select para abrirlo
             ng_select = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'ng-select')))
             ng_select.click()
-            time.sleep(1)
 
-            # Buscar la opción correspondiente
-            opciones = self.driver.find_elements(By.CSS_SELECTOR, '.ng-option')
+            # Buscar la opción correspondiente (cuando el panel ya las muestra)
+            opciones = self.esperas.esperar_opciones_ng_select()
             opcion_encontrada = False
 
             for opcion in opciones:
@@ -208,21 +233,21 @@ class DescargadorICFES:
                     print(f'      {i}. {opcion.text}')
                 raise Exception(f'Tipo de documento "{tipo_doc}" no encontrado en el formulario')
 
-            time.sleep(0.5)
+            self.esperas.esperar_seleccion(tipo_doc_formulario)
             
             # 2. Ingresar número de documento
             print('   - Ingresando número de documento...')
             input_identificacion = wait.until(EC.presence_of_element_located((By.ID, 'identificacion')))
             input_identificacion.clear()
             input_identificacion.send_keys(num_doc)
-            time.sleep(0.5)
+            self.esperas.esperar_valor((By.ID, 'identificacion'), num_doc)
             
             # 3. Ingresar número de registro
             print('   - Ingresando número de registro...')
             input_registro = wait.until(EC.presence_of_element_located((By.ID, 'numeroRegistro')))
             input_registro.clear()
             input_registro.send_keys(num_registro)
-            time.sleep(0.5)
+            self.esperas.esperar_valor((By.ID, 'numeroRegistro'), num_registro)
             
             print('✅ Formulario llenado correctamente')
             return True
@@ -231,12 +256,24 @@ class DescargadorICFES:
             print(f'❌ Error al llenar el formulario: {e}')
             return False
     
-    def esperar_captcha_manual(self):
+    def esperar_captcha_manual(self, ventana=None):
         """
         Espera a que el usuario resuelva el CAPTCHA manualmente y haga clic en Ingresar
+
+        Args:
+            ventana: Número de la ventana del navegador (modo pipeline), o None
         """
+        if self.consola is not None:
+            # Modo concurrente: la consola única del operador indica qué ventana atender
+            self.consola.esperar_operador(self.numero_ventana, self.estudiante_actual)
+            self.esperas.esperar_angular_estable()
+            return
+
         print('\n' + '='*80)
-        print('⚠️  ATENCIÓN: CAPTCHA Y LOGIN')
+        if ventana is None:
+            print('⚠️  ATENCIÓN: CAPTCHA Y LOGIN')
+        else:
+            print(f'⚠️  ATENCIÓN: CAPTCHA Y LOGIN EN LA VENTANA {ventana}')
         print('='*80)
         print('\n👉 Por favor, sigue estos pasos en el navegador:')
         print('   1. Resuelve el CAPTCHA (si aparece)')
@@ -248,7 +285,7 @@ class DescargadorICFES:
         input()  # Esperar a que el usuario presione ENTER
 
         print('\n✅ Continuando con el proceso...')
-        time.sleep(2)
+        self.esperas.esperar_angular_estable()
 
     def hacer_clic_ingresar(self):
         """
@@ -256,17 +293,11 @@ class DescargadorICFES:
         """
         try:
             # Verificar si ya estamos en la página de resultados
-            if 'resultadossaber11.icfes.edu.co' in self.driver.current_url:
+            if urlparse(URL_ICFES).netloc in self.driver.current_url:
                 # Buscar elementos que indiquen que estamos en la página de resultados
-                try:
-                    wait = WebDriverWait(self.driver, 3)
-                    wait.until(EC.presence_of_element_located(
-                        (By.XPATH, "//button[contains(., 'Imprimir PDF')]")
-                    ))
+                if self.esperas.esperar_vista_resultados(timeout=3, obligatoria=False) is not None:
                     print('✅ Ya estás en la página de resultados')
                     return True
-                except:
-                    pass
 
             # Si no estamos en resultados, intentar hacer clic en Ingresar
             try:
@@ -276,7 +307,7 @@ class DescargadorICFES:
                 ))
                 boton_ingresar.click()
                 print('✅ Clic en botón Ingresar')
-                time.sleep(5)
+                self.esperas.esperar_vista_resultados(obligatoria=False)
                 return True
             except:
                 # Si no encontramos el botón, asumir que ya se hizo login
@@ -302,30 +333,33 @@ class DescargadorICFES:
                     (By.CSS_SELECTOR, 'button.dropdown-toggle')
                 ))
                 boton_menu.click()
-                time.sleep(1)
 
-                # Buscar la opción de "Salir" o "Cerrar sesión"
-                opciones_menu = self.driver.find_elements(By.CSS_SELECTOR, '.dropdown-menu a, .dropdown-menu button')
+                # Buscar la opción de "Salir" o "Cerrar sesión" (cuando el menú se despliega)
+                opciones_menu = self.esperas.esperar_elementos_visibles(
+                    'menu_usuario',
+                    (By.CSS_SELECTOR, '.dropdown-menu a, .dropdown-menu button'),
+                    timeout=5
+                )
 
                 for opcion in opciones_menu:
                     texto = opcion.text.strip().lower()
                     if 'salir' in texto or 'cerrar' in texto or 'logout' in texto:
                         opcion.click()
                         print('   ✅ Sesión cerrada')
-                        time.sleep(2)
+                        self.esperar_login()
                         return True
 
                 # Si no encontramos opción de salir, simplemente navegar a la página de login
                 print('   ⚠️  No se encontró opción de salir, navegando a login...')
-                self.driver.get('http://resultadossaber11.icfes.edu.co/')
-                time.sleep(2)
+                self.driver.get(URL_ICFES)
+                self.esperar_login()
                 return True
 
             except:
                 # Si no encontramos el menú, simplemente navegar a la página de login
                 print('   ⚠️  No se encontró menú de usuario, navegando a login...')
-                self.driver.get('http://resultadossaber11.icfes.edu.co/')
-                time.sleep(2)
+                self.driver.get(URL_ICFES)
+                self.esperar_login()
                 return True
 
         except Exception as e:
@@ -333,52 +367,150 @@ class DescargadorICFES:
             # Como último recurso, borrar cookies y navegar a login
             print('   - Borrando cookies y navegando a login...')
             self.driver.delete_all_cookies()
-            self.driver.get('http://resultadossaber11.icfes.edu.co/')
-            time.sleep(3)
+            self.driver.get(URL_ICFES)
+            self.esperas.esperar_formulario_login(obligatoria=False)
             return True
     
-    def descargar_pdf(self, nombre_archivo):
+    def capturar_pdf(self):
+        """
+        Renderiza la página de resultados como PDF usando print_page de Selenium 4+
+
+        Returns:
+            str: Contenido del PDF codificado en base64
         """
-        Busca y descarga el PDF de resultados usando print_page de Selenium
+        from selenium.webdriver.common.print_page_options import PrintOptions
+
+        # Esperar a que la vista de resultados esté renderizada por completo
+        self.esperas.esperar_vista_resultados(obligatoria=False)
+        self.esperas.esperar_recursos_cargados()
+
+        print('   - Usando Selenium print_page...')
+
+        # Configurar opciones de impresión
+        print_options = PrintOptions()
+        print_options.page_ranges = ['1-100']  # Imprimir todas las páginas
+
+        return self.driver.print_page(print_options)
+
+    def carpeta_de(self, estudiante):
+        """Carpeta de salida del estudiante (None = CARPETA_PDFS)"""
+        return self.destinos.get(estudiante.documento)
+
+    def ruta_disponible(self, nombre_archivo, carpeta=None):
+        """Ruta del PDF del estudiante; si ya existe, agrega un número"""
+        carpeta = carpeta or CARPETA_PDFS
+        os.makedirs(carpeta, exist_ok=True)
+        ruta_pdf = os.path.join(carpeta, f'{nombre_archivo}.pdf')
+
+        contador = 1
+        while os.path.exists(ruta_pdf):
+            ruta_pdf = os.path.join(carpeta, f'{nombre_archivo}_{contador}.pdf')
+            contador += 1
+
+        return ruta_pdf
+
+    def descargar_pdf_original(self, nombre_archivo, carpeta=None):
+        """
+        Descarga el PDF oficial con el botón "Imprimir PDF" del sitio
+
+        Firefox ya está configurado para guardar los PDF sin preguntar en la
+        carpeta de descargas; aquí se espera a que el archivo termine, se
+        verifica y se mueve (sin copiar) a su nombre definitivo.
 
         Args:
             nombre_archivo: Nombre base para el archivo PDF
+
+        Returns:
+            str: Ruta del PDF guardado, o None si el sitio no entregó un PDF
         """
-        try:
-            print('   - Generando PDF de la página de resultados...')
+        boton_pdf = self.esperas.esperar_elemento_clickeable('boton_imprimir_pdf',
+                                                              (By.XPATH, XPATH_BOTON_IMPRIMIR),
+                                                              obligatoria=False)
+        if boton_pdf is None:
+            print('   ⚠️  Botón "Imprimir PDF" no encontrado')
+            return None
+
+        previos = archivos_en_carpeta(self.carpeta_descargas)
+        ventana_original = self.driver.current_window_handle
+        ventanas_previas = set(self.driver.window_handles)
+
+        boton_pdf.click()
+        print('   - Esperando el PDF original en la carpeta de descargas...')
+        ruta_descarga = esperar_descarga_completa(self.carpeta_descargas, previos, TIMEOUT_DESCARGA)
+
+        # Si el botón abrió otra pestaña, cerrarla y volver a los resultados
+        for ventana in set(self.driver.window_handles) - ventanas_previas:
+            self.driver.switch_to.window(ventana)
+            self.driver.close()
+        self.driver.switch_to.window(ventana_original)
+
+        if ruta_descarga is None:
+            print(f'   ⚠️  No llegó ninguna descarga en {TIMEOUT_DESCARGA} s')
+            return None
+
+        if not pdf_completo(ruta_descarga):
+            print(f'   ⚠️  La descarga no es un PDF completo: {os.path.basename(ruta_descarga)}')
+            os.remove(ruta_descarga)
+            return None
+
+        ruta_pdf = self.ruta_disponible(nombre_archivo, carpeta)
+        os.replace(ruta_descarga, ruta_pdf)
+        print(f'   ✅ PDF original guardado: {os.path.basename(ruta_pdf)} '
+              f'({os.path.getsize(ruta_pdf) / 1024:.0f} KB)')
+        return ruta_pdf
+
+    def guardar_pdf(self, nombre_archivo, pdf_data, carpeta=None):
+        """
+        Decodifica y guarda en disco un PDF capturado con capturar_pdf
 
-            # Esperar a que la página esté completamente cargada
-            time.sleep(3)
+        Args:
+            nombre_archivo: Nombre base para el archivo PDF
+            pdf_data: Contenido del PDF en base64
+            carpeta: Carpeta de salida (None = CARPETA_PDFS)
 
-            # Usar la función print_page de Selenium para generar el PDF
-            # Esta función está disponible en Selenium 4+
-            try:
-                from selenium.webdriver.common.print_page_options import PrintOptions
+        Returns:
+            str: Ruta del archivo guardado
+        """
+        ruta_pdf = self.ruta_disponible(nombre_archivo, carpeta)
 
-                print('   - Usando Selenium print_page...')
+        # Decodificar y guardar
+        with open(ruta_pdf, 'wb') as f:
+            f.write(base64.b64decode(pdf_data))
 
-                # Configurar opciones de impresión
-                print_options = PrintOptions()
-                print_options.page_ranges = ['1-100']  # Imprimir todas las páginas
+        print(f'   ✅ PDF guardado: {os.path.basename(ruta_pdf)}')
+        return ruta_pdf
 
-                # Generar el PDF
-                pdf_data = self.driver.print_page(print_options)
+    def descargar_pdf(self, nombre_archivo, carpeta=None):
+        """
+        Busca y descarga el PDF de resultados
 
-                # Guardar el PDF
-                ruta_pdf = os.path.join(CARPETA_PDFS, f'{nombre_archivo}.pdf')
+        Por defecto usa print_page de Selenium. Con MODO_CAPTURA_PDF =
+        'descarga' (ICFES_MODO_CAPTURA) primero intenta guardar el PDF
+        original del sitio y, si no llega, vuelve a print_page.
 
-                # Si ya existe, agregar un número
-                contador = 1
-                while os.path.exists(ruta_pdf):
-                    ruta_pdf = os.path.join(CARPETA_PDFS, f'{nombre_archivo}_{contador}.pdf')
-                    contador += 1
+        Args:
+            nombre_archivo: Nombre base para el archivo PDF
+            carpeta: Carpeta de salida (None = CARPETA_PDFS)
+        """
+        try:
+            if MODO_CAPTURA_PDF == 'descarga':
+                print('   - Descargando el PDF original de resultados...')
+                try:
+                    self.ultimo_pdf = self.descargar_pdf_original(nombre_archivo, carpeta)
+                except Exception as e:
+                    print(f'   ⚠️  Error en la descarga directa: {e}')
+                    self.ultimo_pdf = None
+                if self.ultimo_pdf:
+                    return True
+                print('   ↪️  Usando print_page como respaldo...')
 
-                # Decodificar y guardar
-                import base64
-                with open(ruta_pdf, 'wb') as f:
-                    f.write(base64.b64decode(pdf_data))
+            print('   - Generando PDF de la página de resultados...')
 
-                print(f'   ✅ PDF guardado: {os.path.basename(ruta_pdf)}')
+            # Usar la función print_page de Selenium para generar el PDF
+            # Esta función está disponible en Selenium 4+
+            try:
+                pdf_data = self.capturar_pdf()
+                self.ultimo_pdf = self.guardar_pdf(nombre_archivo, pdf_data, carpeta)
                 return True
 
             except ImportError:
@@ -427,7 +559,7 @@ class DescargadorICFES:
         Procesa un estudiante completo: login, descarga PDF
         
         Args:
-            estudiante: Serie de pandas con los datos del estudiante
+            estudiante: Estudiante (estudiantes_icfes)
             indice: Índice del estudiante (para mostrar progreso)
             total: Total de estudiantes
         """
@@ -435,62 +567,423 @@ class DescargadorICFES:
         print(f'📚 PROCESANDO ESTUDIANTE {indice + 1}/{total}')
         print('='*80)
         
-        nombre_archivo = self.construir_nombre_archivo(estudiante)
+        nombre_archivo = estudiante.clave_archivo
+        documento = estudiante.documento
+        self.estudiante_actual = nombre_archivo
+        self.ultimo_pdf = None
+        self.iniciar_medicion(documento, nombre_archivo)
         
         try:
             # Navegar a la página de login
-            self.navegar_a_login()
+            with self.medir('navegar_a_login'):
+                self.navegar_a_login()
             
             # Llenar el formulario
-            if not self.llenar_formulario(estudiante):
-                raise Exception('Error al llenar el formulario')
+            with self.medir('llenar_formulario'):
+                if not self.llenar_formulario(estudiante):
+                    raise Exception('Error al llenar el formulario')
             
             # Esperar a que el usuario resuelva el CAPTCHA
-            self.esperar_captcha_manual()
+            with self.medir('esperar_captcha'):
+                self.esperar_captcha_manual()
             
             # Hacer clic en Ingresar
-            if not self.hacer_clic_ingresar():
-                raise Exception('Error al hacer clic en Ingresar')
+            with self.medir('hacer_clic_ingresar'):
+                if not self.hacer_clic_ingresar():
+                    raise Exception('Error al hacer clic en Ingresar')
             
             # Descargar el PDF
-            if self.descargar_pdf(nombre_archivo):
-                self.estudiantes_exitosos.append({
-                    'nombre': nombre_archivo,
-                    'documento': estudiante['Número de documento'],
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                })
+            with self.medir('descargar_pdf'):
+                pdf_descargado = self.descargar_pdf(nombre_archivo, self.carpeta_de(estudiante))
+            if pdf_descargado:
+                estado, error = ESTADO_EXITOSO, None
+                self.registrar_resultado(ESTADO_EXITOSO, nombre_archivo, documento,
+                                         pdf=self.ultimo_pdf)
                 print(f'\n✅ Estudiante procesado exitosamente: {nombre_archivo}')
             else:
-                self.estudiantes_sin_resultados.append({
-                    'nombre': nombre_archivo,
-                    'documento': estudiante['Número de documento'],
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                })
+                estado, error = ESTADO_SIN_RESULTADOS, None
+                self.registrar_resultado(ESTADO_SIN_RESULTADOS, nombre_archivo, documento)
                 print(f'\n⚠️  Estudiante sin resultados disponibles: {nombre_archivo}')
 
-            # Cerrar sesión para el siguiente estudiante
-            self.hacer_logout()
-
         except Exception as e:
-            self.estudiantes_error.append({
-                'nombre': nombre_archivo,
-                'documento': estudiante['Número de documento'],
-                'error': str(e),
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            })
+            estado, error = ESTADO_ERROR, str(e)
+            self.registrar_resultado(ESTADO_ERROR, nombre_archivo, documento, error=error)
             print(f'\n❌ Error al procesar estudiante: {e}')
 
-            # Intentar cerrar sesión incluso si hubo error
-            try:
+        # Cerrar sesión para el siguiente estudiante, fuera del try que registra el
+        # resultado: si falla, no debe convertir en error un PDF ya registrado
+        try:
+            with self.medir('hacer_logout'):
                 self.hacer_logout()
-            except:
-                pass
+        except Exception as e:
+            print(f'   ⚠️  No se pudo cerrar la sesión: {e}')
+        self.finalizar_medicion(estado, error=error)
 
         # Delay entre estudiantes
-        if indice < total - 1:
+        if indice < total - 1 and DELAY_ENTRE_ESTUDIANTES > 0:
             print(f'\n⏳ Esperando {DELAY_ENTRE_ESTUDIANTES} segundos antes del siguiente estudiante...')
             time.sleep(DELAY_ENTRE_ESTUDIANTES)
     
+    def preparar_formulario(self, estudiante, cerrar_sesion=False):
+        """
+        Deja esta ventana lista para el CAPTCHA: login cargado y formulario lleno
+        
+        En el modo pipeline se ejecuta en segundo plano sobre una ventana que
+        no es la que está usando el operador. La medición del estudiante empieza
+        aquí, así que el cierre de sesión del anterior se cuenta en esta.
+        
+        Args:
+            estudiante: Estudiante (estudiantes_icfes)
+            cerrar_sesion: Si True, primero cierra la sesión del estudiante anterior
+        """
+        self.iniciar_medicion(estudiante.documento, estudiante.clave_archivo)
+        if cerrar_sesion:
+            with self.medir('hacer_logout'):
+                self.hacer_logout()
+        with self.medir('navegar_a_login'):
+            self.navegar_a_login()
+        with self.medir('llenar_formulario'):
+            if not self.llenar_formulario(estudiante):
+                raise Exception('Error al llenar el formulario')
+        return True
+    
+    def traer_al_frente(self):
+        """Pone en primer plano la ventana de este navegador"""
+        try:
+            self.driver.switch_to.window(self.driver.current_window_handle)
+            self.driver.execute_script('window.focus();')
+        except Exception:
+            pass
+    
+    def guardar_en_segundo_plano(self, nombre_archivo, documento, pdf_data, carpeta=None, medicion=None):
+        """
+        Guarda un PDF capturado y registra el resultado (hilo escritor)
+
+        El estudiante se da por exitoso solo cuando el PDF quedó en disco; en
+        ese momento se cierra también su medición de telemetría.
+        """
+        try:
+            ruta_pdf = self.guardar_pdf(nombre_archivo, pdf_data, carpeta)
+        except Exception as e:
+            error = f'Error al guardar PDF: {e}'
+            self.registrar_resultado(ESTADO_ERROR, nombre_archivo, documento, error=error)
+            self.cerrar_medicion(medicion, ESTADO_ERROR, error)
+            print(f'   ❌ Error al guardar PDF de {nombre_archivo}: {e}')
+            return None
+        self.registrar_resultado(ESTADO_EXITOSO, nombre_archivo, documento, pdf=ruta_pdf)
+        self.cerrar_medicion(medicion, ESTADO_EXITOSO)
+        print(f'\n✅ Estudiante procesado exitosamente: {nombre_archivo}')
+        return ruta_pdf
+
+    def completar_en_segundo_plano(self, ventana, escritor, estudiante, siguiente=None):
+        """
+        Obtiene el PDF de una ventana ya ingresada y la deja lista para su siguiente estudiante
+
+        Corre en el preparador del modo pipeline, así que la captura (descarga
+        original o print_page) no detiene al operador. El resultado se registra
+        cuando el escritor termina de guardar el PDF.
+
+        Args:
+            ventana: DescargadorICFES con la vista de resultados abierta
+            escritor: ThreadPoolExecutor que guarda los PDF
+            estudiante: Estudiante cuyos resultados muestra la ventana
+            siguiente: Próximo Estudiante de esta ventana (None = solo cerrar sesión)
+        """
+        nombre_archivo = estudiante.clave_archivo
+        documento = estudiante.documento
+        carpeta = self.carpeta_de(estudiante)
+        ruta_pdf = None
+        pdf_data = None
+
+        try:
+            with ventana.medir('descargar_pdf'):
+                if MODO_CAPTURA_PDF == 'descarga':
+                    try:
+                        ruta_pdf = ventana.descargar_pdf_original(nombre_archivo, carpeta)
+                    except Exception as e:
+                        print(f'   ⚠️  Error en la descarga directa: {e}')
+                if ruta_pdf is None:
+                    print(f'   - Generando PDF de {nombre_archivo} (ventana {ventana.numero_ventana})...')
+                    pdf_data = ventana.capturar_pdf()
+        except Exception as e:
+            self.registrar_resultado(ESTADO_ERROR, nombre_archivo, documento, error=str(e))
+            ventana.finalizar_medicion(ESTADO_ERROR, error=str(e))
+            print(f'\n❌ Error al capturar el PDF de {nombre_archivo}: {e}')
+        else:
+            if ruta_pdf:
+                # El PDF original ya está en disco: solo queda registrarlo
+                self.registrar_resultado(ESTADO_EXITOSO, nombre_archivo, documento, pdf=ruta_pdf)
+                ventana.finalizar_medicion(ESTADO_EXITOSO)
+                print(f'\n✅ Estudiante procesado exitosamente: {nombre_archivo}')
+            else:
+                # La medición sigue abierta hasta que el escritor termine
+                medicion, ventana.medicion = ventana.medicion, None
+                escritor.submit(self.guardar_en_segundo_plano, nombre_archivo, documento,
+                                pdf_data, carpeta, medicion)
+
+        if siguiente is not None:
+            return ventana.preparar_formulario(siguiente, True)
+        ventana.hacer_logout()
+        return True
+    
+    def ejecutar_pipeline(self, estudiantes, num_ventanas=2):
+        """
+        Procesa los estudiantes con varias ventanas trabajando en paralelo al operador
+        
+        Mientras el operador resuelve el CAPTCHA en una ventana, las otras ya
+        tienen cargado y lleno el formulario de los siguientes estudiantes. El
+        PDF de cada estudiante se captura y se guarda en segundo plano, y solo
+        se registra como exitoso cuando ya está en disco.
+        El CAPTCHA sigue siendo 100% manual.
+        
+        Args:
+            estudiantes: Lista de Estudiante a procesar
+            num_ventanas: Número de ventanas de Firefox a usar
+        """
+        total = len(estudiantes)
+        num_ventanas = max(1, min(num_ventanas, total))
+        
+        # La ventana 1 es el navegador de esta instancia; las demás son sesiones propias
+        ventanas = [self]
+        self.numero_ventana = 1
+        for numero in range(2, num_ventanas + 1):
+            ventana = DescargadorICFES(modo_headless=self.modo_headless)
+            ventana.telemetria = self.telemetria
+            ventana.numero_ventana = numero
+            ventana.iniciar_navegador()
+            ventanas.append(ventana)
+        
+        print(f'\n🪟 Modo pipeline: {num_ventanas} ventana(s) preparando estudiantes en paralelo')
+        
+        preparador = ThreadPoolExecutor(max_workers=num_ventanas)
+        escritor = ThreadPoolExecutor(max_workers=1)
+        preparaciones = {}
+        
+        try:
+            # Cada ventana arranca con su primer estudiante ya preparado
+            for indice in range(num_ventanas):
+                preparaciones[indice] = preparador.submit(
+                    ventanas[indice].preparar_formulario, estudiantes[indice]
+                )
+            
+            for indice, estudiante in enumerate(estudiantes):
+                numero_ventana = indice % num_ventanas + 1
+                ventana = ventanas[numero_ventana - 1]
+                
+                print('\n' + '='*80)
+                print(f'📚 PROCESANDO ESTUDIANTE {indice + 1}/{total} (ventana {numero_ventana})')
+                print('='*80)
+                
+                nombre_archivo = estudiante.clave_archivo
+                documento = estudiante.documento
+                # Próximo estudiante de esta misma ventana
+                siguiente = indice + num_ventanas
+                siguiente = estudiantes[siguiente] if siguiente < total else None
+                
+                try:
+                    # Normalmente ya terminó mientras el operador atendía otra ventana
+                    preparaciones.pop(indice).result()
+                    
+                    ventana.traer_al_frente()
+                    with ventana.medir('esperar_captcha'):
+                        ventana.esperar_captcha_manual(ventana=numero_ventana)
+                    
+                    with ventana.medir('hacer_clic_ingresar'):
+                        if not ventana.hacer_clic_ingresar():
+                            raise Exception('Error al hacer clic en Ingresar')
+                    
+                    # Capturar el PDF y reciclar la ventana en segundo plano: la
+                    # preparación del siguiente estudiante de la ventana va después
+                    futuro = preparador.submit(self.completar_en_segundo_plano, ventana, escritor,
+                                               estudiante, siguiente)
+                    print(f'\n📨 Estudiante ingresado: {nombre_archivo} (obteniendo el PDF en segundo plano)')
+                
+                except Exception as e:
+                    self.registrar_resultado(ESTADO_ERROR, nombre_archivo, documento, error=str(e))
+                    ventana.finalizar_medicion(ESTADO_ERROR, error=str(e))
+                    print(f'\n❌ Error al procesar estudiante: {e}')
+                    # Sin vista de resultados: solo reciclar la ventana
+                    if siguiente is not None:
+                        futuro = preparador.submit(ventana.preparar_formulario, siguiente, True)
+                    else:
+                        futuro = preparador.submit(ventana.hacer_logout)
+                
+                if siguiente is not None:
+                    preparaciones[indice + num_ventanas] = futuro
+        
+        finally:
+            preparador.shutdown(wait=True)
+            escritor.shutdown(wait=True)
+            
+            for ventana in ventanas[1:]:
+                if ventana.esperas is not None and self.esperas is not None:
+                    self.esperas.registro.extend(ventana.esperas.registro)
+                ventana.cerrar_navegador()
+    
+    def trabajar_en_sesion(self, pool, sesion, cola, consola, total):
+        """
+        Hilo trabajador del modo concurrente: toma estudiantes de la cola compartida
+        
+        Args:
+            pool: PoolNavegadores dueño de la sesión
+            sesion: SesionNavegador asignada a este hilo
+            cola: queue.Queue con tuplas (indice, estudiante)
+            consola: ConsolaOperador compartida
+            total: Total de estudiantes (para mostrar progreso)
+        """
+        trabajador = DescargadorICFES(modo_headless=self.modo_headless)
+        trabajador.compartir_registro(self)
+        trabajador.consola = consola
+        trabajador.numero_ventana = sesion.numero
+        
+        while True:
+            # Sin consola nadie puede resolver CAPTCHAs: los que quedan siguen pendientes
+            if not consola.activa:
+                break
+            try:
+                indice, estudiante = cola.get_nowait()
+            except queue.Empty:
+                break
+            
+            # El driver puede haber cambiado si la sesión se recicló
+            trabajador.usar_driver(sesion.driver, sesion.carpeta_descargas)
+            trabajador.procesar_estudiante(estudiante, indice, total)
+            
+            with self._candado:
+                if trabajador.esperas is not None and self.esperas is not None:
+                    self.esperas.registro.extend(trabajador.esperas.reiniciar_registro())
+            
+            try:
+                pool.registrar_uso(sesion)
+            except Exception as e:
+                print(f'\n❌ No se pudo reiniciar la ventana {sesion.numero}: {e}')
+                break
+            finally:
+                cola.task_done()
+    
+    def ejecutar_concurrente(self, estudiantes, num_sesiones, reciclar_cada=RECICLAR_CADA_POR_DEFECTO):
+        """
+        Procesa los estudiantes con N navegadores y una única consola de operador
+        
+        Cada navegador tiene su propio perfil y carpeta de descargas; un hilo
+        por navegador toma estudiantes de una cola compartida.
+        
+        Args:
+            estudiantes: Lista de Estudiante a procesar
+            num_sesiones: Número de navegadores simultáneos
+            reciclar_cada: Reinicia cada navegador tras este número de estudiantes
+        """
+        total = len(estudiantes)
+        cola = queue.Queue()
+        for indice, estudiante in enumerate(estudiantes):
+            cola.put((indice, estudiante))
+        
+        carpeta_sesiones = os.path.abspath(os.path.join(CARPETA_PDFS, SUBCARPETA_SESIONES))
+        self.esperas = EsperasICFES(None)
+        
+        with PoolNavegadores(min(num_sesiones, total), carpeta_sesiones, self.modo_headless,
+                             reciclar_cada) as pool, ConsolaOperador() as consola:
+            hilos = [
+                threading.Thread(target=self.trabajar_en_sesion,
+                                 args=(pool, sesion, cola, consola, total),
+                                 name=f'ventana-{sesion.numero}')
+                for sesion in pool.sesiones
+            ]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+    
+    def iniciar_medicion(self, documento, nombre_archivo):
+        """Empieza a medir las fases del estudiante actual (si hay telemetría)"""
+        if self.telemetria is None:
+            self.medicion = None
+        else:
+            self.medicion = self.telemetria.iniciar_estudiante(documento, nombre_archivo,
+                                                               self.numero_ventana)
+    
+    def medir(self, fase):
+        """Context manager que mide una fase del estudiante actual"""
+        if self.medicion is None:
+            return nullcontext()
+        return self.medicion.fase(fase)
+    
+    def finalizar_medicion(self, estado, error=None):
+        """Escribe el evento de telemetría del estudiante actual"""
+        medicion, self.medicion = self.medicion, None
+        self.cerrar_medicion(medicion, estado, error)
+    
+    def cerrar_medicion(self, medicion, estado, error=None):
+        """Escribe el evento de una medición ya separada de su ventana (modo pipeline)"""
+        if medicion is None or self.telemetria is None:
+            return
+        self.telemetria.finalizar_estudiante(medicion, estado, error)
+    
+    def registrar_resultado(self, estado, nombre_archivo, documento, pdf=None, error=None):
+        """
+        Agrega el resultado de un estudiante a los logs y al diario de estado
+        
+        Es seguro llamarlo desde el hilo que guarda PDFs en segundo plano.
+        
+        Args:
+            estado: ESTADO_EXITOSO, ESTADO_SIN_RESULTADOS o ESTADO_ERROR
+            nombre_archivo: Nombre base del archivo PDF del estudiante
+            documento: Número de documento normalizado
+            pdf: Ruta del PDF guardado (solo exitosos)
+            error: Mensaje de error (solo errores)
+        """
+        entrada = {
+            'nombre': nombre_archivo,
+            'documento': documento,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        datos = {'nombre': nombre_archivo}
+        
+        with self._candado:
+            if estado == ESTADO_EXITOSO:
+                self.estudiantes_exitosos.append(entrada)
+                datos['pdf'] = pdf
+            elif estado == ESTADO_SIN_RESULTADOS:
+                self.estudiantes_sin_resultados.append(entrada)
+            else:
+                entrada['error'] = error
+                self.estudiantes_error.append(entrada)
+                datos['error'] = error
+            self.registrar_estado(documento, estado, **datos)
+    
+    def registrar_estado(self, documento, estado, **datos):
+        """Escribe el estado del estudiante en el diario persistente (si está activo)"""
+        if self.estado is None:
+            return
+        try:
+            self.estado.registrar(documento, estado, **datos)
+        except OSError as e:
+            print(f'   ⚠️  No se pudo escribir el estado de {documento}: {e}')
+    
+    def filtrar_pendientes(self, estudiantes):
+        """
+        Omite los estudiantes que ya tienen un PDF válido según el diario de estado
+        
+        Args:
+            estudiantes: Lista de Estudiante del Excel
+            
+        Returns:
+            Lista solo con los estudiantes pendientes o fallidos
+        """
+        pendientes = [estudiante for estudiante in estudiantes
+                      if self.estado.debe_procesar(estudiante.documento)]
+        omitidos = len(estudiantes) - len(pendientes)
+        
+        if omitidos:
+            print(f'\n⏭️  Reanudando: {omitidos} estudiante(s) ya tienen PDF válido y se omiten')
+        
+        conteo = self.estado.contar_por_estado()
+        if conteo:
+            detalle = ', '.join(f'{estado}: {cantidad}' for estado, cantidad in sorted(conteo.items()))
+            print(f'   Estado previo ({ARCHIVO_ESTADO}): {detalle}')
+        
+        return pendientes
+    
     def guardar_logs(self):
         """Guarda los logs de la ejecución"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -529,43 +1022,58 @@ class DescargadorICFES:
                     f.write(f"Timestamp: {est['timestamp']}\n")
                     f.write('-'*80 + '\n')
         
+        # Resumen de la telemetría (los eventos por estudiante ya están en su .jsonl)
+        if self.telemetria is not None and self.telemetria.eventos:
+            self.telemetria.guardar_resumen(f'{CARPETA_LOGS}/telemetria_resumen_{timestamp}.json')
+        
         print(f'\n📝 Logs guardados en la carpeta: {CARPETA_LOGS}')
     
-    def ejecutar(self, limite=None):
+    def mostrar_resumen_esperas(self):
+        """Muestra cuánto tiempo se pasó en cada tipo de espera"""
+        if not self.esperas or not self.esperas.registro:
+            return
+
+        print('\n⏱️  TIEMPO EN ESPERAS')
+        print('-'*80)
+        for nombre, datos in sorted(self.esperas.resumen().items(),
+                                    key=lambda item: item[1]['total'], reverse=True):
+            promedio = datos['total'] / datos['cantidad']
+            print(f'   {nombre:<28} {datos["cantidad"]:>5} esperas  '
+                  f'promedio {promedio:6.2f} s  máximo {datos["maximo"]:6.2f} s  '
+                  f'agotadas {datos["agotadas"]}')
+    
+    def ejecutar(self, limite=None, reanudar=True, num_ventanas=1, num_sesiones=1,
+                 reciclar_cada=RECICLAR_CADA_POR_DEFECTO):
         """
         Ejecuta el proceso completo de descarga
         
         Args:
             limite: Número máximo de estudiantes a procesar (None = todos)
+            reanudar: Si True, omite los estudiantes que ya tienen un PDF válido
+                      y reintenta solo los fallidos o pendientes
+            num_ventanas: 1 = modo secuencial; 2 o más = modo pipeline
+            num_sesiones: 2 o más = modo concurrente con un pool de navegadores
+            reciclar_cada: En modo concurrente, reinicia cada navegador tras K estudiantes
         """
         try:
             # Leer Excel
-            df_estudiantes = self.leer_excel()
+            estudiantes = self.leer_excel()
+            
+            self.iniciar_registro()
+            if reanudar:
+                estudiantes = self.filtrar_pendientes(estudiantes)
+                if not estudiantes:
+                    print('\n🎉 No hay estudiantes pendientes: todos tienen su PDF válido')
+                    return
             
             # Limitar si se especifica
             if limite:
-                df_estudiantes = df_estudiantes.head(limite)
+                estudiantes = estudiantes[:limite]
                 print(f'\n⚠️  Modo de prueba: procesando solo {limite} estudiante(s)')
             
-            # Iniciar navegador
-            self.iniciar_navegador()
-            
             # Procesar cada estudiante
-            total = len(df_estudiantes)
-            for indice, (_, estudiante) in enumerate(df_estudiantes.iterrows()):
-                self.procesar_estudiante(estudiante, indice, total)
-            
-            # Mostrar resumen
-            print('\n' + '='*80)
-            print('📊 RESUMEN DE LA EJECUCIÓN')
-            print('='*80)
-            print(f'✅ Exitosos: {len(self.estudiantes_exitosos)}')
-            print(f'❌ Errores: {len(self.estudiantes_error)}')
-            print(f'⚠️  Sin resultados: {len(self.estudiantes_sin_resultados)}')
-            print(f'📁 Total procesados: {total}')
-            
-            # Guardar logs
-            self.guardar_logs()
+            self.procesar_estudiantes(estudiantes, num_ventanas, num_sesiones, reciclar_cada)
+            self.finalizar_ejecucion(len(estudiantes))
             
         except Exception as e:
             print(f'\n❌ Error fatal: {e}')
@@ -573,8 +1081,69 @@ class DescargadorICFES:
             traceback.print_exc()
         
         finally:
-            # Cerrar navegador
-            self.cerrar_navegador()
+            self.cerrar_registro()
+    
+    def iniciar_registro(self, carpeta_pdfs=None):
+        """
+        Abre el diario de estado y la telemetría de esta ejecución
+
+        Args:
+            carpeta_pdfs: Carpeta cuyos PDFs ya descargados se registran (por defecto CARPETA_PDFS)
+        """
+        # Cargar el estado persistente de ejecuciones anteriores
+        self.estado = EstadoDescargas(ARCHIVO_ESTADO, carpeta_pdfs or CARPETA_PDFS)
+        if self.estado.sembrados:
+            print(f'\n📋 {self.estado.sembrados} PDF(s) ya descargados registrados en el diario de estado')
+        
+        # Eventos de tiempo por fase, un JSON por estudiante
+        self.telemetria = Telemetria(os.path.join(
+            CARPETA_LOGS, f'telemetria_{datetime.now().strftime("%Y%m%d_%H%M%S")}.jsonl'))
+    
+    def procesar_estudiantes(self, estudiantes, num_ventanas=1, num_sesiones=1,
+                             reciclar_cada=RECICLAR_CADA_POR_DEFECTO):
+        """
+        Procesa una lista de estudiantes en el modo indicado
+        
+        Args:
+            estudiantes: Lista de Estudiante
+            num_ventanas: 1 = modo secuencial; 2 o más = modo pipeline
+            num_sesiones: 2 o más = modo concurrente con un pool de navegadores
+            reciclar_cada: En modo concurrente, reinicia cada navegador tras K estudiantes
+        """
+        if num_sesiones > 1:
+            # El pool lanza y cierra sus propios navegadores
+            self.ejecutar_concurrente(estudiantes, num_sesiones, reciclar_cada)
+        else:
+            self.iniciar_navegador()
+            if num_ventanas > 1:
+                self.ejecutar_pipeline(estudiantes, num_ventanas)
+            else:
+                for indice, estudiante in enumerate(estudiantes):
+                    self.procesar_estudiante(estudiante, indice, len(estudiantes))
+    
+    def finalizar_ejecucion(self, total):
+        """Muestra el resumen de la ejecución y guarda los logs"""
+        print('\n' + '='*80)
+        print('📊 RESUMEN DE LA EJECUCIÓN')
+        print('='*80)
+        print(f'✅ Exitosos: {len(self.estudiantes_exitosos)}')
+        print(f'❌ Errores: {len(self.estudiantes_error)}')
+        print(f'⚠️  Sin resultados: {len(self.estudiantes_sin_resultados)}')
+        print(f'📁 Total procesados: {total}')
+        self.mostrar_resumen_esperas()
+        self.telemetria.mostrar_resumen()
+        
+        # Guardar logs
+        self.guardar_logs()
+    
+    def cerrar_registro(self):
+        """Compacta el diario de estado y cierra el navegador"""
+        # Dejar el diario con un registro por estudiante
+        if self.estado is not None:
+            self.estado.compactar()
+        
+        # Cerrar navegador
+        self.cerrar_navegador()
 
 
 def main():
@@ -592,9 +1161,26 @@ def main():
     
     limite = 1 if opcion == '1' else None
     
+    # Preguntar cuántas ventanas usar
+    print('\n¿Cuántas ventanas del navegador deseas usar?')
+    print('1 - Modo normal (una ventana, un estudiante a la vez)')
+    print('2 o más - Modo pipeline (prepara el siguiente estudiante mientras resuelves el CAPTCHA)')
+    
+    respuesta = input('\nNúmero de ventanas [1]: ').strip()
+    num_ventanas = int(respuesta) if respuesta.isdigit() and int(respuesta) > 0 else 1
+    
+    # Con varios operadores, cada ventana es un navegador independiente
+    num_sesiones = 1
+    if num_ventanas > 1:
+        print('\n¿Cómo usar las ventanas?')
+        print('1 - Pipeline: un operador, las ventanas se turnan')
+        print('2 - Concurrente: cada ventana trabaja por su cuenta (varios operadores)')
+        if input('\nSelecciona una opción (1 o 2): ').strip() == '2':
+            num_sesiones, num_ventanas = num_ventanas, 1
+    
     # Crear instancia y ejecutar
     descargador = DescargadorICFES(modo_headless=False)
-    descargador.ejecutar(limite=limite)
+    descargador.ejecutar(limite=limite, num_ventanas=num_ventanas, num_sesiones=num_sesiones)
     
     print('\n✅ Proceso completado!')
 
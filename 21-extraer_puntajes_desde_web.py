@@ -7,11 +7,12 @@ y generar archivo Excel consolidado.
 Fase 2 del proyecto: Extracción de puntajes y consolidación en Excel
 """
 
-import pandas as pd
 import os
 import sys
 import time
 import re
+import json
+import unicodedata
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -19,12 +20,18 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.support.ui import Select
+from agregados_icfes import AgregadosResultados
+from almacen_resultados import AlmacenResultados
+from estudiantes_icfes import cargar_estudiantes
 
 # Configuración
 ARCHIVO_EXCEL_ENTRADA = 'INSCRITOS_EXAMEN SABER 11 (36).xls'
 ARCHIVO_EXCEL_SALIDA = 'RESULTADOS-ICFES-AULA-REGULAR.xlsx'
 CARPETA_LOGS = 'logs'
-URL_ICFES = 'http://resultadossaber11.icfes.edu.co/'
+# Cada puntaje se guarda aquí apenas se extrae; el Excel se exporta desde este archivo
+ARCHIVO_RESULTADOS_DB = os.path.join(CARPETA_LOGS, 'resultados_extraidos.sqlite')
+# ICFES_URL permite apuntar al sitio simulado (sitio_simulado_icfes.py)
+URL_ICFES = os.environ.get('ICFES_URL', 'http://resultadossaber11.icfes.edu.co/')
 
 # Mapeo de tipos de documento
 TIPOS_DOCUMENTO = {
@@ -32,12 +39,184 @@ TIPOS_DOCUMENTO = {
     'CC': 'CÉDULA DE CIUDADANÍA'
 }
 
+AREAS = ['Lectura Crítica', 'Matemáticas', 'Sociales y Ciudadanas', 'Ciencias Naturales', 'Inglés']
+
+# Claves normalizadas (sin tildes, espacios ni mayúsculas) con que viene cada prueba en
+# las respuestas del portal: solo nombres completos, para no tomar un número de otro dato
+ALIAS_AREAS = {
+    'lecturacritica': 'Lectura Crítica',
+    'matematicas': 'Matemáticas',
+    'socialesyciudadanas': 'Sociales y Ciudadanas',
+    'competenciasciudadanas': 'Sociales y Ciudadanas',
+    'cienciasnaturales': 'Ciencias Naturales',
+    'ingles': 'Inglés',
+}
+ALIAS_GLOBAL = {'puntajeglobal'}
+
+# Patrones compilados una sola vez para leer la vista de resultados completa
+PATRONES_AREAS = {
+    area: re.compile(re.escape(area) + r'\D{0,40}?(\d{1,3})\s*/\s*100', re.IGNORECASE)
+    for area in AREAS
+}
+PATRON_GLOBAL = re.compile(r'(\d{1,3})\s*/\s*500')
+
+# Claves (normalizadas) de los objetos {'prueba': 'Matemáticas', 'puntaje': 52}
+CLAVES_PRUEBA = {'prueba', 'nombreprueba', 'area'}
+CLAVES_PUNTAJE = {'puntaje', 'puntajeprueba', 'puntajearea', 'puntajeobtenido'}
+# Un bloque de puntajes de una respuesta solo cuenta si trae al menos estos puntajes
+MINIMO_PUNTAJES_BLOQUE = 3
+
+# Engancha XMLHttpRequest y fetch para guardar los cuerpos JSON que recibe la
+# aplicación, así nunca se repite una petición al servidor. Se instala al
+# cargar el login (si la vista de resultados llega en la misma página) y de
+# nuevo en la vista de resultados si el login la recargó.
+JS_CAPTURAR_RESPUESTAS = """
+if (window.__respuestasIcfes) { return true; }
+window.__respuestasIcfes = [];
+var guardar = function (texto) {
+  if (typeof texto === 'string' && /^\\s*[\\[{]/.test(texto) && window.__respuestasIcfes.length < 200) {
+    window.__respuestasIcfes.push(texto);
+  }
+};
+var enviarOriginal = XMLHttpRequest.prototype.send;
+XMLHttpRequest.prototype.send = function () {
+  this.addEventListener('load', function () {
+    try {
+      if (this.responseType === '' || this.responseType === 'text') { guardar(this.responseText); }
+      else if (this.responseType === 'json') { guardar(JSON.stringify(this.response)); }
+    } catch (e) {}
+  });
+  return enviarOriginal.apply(this, arguments);
+};
+if (window.fetch) {
+  var fetchOriginal = window.fetch;
+  window.fetch = function () {
+    return fetchOriginal.apply(this, arguments).then(function (respuesta) {
+      try { respuesta.clone().text().then(guardar, function () {}); } catch (e) {}
+      return respuesta;
+    });
+  };
+}
+return true;
+"""
+JS_LEER_RESPUESTAS = 'return window.__respuestasIcfes || null;'
+
+
+def normalizar_clave(texto):
+    """'Lectura Crítica' -> 'lecturacritica'"""
+    sin_tildes = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]', '', sin_tildes.lower())
+
+
+def _como_puntaje(valor, maximo):
+    """Convierte un valor JSON a puntaje entero si está en 0..maximo"""
+    if isinstance(valor, bool):
+        return None
+    if isinstance(valor, str) and re.fullmatch(r'\s*\d{1,3}(\.0+)?\s*', valor):
+        valor = float(valor)
+    if isinstance(valor, (int, float)) and 0 <= valor <= maximo:
+        return int(valor)
+    return None
+
+
+def _bloque_de_objeto(datos):
+    """Puntajes de un objeto cuyas claves son las pruebas ({'Matemáticas': 52, 'Puntaje Global': 260})"""
+    bloque = {}
+    for clave, valor in datos.items():
+        clave_normalizada = normalizar_clave(clave)
+        if clave_normalizada in ALIAS_AREAS:
+            puntaje = _como_puntaje(valor, 100)
+            if puntaje is not None:
+                bloque[ALIAS_AREAS[clave_normalizada]] = puntaje
+        elif clave_normalizada in ALIAS_GLOBAL:
+            puntaje = _como_puntaje(valor, 500)
+            if puntaje is not None:
+                bloque['Puntaje Global'] = puntaje
+    return bloque
+
+
+def _bloque_de_lista(elementos):
+    """Puntajes de una lista de objetos {'prueba': 'Matemáticas', 'puntaje': 52}"""
+    bloque = {}
+    for elemento in elementos:
+        if not isinstance(elemento, dict):
+            continue
+        prueba, valor = None, None
+        for clave, contenido in elemento.items():
+            clave_normalizada = normalizar_clave(clave)
+            if clave_normalizada in CLAVES_PRUEBA and isinstance(contenido, str):
+                prueba = normalizar_clave(contenido)
+            elif clave_normalizada in CLAVES_PUNTAJE:
+                valor = contenido
+        if prueba in ALIAS_AREAS:
+            puntaje = _como_puntaje(valor, 100)
+            if puntaje is not None:
+                bloque[ALIAS_AREAS[prueba]] = puntaje
+        elif prueba in ALIAS_GLOBAL:
+            puntaje = _como_puntaje(valor, 500)
+            if puntaje is not None:
+                bloque['Puntaje Global'] = puntaje
+    return bloque
+
+
+def buscar_puntajes_en_json(datos):
+    """
+    Busca en una respuesta JSON el bloque con los puntajes del estudiante
+
+    Un bloque es un objeto cuyas claves son los nombres completos de las
+    pruebas ({'Lectura Crítica': 57, ..., 'Puntaje Global': 260}) o una lista
+    de objetos {'prueba': 'Matemáticas', 'puntaje': 52}. Solo cuentan los
+    bloques con al menos MINIMO_PUNTAJES_BLOQUE puntajes y se toma el más
+    completo, así que un número suelto en otra parte de la respuesta nunca se
+    toma por un puntaje.
+
+    Returns:
+        dict: {'Puntaje Global': int, 'Lectura Crítica': int, ...}, vacío si no hay bloque
+    """
+    mejor = {}
+    pendientes = [datos]
+    while pendientes:
+        nodo = pendientes.pop()
+        if isinstance(nodo, dict):
+            bloque = _bloque_de_objeto(nodo)
+            pendientes.extend(nodo.values())
+        elif isinstance(nodo, list):
+            bloque = _bloque_de_lista(nodo)
+            pendientes.extend(nodo)
+        else:
+            continue
+        if len(bloque) >= MINIMO_PUNTAJES_BLOQUE and len(bloque) > len(mejor):
+            mejor = bloque
+    return mejor
+
+
+def buscar_puntajes_en_texto(texto):
+    """
+    Busca los puntajes en el texto visible de la vista de resultados
+
+    Returns:
+        dict: Puntajes encontrados ('NN/100' junto al nombre del área y 'NNN/500')
+    """
+    puntajes = {}
+    match_global = PATRON_GLOBAL.search(texto)
+    if match_global:
+        puntajes['Puntaje Global'] = int(match_global.group(1))
+    for area, patron in PATRONES_AREAS.items():
+        match = patron.search(texto)
+        if match and 0 <= int(match.group(1)) <= 100:
+            puntajes[area] = int(match.group(1))
+    return puntajes
+
+
 class ExtractorPuntajesICFES:
     """Clase para extraer puntajes de resultados ICFES desde la web"""
     
-    def __init__(self, modo_prueba=False):
+    def __init__(self, modo_prueba=False, almacen=None, agregados=None):
         self.modo_prueba = modo_prueba
         self.driver = None
+        self.almacen = almacen
+        # Agregados que leen los dashboards: se actualizan con cada estudiante
+        self.agregados = agregados
         self.resultados = []
         self.errores = []
         
@@ -58,7 +237,15 @@ class ExtractorPuntajesICFES:
         print(f'\n🌐 Navegando a: {URL_ICFES}')
         self.driver.get(URL_ICFES)
         time.sleep(3)
+        self.instalar_captura_respuestas()
         print('✅ Página cargada')
+
+    def instalar_captura_respuestas(self):
+        """Empieza a guardar las respuestas JSON de la aplicación (no hace nada si ya está instalada)"""
+        try:
+            self.driver.execute_script(JS_CAPTURAR_RESPUESTAS)
+        except Exception as e:
+            print(f'   ⚠️  No se pudo instalar la captura de respuestas: {e}')
         
     def ingresar_datos_estudiante(self, tipo_doc, numero_doc):
         """Ingresa los datos del estudiante en el formulario"""
@@ -252,31 +439,77 @@ class ExtractorPuntajesICFES:
                 pass
             return None
 
+    def extraer_puntajes_en_una_pasada(self):
+        """
+        Lee todos los puntajes sin salir de la vista de resultados
+
+        Primero busca en las respuestas JSON que la aplicación recibió desde
+        que se instaló la captura (XHR/fetch, sin volver a pedirlas) el bloque
+        de puntajes más completo y luego completa con una sola captura del
+        texto visible. Si el login recargó la página, la captura se vuelve a
+        instalar en la vista de resultados (para las peticiones siguientes) y
+        esta vez los puntajes salen del texto.
+
+        Returns:
+            dict: Puntajes encontrados (puede estar incompleto)
+        """
+        puntajes = {}
+
+        try:
+            respuestas = self.driver.execute_script(JS_LEER_RESPUESTAS)
+            if respuestas is None:
+                print('   ⚠️  La página se recargó desde el login: se leen los puntajes de la vista')
+                self.instalar_captura_respuestas()
+            for respuesta in respuestas or []:
+                try:
+                    bloque = buscar_puntajes_en_json(json.loads(respuesta))
+                except (TypeError, ValueError):
+                    continue
+                # Ante bloques igual de completos gana la respuesta más reciente
+                if bloque and len(bloque) >= len(puntajes):
+                    puntajes = bloque
+            if puntajes:
+                print(f'   ✅ {len(puntajes)} puntaje(s) leídos de los datos de la aplicación')
+        except Exception as e:
+            print(f'   ⚠️  No se pudieron leer las respuestas capturadas: {e}')
+
+        if not all(puntajes.get(clave) is not None for clave in ['Puntaje Global'] + AREAS):
+            try:
+                texto = self.driver.execute_script('return document.body.innerText;') or ''
+                for clave, valor in buscar_puntajes_en_texto(texto).items():
+                    puntajes.setdefault(clave, valor)
+            except Exception as e:
+                print(f'   ⚠️  No se pudo leer el texto de la página: {e}')
+
+        return puntajes
+
     def extraer_puntajes_de_pagina(self):
-        """Extrae todos los puntajes de la página de resultados"""
+        """
+        Extrae todos los puntajes de la página de resultados
+
+        Usa extraer_puntajes_en_una_pasada(); solo las áreas que falten se
+        buscan con el recorrido área por área (clic y volver).
+        """
         try:
             print('\n🔍 Extrayendo puntajes de la página...')
 
-            # Extraer puntaje global
-            puntaje_global = self.extraer_puntaje_global()
+            encontrados = self.extraer_puntajes_en_una_pasada()
 
-            # Áreas a extraer
-            areas = {
-                'Lectura Crítica': 'Lectura Crítica',
-                'Matemáticas': 'Matemáticas',
-                'Sociales y Ciudadanas': 'Sociales y Ciudadanas',
-                'Ciencias Naturales': 'Ciencias Naturales',
-                'Inglés': 'Inglés'
-            }
+            # Respaldo: puntaje global desde el HTML
+            puntaje_global = encontrados.get('Puntaje Global')
+            if puntaje_global is None:
+                puntaje_global = self.extraer_puntaje_global()
 
             puntajes = {
                 'Puntaje Global': puntaje_global
             }
 
-            # Extraer puntaje de cada área
-            for nombre_area, clave in areas.items():
-                puntaje_area = self.extraer_puntaje_de_area(nombre_area)
-                puntajes[clave] = puntaje_area
+            # Respaldo: clic en cada área que no se encontró en la vista principal
+            for nombre_area in AREAS:
+                puntaje_area = encontrados.get(nombre_area)
+                if puntaje_area is None:
+                    puntaje_area = self.extraer_puntaje_de_area(nombre_area)
+                puntajes[nombre_area] = puntaje_area
 
             # Mostrar resumen
             print('\n📊 RESUMEN DE PUNTAJES EXTRAÍDOS:')
@@ -330,8 +563,13 @@ class ExtractorPuntajesICFES:
             return True
     
     def procesar_estudiante(self, estudiante):
-        """Procesa un estudiante completo"""
-        nombre_completo = f"{estudiante['Primer Apellido']} {estudiante['Segundo Apellido']} {estudiante['Primer Nombre']} {estudiante.get('Segundo Nombre', '')}".strip()
+        """
+        Procesa un estudiante completo
+
+        Args:
+            estudiante: Estudiante (estudiantes_icfes)
+        """
+        nombre_completo = estudiante.nombre_completo
         
         print('\n' + '='*80)
         print(f'👤 PROCESANDO: {nombre_completo}')
@@ -342,7 +580,7 @@ class ExtractorPuntajesICFES:
             self.navegar_a_icfes()
             
             # Ingresar datos
-            if not self.ingresar_datos_estudiante(estudiante['Tipo de documento'], estudiante['Número de documento']):
+            if not self.ingresar_datos_estudiante(estudiante.tipo_documento, estudiante.documento):
                 raise Exception('Error al ingresar datos')
             
             # Esperar login manual
@@ -353,15 +591,21 @@ class ExtractorPuntajesICFES:
             
             if puntajes:
                 resultado = {
-                    'Primer Apellido': estudiante['Primer Apellido'],
-                    'Segundo Apellido': estudiante['Segundo Apellido'],
-                    'Primer Nombre': estudiante['Primer Nombre'],
-                    'Segundo Nombre': estudiante.get('Segundo Nombre', ''),
-                    'Tipo de documento': estudiante['Tipo de documento'],
-                    'Número de documento': estudiante['Número de documento'],
+                    'Primer Apellido': estudiante.primer_apellido,
+                    'Segundo Apellido': estudiante.segundo_apellido,
+                    'Primer Nombre': estudiante.primer_nombre,
+                    'Segundo Nombre': estudiante.segundo_nombre,
+                    'Tipo de documento': estudiante.tipo_documento,
+                    'Número de documento': estudiante.documento,
+                    'Grupo': estudiante.grupo,
                     **puntajes
                 }
                 self.resultados.append(resultado)
+                if self.almacen is not None:
+                    self.almacen.guardar(resultado)
+                if self.agregados is not None:
+                    self.agregados.actualizar(resultado)
+                    self.agregados.guardar()
                 print(f'\n✅ Estudiante procesado exitosamente')
             else:
                 raise Exception('No se pudieron extraer puntajes')
@@ -386,21 +630,47 @@ class ExtractorPuntajesICFES:
             self.driver.quit()
             print('✅ Navegador cerrado')
 
+def exportar_resultados(almacen):
+    """Genera el Excel de salida con todo lo guardado en el almacén"""
+    print('\n' + '='*80)
+    print('📊 GENERANDO ARCHIVO EXCEL')
+    print('='*80)
+    
+    total = almacen.exportar_excel(ARCHIVO_EXCEL_SALIDA)
+    
+    print(f'\n✅ Archivo generado: {ARCHIVO_EXCEL_SALIDA}')
+    print(f'📊 Total de estudiantes: {total}')
+
 def main():
     """Función principal"""
     print('\n' + '='*80)
     print('🎓 EXTRACTOR DE PUNTAJES ICFES - FASE 2')
     print('='*80)
     
+    almacen = AlmacenResultados(ARCHIVO_RESULTADOS_DB)
+    
+    # Solo regenerar el Excel con lo ya extraído
+    if '--exportar' in sys.argv:
+        with almacen:
+            exportar_resultados(almacen)
+        return
+    
     # Verificar archivo de entrada
     if not os.path.exists(ARCHIVO_EXCEL_ENTRADA):
         print(f'\n❌ Error: No se encuentra el archivo {ARCHIVO_EXCEL_ENTRADA}')
         sys.exit(1)
     
-    # Leer archivo Excel
+    # Leer archivo Excel (o su Parquet, si ya se leyó antes)
     print(f'\n📂 Leyendo archivo: {ARCHIVO_EXCEL_ENTRADA}')
-    df = pd.read_excel(ARCHIVO_EXCEL_ENTRADA, skiprows=3)
-    print(f'✅ {len(df)} estudiantes encontrados')
+    estudiantes = list(cargar_estudiantes(ARCHIVO_EXCEL_ENTRADA))
+    print(f'✅ {len(estudiantes)} estudiantes encontrados')
+    
+    # Reanudar: omitir los estudiantes que ya tienen puntajes guardados
+    ya_extraidos = almacen.documentos()
+    if ya_extraidos:
+        pendientes = [estudiante for estudiante in estudiantes if estudiante.documento not in ya_extraidos]
+        print(f'⏭️  {len(estudiantes) - len(pendientes)} estudiante(s) ya tienen puntajes en {ARCHIVO_RESULTADOS_DB}')
+        estudiantes = pendientes
     
     # Preguntar modo
     print('\n' + '='*80)
@@ -416,36 +686,29 @@ def main():
     
     if modo_prueba:
         print('\n🧪 Modo PRUEBA activado (1 estudiante)')
-        df = df.head(1)
+        estudiantes = estudiantes[:1]
     else:
-        print(f'\n🚀 Modo COMPLETO activado ({len(df)} estudiantes)')
+        print(f'\n🚀 Modo COMPLETO activado ({len(estudiantes)} estudiantes)')
     
     # Crear extractor
-    extractor = ExtractorPuntajesICFES(modo_prueba=modo_prueba)
+    extractor = ExtractorPuntajesICFES(modo_prueba=modo_prueba, almacen=almacen,
+                                       agregados=AgregadosResultados())
     
     try:
         # Iniciar navegador
         extractor.iniciar_navegador()
         
         # Procesar estudiantes
-        for idx, estudiante in df.iterrows():
+        for idx, estudiante in enumerate(estudiantes):
             extractor.procesar_estudiante(estudiante)
             
-            if not modo_prueba and idx < len(df) - 1:
+            if not modo_prueba and idx < len(estudiantes) - 1:
                 print('\n⏸️  Pausa de 3 segundos antes del siguiente estudiante...')
                 time.sleep(3)
         
-        # Generar Excel de salida
-        if extractor.resultados:
-            print('\n' + '='*80)
-            print('📊 GENERANDO ARCHIVO EXCEL')
-            print('='*80)
-            
-            df_resultados = pd.DataFrame(extractor.resultados)
-            df_resultados.to_excel(ARCHIVO_EXCEL_SALIDA, index=False)
-            
-            print(f'\n✅ Archivo generado: {ARCHIVO_EXCEL_SALIDA}')
-            print(f'📊 Total de estudiantes: {len(df_resultados)}')
+        # Generar Excel de salida (incluye lo extraído en ejecuciones anteriores)
+        if almacen.contar():
+            exportar_resultados(almacen)
         
         # Mostrar resumen
         print('\n' + '='*80)
@@ -461,6 +724,7 @@ def main():
         
     finally:
         extractor.cerrar_navegador()
+        almacen.cerrar()
     
     print('\n' + '='*80)
     print('✅ PROCESO COMPLETADO')
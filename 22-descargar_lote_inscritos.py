@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Descarga en lote de varios listados de INSCRITOS (colegios, grupos), sin preguntas.
+
+Recibe una carpeta con los archivos de inscritos (.xls/.xlsx) o un manifiesto
+y los procesa como una sola ejecución del descargador:
+- Cada estudiante se procesa una sola vez aunque aparezca en varios listados
+  (gana el primer listado; los repetidos se reportan).
+- Los PDFs de cada listado van a su propia subcarpeta de la carpeta de salida.
+- Todos los estudiantes pendientes entran en una sola cola, así que las
+  sesiones del navegador se reparten el trabajo de todos los listados.
+- Al final se muestra y se guarda el avance por listado.
+
+El manifiesto puede ser un JSON (lista de rutas o de objetos con "ruta" y,
+opcionalmente, "nombre" y "carpeta") o un texto con una ruta por línea; las
+rutas relativas se toman desde la carpeta del manifiesto.
+
+Uso:
+    python3 22-descargar_lote_inscritos.py listados/ --sesiones 3
+    python3 22-descargar_lote_inscritos.py temporada_2025.json --solo-planificar
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+from estado_descargas import EstadoDescargas
+from estudiantes_icfes import cargar_estudiantes, normalizar_rotulo
+
+EXTENSIONES_INSCRITOS = ('.xls', '.xlsx')
+
+
+def cargar_descargador():
+    """Carga 12-descargar_resultados_icfes.py (el nombre empieza con un número)"""
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), '12-descargar_resultados_icfes.py')
+    spec = importlib.util.spec_from_file_location('descargador_icfes', ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def nombre_carpeta(nombre):
+    """'Colegio San José - 11A' -> 'colegio_san_jose_11a'"""
+    return re.sub(r'[^a-z0-9]+', '_', normalizar_rotulo(nombre)).strip('_') or 'listado'
+
+
+def buscar_listados(origen):
+    """
+    Lista de listados a procesar, en orden
+
+    Args:
+        origen: Carpeta con archivos de inscritos o archivo de manifiesto
+
+    Returns:
+        list de dict con 'ruta', 'nombre' y 'carpeta'
+    """
+    if os.path.isdir(origen):
+        rutas = []
+        for raiz, carpetas, archivos in os.walk(origen):
+            carpetas[:] = sorted(carpeta for carpeta in carpetas if not carpeta.startswith('.'))
+            rutas.extend(os.path.join(raiz, archivo) for archivo in sorted(archivos)
+                         if archivo.lower().endswith(EXTENSIONES_INSCRITOS) and not archivo.startswith('~$'))
+        entradas = [{'ruta': ruta} for ruta in rutas]
+        base = origen
+    else:
+        base = os.path.dirname(os.path.abspath(origen))
+        with open(origen, 'r', encoding='utf-8') as f:
+            contenido = f.read()
+        if origen.lower().endswith('.json'):
+            entradas = [entrada if isinstance(entrada, dict) else {'ruta': entrada}
+                        for entrada in json.loads(contenido)]
+        else:
+            entradas = [{'ruta': linea.strip()} for linea in contenido.splitlines()
+                        if linea.strip() and not linea.strip().startswith('#')]
+
+    listados = []
+    carpetas_usadas = set()
+    for entrada in entradas:
+        ruta = entrada['ruta']
+        if not os.path.isabs(ruta) and not os.path.isdir(origen):
+            ruta = os.path.join(base, ruta)
+        nombre = entrada.get('nombre') or os.path.splitext(os.path.basename(ruta))[0]
+        carpeta = entrada.get('carpeta') or nombre_carpeta(nombre)
+        # Dos listados con el mismo nombre no deben compartir carpeta
+        sufijo, original = 2, carpeta
+        while carpeta in carpetas_usadas:
+            carpeta = f'{original}_{sufijo}'
+            sufijo += 1
+        carpetas_usadas.add(carpeta)
+        listados.append({'ruta': ruta, 'nombre': nombre, 'carpeta': carpeta})
+    return listados
+
+
+def planificar(listados, carpeta_salida, estado=None):
+    """
+    Lee los listados, quita los estudiantes repetidos y arma la cola de trabajo
+
+    Args:
+        listados: Resultado de buscar_listados
+        carpeta_salida: Carpeta base de los PDFs
+        estado: EstadoDescargas para omitir los que ya tienen PDF (None = no omitir)
+
+    Returns:
+        tuple: (pendientes, destinos, avance) donde pendientes es la lista de
+               Estudiante a procesar, destinos {documento: carpeta} y avance
+               un dict por listado (clave = subcarpeta) con sus conteos
+    """
+    pendientes = []
+    destinos = {}
+    origen_documento = {}
+    avance = {}
+
+    for listado in listados:
+        fila = {'nombre': listado['nombre'], 'ruta': listado['ruta'],
+                'carpeta': os.path.join(carpeta_salida, listado['carpeta']),
+                'inscritos': 0, 'repetidos': 0, 'con_pdf': 0, 'programados': 0,
+                'exitosos': 0, 'errores': 0, 'sin_resultados': 0, 'error_lectura': None}
+        avance[listado['carpeta']] = fila
+        try:
+            estudiantes = cargar_estudiantes(listado['ruta'])
+        except Exception as e:
+            fila['error_lectura'] = str(e)
+            print(f'❌ No se pudo leer {listado["ruta"]}: {e}')
+            continue
+
+        fila['inscritos'] = len(estudiantes)
+        for estudiante in estudiantes:
+            if estudiante.documento in origen_documento:
+                fila['repetidos'] += 1
+                continue
+            origen_documento[estudiante.documento] = listado['carpeta']
+            if estado is not None and not estado.debe_procesar(estudiante.documento):
+                fila['con_pdf'] += 1
+                continue
+            destinos[estudiante.documento] = fila['carpeta']
+            pendientes.append(estudiante)
+            fila['programados'] += 1
+
+    return pendientes, destinos, avance
+
+
+def limitar(pendientes, destinos, avance, limite):
+    """
+    Deja solo los primeros `limite` pendientes y corrige los programados de cada listado
+
+    Returns:
+        tuple: (pendientes, destinos) recortados
+    """
+    pendientes = pendientes[:limite]
+    destinos = {estudiante.documento: destinos[estudiante.documento] for estudiante in pendientes}
+    clave_de_carpeta = {fila['carpeta']: clave for clave, fila in avance.items()}
+    for fila in avance.values():
+        fila['programados'] = 0
+    for carpeta in destinos.values():
+        avance[clave_de_carpeta[carpeta]]['programados'] += 1
+    return pendientes, destinos
+
+
+def preparar_plan(listados, carpeta_salida, estado, limite=None):
+    """
+    Planifica, muestra el plan y aplica el límite de prueba
+
+    Returns:
+        tuple: (pendientes, destinos, avance) como planificar
+    """
+    pendientes, destinos, avance = planificar(listados, carpeta_salida, estado)
+    mostrar_plan(avance)
+    if limite:
+        pendientes, destinos = limitar(pendientes, destinos, avance, limite)
+        print(f'\n⚠️  Modo de prueba: procesando solo {len(pendientes)} estudiante(s)')
+    if not pendientes:
+        print('\n🎉 No hay estudiantes pendientes en ningún listado')
+    return pendientes, destinos, avance
+
+
+def mostrar_plan(avance):
+    """Tabla con los conteos de cada listado"""
+    print('\n' + '='*80)
+    print('📋 LISTADOS')
+    print('='*80)
+    print(f'   {"Listado":<34} {"Inscritos":>9} {"Repetidos":>9} {"Con PDF":>8} {"Programados":>11}')
+    for fila in avance.values():
+        if fila['error_lectura']:
+            print(f'   {fila["nombre"][:34]:<34} ❌ {fila["error_lectura"]}')
+            continue
+        print(f'   {fila["nombre"][:34]:<34} {fila["inscritos"]:>9} {fila["repetidos"]:>9} '
+              f'{fila["con_pdf"]:>8} {fila["programados"]:>11}')
+    total = sum(fila['programados'] for fila in avance.values())
+    print(f'\n   Total pendientes: {total}')
+
+
+def contar_resultados(descargador, destinos, avance):
+    """Suma los exitosos, errores y sin resultados del descargador a cada listado"""
+    listado_de_carpeta = {fila['carpeta']: clave for clave, fila in avance.items()}
+    for campo, registros in [('exitosos', descargador.estudiantes_exitosos),
+                             ('errores', descargador.estudiantes_error),
+                             ('sin_resultados', descargador.estudiantes_sin_resultados)]:
+        for registro in registros:
+            clave = listado_de_carpeta.get(destinos.get(registro['documento']))
+            if clave is not None:
+                avance[clave][campo] += 1
+
+
+def mostrar_avance(avance):
+    """Resultado final por listado"""
+    print('\n' + '='*80)
+    print('📊 AVANCE POR LISTADO')
+    print('='*80)
+    print(f'   {"Listado":<34} {"Exitosos":>8} {"Errores":>8} {"Sin res.":>8} {"Programados":>11}')
+    for fila in avance.values():
+        if fila['error_lectura']:
+            continue
+        print(f'   {fila["nombre"][:34]:<34} {fila["exitosos"]:>8} {fila["errores"]:>8} '
+              f'{fila["sin_resultados"]:>8} {fila["programados"]:>11}')
+
+
+def guardar_avance(avance, carpeta_logs):
+    """Guarda el avance por listado en logs/lote_<timestamp>.json"""
+    ruta = os.path.join(carpeta_logs, f'lote_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(list(avance.values()), f, ensure_ascii=False, indent=2)
+    print(f'\n📝 Avance guardado en: {ruta}')
+    return ruta
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Descarga en lote de varios listados de inscritos')
+    parser.add_argument('origen', help='Carpeta con archivos de inscritos o manifiesto (.json o .txt)')
+    parser.add_argument('--salida', default=None,
+                        help='Carpeta base de los PDFs (por defecto la del descargador)')
+    parser.add_argument('--sesiones', type=int, default=1,
+                        help='Navegadores simultáneos (2 o más = modo concurrente)')
+    parser.add_argument('--ventanas', type=int, default=1,
+                        help='Ventanas en modo pipeline (solo con --sesiones 1)')
+    parser.add_argument('--reciclar-cada', type=int, default=None,
+                        help='En modo concurrente, reinicia cada navegador tras K estudiantes')
+    parser.add_argument('--limite', type=int, default=None,
+                        help='Procesar solo los primeros N pendientes (prueba)')
+    parser.add_argument('--sin-reanudar', action='store_true',
+                        help='No omitir los estudiantes que ya tienen PDF válido')
+    parser.add_argument('--solo-planificar', action='store_true',
+                        help='Mostrar el plan por listado sin abrir el navegador')
+    args = parser.parse_args()
+
+    print('='*80)
+    print('🎓 DESCARGA EN LOTE DE RESULTADOS ICFES SABER 11')
+    print('='*80)
+
+    if not os.path.exists(args.origen):
+        print(f'\n❌ Error: No se encuentra {args.origen}')
+        sys.exit(1)
+
+    listados = buscar_listados(args.origen)
+    if not listados:
+        print(f'\n❌ No se encontraron archivos de inscritos en {args.origen}')
+        sys.exit(1)
+    print(f'\n📂 {len(listados)} listado(s) encontrados')
+
+    modulo = cargar_descargador()
+    carpeta_salida = args.salida or modulo.CARPETA_PDFS
+
+    if args.solo_planificar:
+        # Sin navegador ni escrituras: el diario se lee y los PDFs de la salida se cuentan en memoria
+        estado = None if args.sin_reanudar else EstadoDescargas(modulo.ARCHIVO_ESTADO, carpeta_salida,
+                                                                  solo_lectura=True)
+        preparar_plan(listados, carpeta_salida, estado, args.limite)
+        print('\n✅ Plan listo (no se abrió el navegador ni se modificó el diario)')
+        return
+
+    descargador = modulo.DescargadorICFES(modo_headless=False)
+    destinos, avance = {}, {}
+    procesado = False
+
+    try:
+        descargador.iniciar_registro(carpeta_salida)
+        estado = None if args.sin_reanudar else descargador.estado
+        pendientes, destinos, avance = preparar_plan(listados, carpeta_salida, estado, args.limite)
+        if not pendientes:
+            return
+
+        descargador.destinos = destinos
+        procesado = True
+        descargador.procesar_estudiantes(
+            pendientes, args.ventanas, args.sesiones,
+            args.reciclar_cada or modulo.RECICLAR_CADA_POR_DEFECTO
+        )
+        descargador.finalizar_ejecucion(len(pendientes))
+
+    except KeyboardInterrupt:
+        print('\n⏹️  Interrumpido: lo ya descargado queda en el diario de estado')
+    finally:
+        descargador.cerrar_registro()
+
+    if procesado:
+        contar_resultados(descargador, destinos, avance)
+        mostrar_avance(avance)
+        guardar_avance(avance, modulo.CARPETA_LOGS)
+
+    print('\n✅ Proceso completado!')
+
+
+if __name__ == '__main__':
+    main()
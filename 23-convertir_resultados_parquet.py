@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Convierte los Excel de resultados al formato Parquet que leen los dashboards.
+
+Por cada RESULTADOS-*.xlsx se escriben, a su lado, <base>.parquet (un
+estudiante por fila, columnas tipadas) y <base>.resumen.parquet (promedios
+por año y avance). Los dashboards leen el Parquet con memory-map y solo
+vuelven al Excel si el Parquet falta o se escribió desde otra versión del
+Excel.
+
+Con --exportar se hace lo contrario: se regenera el Excel desde el Parquet.
+
+Uso:
+    python3 23-convertir_resultados_parquet.py
+    python3 23-convertir_resultados_parquet.py RESULTADOS-ICFES-AULA-REGULAR-2025.xlsx
+    python3 23-convertir_resultados_parquet.py --exportar RESULTADOS-ICFES-AULA-REGULAR-2025.xlsx
+"""
+
+import argparse
+import os
+import sys
+
+from resultados_icfes import (PARQUET_DISPONIBLE, convertir_a_parquet, exportar_excel,
+                              guardar_parquet, leer_parquet, rutas_parquet)
+
+# Los mismos archivos que buscan los dashboards
+ARCHIVOS_RESULTADOS = [
+    'ITC-RESULTADOS-ICFES-2025-ADAPTADO.xlsx',
+    'RESULTADOS-ICFES-AULA-REGULAR-2025.xlsx',
+    'RESULTADOS-ICFES-EJEMPLO.xlsx',
+]
+
+
+def convertir(ruta_excel):
+    """Convierte un Excel y muestra lo que se escribió"""
+    libro = convertir_a_parquet(ruta_excel)
+    ruta_estudiantes, ruta_resumen = rutas_parquet(ruta_excel)
+    print(f'✅ {ruta_excel}')
+    print(f'   → {ruta_estudiantes} ({len(libro["estudiantes"])} estudiantes)')
+    if libro['resumen'] is not None:
+        print(f'   → {ruta_resumen} (filas: {", ".join(libro["resumen"].index)})')
+    else:
+        print('   ⚠️  Sin filas de resumen (promedios por año / avance)')
+
+
+def exportar(ruta_excel):
+    """Regenera un Excel desde sus Parquet (y les pone la huella del Excel nuevo)"""
+    libro = leer_parquet(ruta_excel)
+    total = exportar_excel(libro, ruta_excel)
+    guardar_parquet(libro, ruta_excel)
+    print(f'✅ {ruta_excel} regenerado desde {rutas_parquet(ruta_excel)[0]} ({total} estudiantes)')
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Convierte los Excel de resultados a Parquet')
+    parser.add_argument('archivos', nargs='*',
+                        help='Excel de resultados (por defecto los que usan los dashboards)')
+    parser.add_argument('--exportar', action='store_true',
+                        help='Regenerar los Excel desde sus Parquet')
+    args = parser.parse_args()
+
+    print('='*80)
+    print('📦 RESULTADOS ICFES: EXCEL ⇄ PARQUET')
+    print('='*80)
+
+    if not PARQUET_DISPONIBLE:
+        print('\n❌ Falta pyarrow: pip install pyarrow')
+        sys.exit(1)
+
+    archivos = args.archivos or ARCHIVOS_RESULTADOS
+    origen = (lambda ruta: rutas_parquet(ruta)[0]) if args.exportar else (lambda ruta: ruta)
+    disponibles = [ruta for ruta in archivos if os.path.exists(origen(ruta))]
+    for ruta in archivos:
+        if ruta not in disponibles and args.archivos:
+            print(f'\n⚠️  No se encuentra {origen(ruta)}')
+    if not disponibles:
+        print('\n❌ No hay archivos para convertir')
+        sys.exit(1)
+
+    errores = 0
+    for ruta in disponibles:
+        print()
+        try:
+            if args.exportar:
+                exportar(ruta)
+            else:
+                convertir(ruta)
+        except Exception as e:
+            print(f'❌ {ruta}: {e}')
+            errores += 1
+
+    print(f'\n✅ Proceso completado: {len(disponibles) - errores} de {len(disponibles)} archivo(s)')
+    if errores:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Importa Excel de resultados al almacén histórico (varios años e instituciones).
+
+Los archivos se guardan en datos/resultados/anio=.../institucion=.../grupo=...
+(ver almacen_historico.py). Todos los archivos de una llamada son del mismo
+año e institución y se guardan juntos; reimportar la misma institución y año
+reemplaza sus datos, así que una reimportación debe incluir todos sus archivos. Con --comparar se muestra la comparación de promedios entre dos
+años calculada desde los estudiantes guardados.
+
+Uso:
+    python3 24-importar_resultados_almacen.py RESULTADOS-ICFES-AULA-REGULAR-2025.xlsx --anio 2025 \\
+        --institucion "Instituto Tecnológico Calarcá"
+    python3 24-importar_resultados_almacen.py --listar
+    python3 24-importar_resultados_almacen.py --comparar 2024 2025 --institucion "Instituto Tecnológico Calarcá"
+"""
+
+import argparse
+import os
+import sys
+
+from almacen_historico import ARROW_DISPONIBLE, CARPETA_ALMACEN, AlmacenHistorico
+
+
+def mostrar_contenido(almacen):
+    """Estudiantes por año e institución"""
+    particiones = almacen.particiones_guardadas()
+    if particiones.empty:
+        print('\n📭 El almacén está vacío')
+        return
+    print('\n📋 CONTENIDO DEL ALMACÉN')
+    for (anio, institucion), grupos in particiones.groupby(['anio', 'institucion']):
+        print(f'   {anio}  {institucion:<40} grupos: {", ".join(grupos["grupo"])}')
+    promedios = almacen.promedios_por_anio()
+    print('\n   Estudiantes por año: ' + ', '.join(
+        f'{anio}: {int(total)}' for anio, total in promedios['Estudiantes'].items()))
+
+
+def mostrar_comparacion(almacen, anio_base, anio_comparado, institucion):
+    """Promedios de los dos años y avance por área"""
+    comparacion = almacen.comparar_anios(anio_base, anio_comparado, institucion)
+    if comparacion is None:
+        print(f'\n⚠️  No hay datos de {anio_base} y {anio_comparado}'
+              + (f' para {institucion}' if institucion else ''))
+        return
+    print(f'\n📊 COMPARACIÓN {anio_base} → {anio_comparado}')
+    print(comparacion.T.round(1).to_string())
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Importa resultados al almacén histórico')
+    parser.add_argument('archivos', nargs='*', help='Excel de resultados a importar')
+    parser.add_argument('--anio', type=int, help='Año de los resultados importados')
+    parser.add_argument('--institucion', help='Nombre de la institución')
+    parser.add_argument('--almacen', default=CARPETA_ALMACEN, help='Carpeta del almacén')
+    parser.add_argument('--listar', action='store_true', help='Mostrar el contenido del almacén')
+    parser.add_argument('--comparar', nargs=2, type=int, metavar=('BASE', 'COMPARADO'),
+                        help='Comparar promedios entre dos años')
+    args = parser.parse_args()
+
+    print('='*80)
+    print('🗄️  ALMACÉN HISTÓRICO DE RESULTADOS ICFES')
+    print('='*80)
+
+    if not ARROW_DISPONIBLE:
+        print('\n❌ Falta pyarrow: pip install pyarrow')
+        sys.exit(1)
+
+    if args.archivos and (args.anio is None or not args.institucion):
+        parser.error('para importar se necesitan --anio y --institucion')
+
+    almacen = AlmacenHistorico(args.almacen)
+
+    faltantes = [ruta for ruta in args.archivos if not os.path.exists(ruta)]
+    for ruta in faltantes:
+        print(f'\n❌ No se encuentra {ruta}')
+    if faltantes:
+        # Importar solo una parte reemplazaría la institución-año sin los archivos que faltan
+        sys.exit(1)
+
+    if args.archivos:
+        # Todos los archivos son del mismo año e institución: se guardan juntos en una sola escritura
+        total = almacen.importar_excel(args.archivos, args.anio, args.institucion)
+        print(f'\n✅ {", ".join(args.archivos)}: {total} estudiantes → {args.anio} / {args.institucion}')
+
+    if args.listar or not (args.archivos or args.comparar):
+        mostrar_contenido(almacen)
+
+    if args.comparar:
+        mostrar_comparacion(almacen, args.comparar[0], args.comparar[1], args.institucion)
+
+    print('\n✅ Proceso completado!')
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,8 @@ al formato esperado por la aplicación Streamlit
 import pandas as pd
 import re
 
+from resultados_icfes import PARQUET_DISPONIBLE, convertir_a_parquet, rutas_parquet
+
 # Leer archivo original
 df_original = pd.read_excel('ITC-RESULTADOS-ICFES-2025.xlsx')
 
@@ -92,3 +94,7 @@ print(f"   Filas: {len(df_adaptado)}")
 print("\n📋 Primeras 3 filas:")
 print(df_adaptado.head(3).to_string())
 
+# Guardar también el Parquet que leen los dashboards
+if PARQUET_DISPONIBLE:
+    convertir_a_parquet('ITC-RESULTADOS-ICFES-2025-ADAPTADO.xlsx')
+    print(f"\n📦 Parquet para los dashboards: {rutas_parquet('ITC-RESULTADOS-ICFES-2025-ADAPTADO.xlsx')[0]}")
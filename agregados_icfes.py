@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agregados incrementales de los resultados (promedios, dispersión, percentiles).
+
+Los extractores registran aquí cada estudiante apenas obtienen sus puntajes.
+Por cada institución, año, grupo y columna de puntaje se mantienen la cantidad, la suma,
+la suma de cuadrados y un histograma de un punto por casilla (0-100 por
+área, 0-500 el global). Con eso se obtienen promedio, desviación, mínimo,
+máximo, moda y percentiles sin volver a recorrer a los estudiantes: los
+percentiles salen del histograma acumulado (exactos para puntajes enteros,
+que es como los publica el ICFES).
+
+Si llega de nuevo un documento ya registrado (una corrección), primero se
+descuenta su aporte anterior y luego se suma el nuevo. Cada cambio se anexa
+(con su fila anterior) a logs/agregados_resultados.filas.jsonl, un diario
+que solo crece; logs/agregados_resultados.json guarda los acumuladores y
+hasta qué byte del diario los incluyen. Al abrir se reproducen las líneas
+posteriores a ese byte (lo que quedó sin guardar antes de una caída), así
+que guardar() no reescribe a los estudiantes. Varios extractores pueden
+escribir a la vez: antes de anexar, cada uno bloquea el diario y aplica las
+líneas que anexaron los demás, así que el byte guardado nunca cubre líneas
+que no están en sus acumuladores. Las filas por documento solo se leen del
+diario cuando hay que registrar algo; los dashboards leen el JSON sin
+recalcular nada.
+"""
+
+import json
+import math
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from almacen_historico import clave_institucion
+from estado_descargas import normalizar_documento
+from resultados_icfes import ANIO_RESULTADOS, AREAS, COLUMNAS_PUNTAJE
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+ARCHIVO_AGREGADOS = os.path.join('logs', 'agregados_resultados.json')
+# Súbelo al cambiar la estructura del archivo: los agregados viejos se descartan
+VERSION_AGREGADOS = 2
+
+# Institución de los listados que procesan los extractores
+INSTITUCION = 'Instituto Tecnológico Calarcá'
+
+# Grupo que acumula a todos los estudiantes del año
+GRUPO_TOTAL = '*'
+PUNTAJE_MAXIMO = {**{area: 100 for area in AREAS}, 'Puntaje Global': 500}
+
+
+class Acumulador:
+    """Cantidad, suma, suma de cuadrados e histograma de una columna de puntajes"""
+
+    __slots__ = ('n', 'suma', 'suma_cuadrados', 'histograma')
+
+    def __init__(self, maximo):
+        """
+        Args:
+            maximo: Puntaje máximo de la columna (tamaño del histograma - 1)
+        """
+        self.n = 0
+        self.suma = 0.0
+        self.suma_cuadrados = 0.0
+        self.histograma = np.zeros(maximo + 1, dtype=np.int64)
+
+    def sumar(self, valor, signo=1):
+        """Suma (signo=1) o descuenta (signo=-1) un puntaje"""
+        casilla = min(max(int(round(valor)), 0), len(self.histograma) - 1)
+        self.n += signo
+        self.suma += signo * valor
+        self.suma_cuadrados += signo * valor * valor
+        self.histograma[casilla] += signo
+
+    def _valor_en(self, posicion, acumulado):
+        """Puntaje en la posición dada del grupo ordenado (0 = el menor)"""
+        return float(np.searchsorted(acumulado, posicion, side='right'))
+
+    def percentil(self, q):
+        """Percentil q (0-1) con interpolación lineal, como pandas.Series.quantile"""
+        if self.n == 0:
+            return None
+        acumulado = np.cumsum(self.histograma)
+        posicion = q * (self.n - 1)
+        inferior = self._valor_en(math.floor(posicion), acumulado)
+        superior = self._valor_en(math.ceil(posicion), acumulado)
+        return inferior + (superior - inferior) * (posicion - math.floor(posicion))
+
+    def estadisticas(self):
+        """
+        Estadísticas descriptivas (mismas claves que calcular_estadisticas del dashboard)
+
+        Returns:
+            dict, o None si no hay puntajes
+        """
+        if self.n == 0:
+            return None
+        promedio = self.suma / self.n
+        varianza = (self.suma_cuadrados - self.suma * self.suma / self.n) / (self.n - 1) if self.n > 1 else float('nan')
+        desviacion = math.sqrt(max(varianza, 0.0)) if not math.isnan(varianza) else float('nan')
+        ocupadas = np.flatnonzero(self.histograma)
+        minimo, maximo = float(ocupadas[0]), float(ocupadas[-1])
+        return {
+            'Promedio': promedio,
+            'Mediana': self.percentil(0.50),
+            'Moda': float(np.argmax(self.histograma)),
+            'Desv. Estándar': desviacion,
+            'Mínimo': minimo,
+            'Máximo': maximo,
+            'Percentil 25': self.percentil(0.25),
+            'Percentil 50': self.percentil(0.50),
+            'Percentil 75': self.percentil(0.75),
+            'Rango': maximo - minimo,
+            'Coef. Variación': (desviacion / promedio * 100) if promedio != 0 else 0,
+            'Estudiantes': self.n,
+        }
+
+    def a_dict(self):
+        """Forma guardable (histograma disperso)"""
+        return {
+            'n': self.n,
+            'suma': self.suma,
+            'suma_cuadrados': self.suma_cuadrados,
+            'histograma': {str(casilla): int(self.histograma[casilla]) for casilla in np.flatnonzero(self.histograma)},
+        }
+
+    @classmethod
+    def desde_dict(cls, datos, maximo):
+        """Reconstruye un acumulador guardado con a_dict"""
+        acumulador = cls(maximo)
+        acumulador.n = datos['n']
+        acumulador.suma = datos['suma']
+        acumulador.suma_cuadrados = datos['suma_cuadrados']
+        for casilla, cantidad in datos['histograma'].items():
+            acumulador.histograma[int(casilla)] = cantidad
+        return acumulador
+
+
+def puntajes_de(resultado):
+    """{columna: float} con los puntajes presentes de un resultado (dict o fila)"""
+    puntajes = {}
+    for columna in COLUMNAS_PUNTAJE:
+        valor = resultado.get(columna)
+        if valor is not None and not pd.isna(valor):
+            puntajes[columna] = float(valor)
+    return puntajes
+
+
+def bloquear_archivo(f):
+    """Bloqueo exclusivo de un archivo abierto (espera a que lo suelte el otro proceso)"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def desbloquear_archivo(f):
+    """Suelta el bloqueo de bloquear_archivo"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def ruta_diario_filas(ruta):
+    """Diario de filas que acompaña a un archivo de agregados"""
+    return f'{os.path.splitext(ruta)[0]}.filas.jsonl'
+
+
+class AgregadosResultados:
+    """Agregados por institución, año, grupo y columna, actualizados estudiante por estudiante"""
+
+    def __init__(self, ruta=ARCHIVO_AGREGADOS):
+        """
+        Carga los agregados guardados (si existen) y reproduce lo que quedó sin guardar
+
+        Args:
+            ruta: JSON donde se guardan (None = solo en memoria)
+        """
+        self.ruta = ruta
+        self.ruta_diario = ruta_diario_filas(ruta) if ruta else None
+        # Filas por documento: se leen del diario la primera vez que se necesitan
+        self._filas = None if ruta else {}
+        self.acumuladores = {}
+        self.actualizaciones = 0
+        self.bytes_diario = 0
+        self._cargar()
+
+    def _cargar(self):
+        """Lee el archivo guardado (lo ignora si no existe o es de otra versión) y reproduce el diario"""
+        if not self.ruta:
+            return
+        datos = None
+        if os.path.exists(self.ruta):
+            try:
+                with open(self.ruta, 'r', encoding='utf-8') as f:
+                    datos = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f'⚠️  No se pudieron leer los agregados ({self.ruta}): {e}')
+        if datos is not None and datos.get('version') == VERSION_AGREGADOS:
+            tamano_diario = os.path.getsize(self.ruta_diario) if os.path.exists(self.ruta_diario) else 0
+            if datos.get('bytes_diario', 0) <= tamano_diario:
+                self.actualizaciones = datos.get('actualizaciones', 0)
+                self.bytes_diario = datos.get('bytes_diario', 0)
+                for entrada in datos['acumuladores']:
+                    clave = (entrada['institucion'], entrada['anio'], entrada['grupo'], entrada['columna'])
+                    self.acumuladores[clave] = Acumulador.desde_dict(entrada, PUNTAJE_MAXIMO[entrada['columna']])
+            else:
+                print(f'⚠️  El diario {self.ruta_diario} es más corto que los agregados: se reconstruyen desde él')
+        self._reproducir()
+
+    def _leer_diario(self, desde=0):
+        """Registros del diario a partir de un byte; ignora una última línea truncada por un fallo"""
+        if not os.path.exists(self.ruta_diario):
+            return
+        with open(self.ruta_diario, 'rb') as f:
+            f.seek(desde)
+            for linea in f:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    yield json.loads(linea.decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    continue
+
+    def _reproducir(self, f=None):
+        """
+        Aplica las líneas del diario posteriores a bytes_diario (las de otra ejecución o sin guardar)
+
+        Args:
+            f: Diario ya abierto en binario (None = abrirlo para leer)
+        """
+        if f is None:
+            if not os.path.exists(self.ruta_diario):
+                return
+            with open(self.ruta_diario, 'rb') as diario:
+                self._reproducir(diario)
+            return
+        f.seek(self.bytes_diario)
+        for linea in f:
+            if not linea.endswith(b'\n'):
+                # Línea truncada por un fallo: se salta (anexar empieza la siguiente en otra línea)
+                self.bytes_diario += len(linea)
+                break
+            self.bytes_diario += len(linea)
+            try:
+                registro = json.loads(linea.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue
+            if registro['anterior'] is not None:
+                self._aplicar(registro['anterior'], -1)
+            self._aplicar(registro['fila'], 1)
+            if self._filas is not None:
+                self._filas[registro['documento']] = registro['fila']
+            self.actualizaciones += 1
+
+    @property
+    def filas(self):
+        """{documento: fila} con la última fila registrada de cada estudiante"""
+        if self._filas is None:
+            self._filas = {registro['documento']: registro['fila'] for registro in self._leer_diario()}
+        return self._filas
+
+    def guardar(self):
+        """Escribe los acumuladores de forma atómica (las filas ya están en el diario)"""
+        carpeta = os.path.dirname(self.ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        datos = {
+            'version': VERSION_AGREGADOS,
+            'actualizado': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'actualizaciones': self.actualizaciones,
+            'bytes_diario': self.bytes_diario,
+            'acumuladores': [
+                {'institucion': institucion, 'anio': anio, 'grupo': grupo, 'columna': columna,
+                 **acumulador.a_dict()}
+                for (institucion, anio, grupo, columna), acumulador in self.acumuladores.items()
+            ],
+        }
+        ruta_temporal = f'{self.ruta}.{os.getpid()}.tmp'
+        try:
+            with open(ruta_temporal, 'w', encoding='utf-8') as f:
+                json.dump(datos, f, ensure_ascii=False)
+            os.replace(ruta_temporal, self.ruta)
+        except OSError as e:
+            print(f'⚠️  No se pudieron guardar los agregados: {e}')
+
+    @contextmanager
+    def _diario_bloqueado(self):
+        """
+        Bloquea el diario y aplica antes lo que anexaron otros procesos
+
+        Produce la función con que se anexan los registros (None = solo en memoria).
+        """
+        if not self.ruta_diario:
+            yield None
+            return
+        carpeta = os.path.dirname(self.ruta_diario)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        with open(self.ruta_diario, 'a+b') as f:
+            bloquear_archivo(f)
+            try:
+                self._reproducir(f)
+
+                def anexar(registros):
+                    """Escribe registros al final del diario con un solo fsync"""
+                    if not registros:
+                        return
+                    # Si el diario termina en una línea truncada, lo nuevo empieza en otra línea
+                    inicio = b''
+                    if f.seek(0, os.SEEK_END) > 0:
+                        f.seek(-1, os.SEEK_END)
+                        inicio = b'' if f.read(1) == b'\n' else b'\n'
+                    f.write(inicio + b''.join(
+                        (json.dumps(registro, ensure_ascii=False) + '\n').encode('utf-8') for registro in registros
+                    ))
+                    f.flush()
+                    os.fsync(f.fileno())
+                    self.bytes_diario = f.tell()
+
+                yield anexar
+            finally:
+                desbloquear_archivo(f)
+
+    def _aplicar(self, fila, signo):
+        """Suma o descuenta una fila registrada en su grupo y en el total del año"""
+        for grupo in {fila['grupo'], GRUPO_TOTAL}:
+            for columna, valor in fila['puntajes'].items():
+                clave = (fila['institucion'], fila['anio'], grupo, columna)
+                if clave not in self.acumuladores:
+                    self.acumuladores[clave] = Acumulador(PUNTAJE_MAXIMO[columna])
+                self.acumuladores[clave].sumar(valor, signo)
+
+    def _registrar(self, resultado, anio, grupo, institucion):
+        """
+        Aplica en memoria los puntajes de un estudiante
+
+        Returns:
+            tuple: (estado, registro del diario o None si no hubo cambios)
+        """
+        documento = normalizar_documento(resultado['Número de documento'])
+        if grupo is None:
+            grupo = resultado.get('Grupo') or ''
+            grupo = '' if pd.isna(grupo) else str(grupo).strip()
+        fila = {'institucion': clave_institucion(institucion), 'anio': int(anio), 'grupo': grupo,
+                'puntajes': puntajes_de(resultado)}
+
+        anterior = self.filas.get(documento)
+        if anterior == fila:
+            return 'sin_cambios', None
+        if anterior is not None:
+            self._aplicar(anterior, -1)
+        self._aplicar(fila, 1)
+        self.filas[documento] = fila
+        self.actualizaciones += 1
+        registro = {'documento': documento, 'fila': fila, 'anterior': anterior}
+        return ('corregido' if anterior is not None else 'nuevo'), registro
+
+    def actualizar(self, resultado, anio=ANIO_RESULTADOS, grupo=None, institucion=INSTITUCION):
+        """
+        Registra (o corrige) los puntajes de un estudiante y lo anexa al diario
+
+        Args:
+            resultado: dict con 'Número de documento' y las columnas de puntaje
+            anio: Año de los resultados
+            grupo: Grupo del estudiante (por defecto resultado['Grupo'] o '')
+            institucion: Institución del estudiante
+
+        Returns:
+            str: 'nuevo', 'corregido' o 'sin_cambios'
+        """
+        with self._diario_bloqueado() as anexar:
+            estado, registro = self._registrar(resultado, anio, grupo, institucion)
+            if anexar is not None and registro is not None:
+                anexar([registro])
+        return estado
+
+    def actualizar_lote(self, resultados, anio=ANIO_RESULTADOS, institucion=INSTITUCION):
+        """
+        Registra varios resultados con una sola escritura del diario
+
+        Args:
+            resultados: DataFrame de resultados o lista de dicts
+
+        Returns:
+            dict con la cantidad de 'nuevo', 'corregido' y 'sin_cambios'
+        """
+        if isinstance(resultados, pd.DataFrame):
+            resultados = resultados.to_dict('records')
+        conteo = {'nuevo': 0, 'corregido': 0, 'sin_cambios': 0}
+        registros = []
+        with self._diario_bloqueado() as anexar:
+            for resultado in resultados:
+                estado, registro = self._registrar(resultado, anio, None, institucion)
+                conteo[estado] += 1
+                if registro is not None:
+                    registros.append(registro)
+            if anexar is not None:
+                anexar(registros)
+        return conteo
+
+    def __len__(self):
+        return len(self.filas)
+
+    def estadisticas(self, columna, anio=ANIO_RESULTADOS, grupo=GRUPO_TOTAL, institucion=INSTITUCION):
+        """Estadísticas de una columna (ver Acumulador.estadisticas), o None si no hay datos"""
+        acumulador = self.acumuladores.get((clave_institucion(institucion), int(anio), grupo, columna))
+        return acumulador.estadisticas() if acumulador is not None else None
+
+    def anios(self, institucion=INSTITUCION):
+        """Años con estudiantes registrados de una institución"""
+        clave = clave_institucion(institucion)
+        return sorted({anio for i, anio, grupo, _ in self.acumuladores if i == clave and grupo == GRUPO_TOTAL})
+
+    def grupos(self, anio=ANIO_RESULTADOS, institucion=INSTITUCION):
+        """Grupos con estudiantes registrados de una institución en un año"""
+        clave = clave_institucion(institucion)
+        return sorted({grupo for i, a, grupo, _ in self.acumuladores
+                       if i == clave and a == int(anio) and grupo != GRUPO_TOTAL})
+
+    def promedios_por_anio(self, grupo=GRUPO_TOTAL, institucion=INSTITUCION):
+        """
+        Promedio de cada columna por año (misma forma que AlmacenHistorico.promedios_por_anio)
+
+        Returns:
+            DataFrame con índice = año y columnas COLUMNAS_PUNTAJE + 'Estudiantes'
+        """
+        clave = clave_institucion(institucion)
+        filas = {}
+        for anio in self.anios(institucion):
+            fila = {}
+            for columna in COLUMNAS_PUNTAJE:
+                acumulador = self.acumuladores.get((clave, anio, grupo, columna))
+                fila[columna] = acumulador.suma / acumulador.n if acumulador is not None and acumulador.n else np.nan
+            global_ = self.acumuladores.get((clave, anio, grupo, 'Puntaje Global'))
+            fila['Estudiantes'] = global_.n if global_ is not None else 0
+            filas[anio] = fila
+        return pd.DataFrame.from_dict(filas, orient='index', columns=COLUMNAS_PUNTAJE + ['Estudiantes'])
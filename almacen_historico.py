@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Almacén de resultados de varios años e instituciones (Parquet particionado).
+
+Cada estudiante se guarda con sus puntajes en un dataset Parquet particionado
+al estilo Hive:
+
+    datos/resultados/anio=2025/institucion=instituto_tecnologico_calarca/grupo=11A/parte-0.parquet
+
+Las consultas filtran por partición (solo se abren los archivos del año,
+institución o grupo pedidos) y leen solo las columnas necesarias, así que
+comparar dos años entre cientos de miles de estudiantes se resuelve con un
+recorrido de columnas y una agregación en Arrow, sin pasar por pandas fila a
+fila.
+
+Reimportar una institución-año reemplaza todos sus grupos: la partición
+nueva se escribe en una carpeta temporal oculta del almacén y se cambia por
+la anterior con renombres, así que una consulta nunca ve la institución a
+medio escribir. Los estudiantes se ordenan por grupo antes de escribir para
+que cada archivo quede con pocos row groups grandes. Cada escritura
+actualiza el archivo _actualizado, cuya fecha sirve de versión del almacén
+para las cachés de los dashboards.
+"""
+
+import os
+import re
+import shutil
+import unicodedata
+from urllib.parse import unquote
+
+import pandas as pd
+
+from resultados_icfes import COLUMNAS_CANONICAS, COLUMNAS_PUNTAJE, COLUMNAS_TEXTO, cargar_resultados
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    ARROW_DISPONIBLE = True
+except ImportError:
+    ARROW_DISPONIBLE = False
+
+CARPETA_ALMACEN = os.path.join('datos', 'resultados')
+ARCHIVO_VERSION = '_actualizado'
+# Los datasets de Arrow ignoran las carpetas que empiezan con '.'
+PREFIJO_TEMPORAL = '.escribiendo-'
+# Filas por row group (con menos filas, un grupo entero queda en un solo row group)
+FILAS_POR_ROW_GROUP = 128 * 1024
+
+# Columnas guardadas en los archivos (Grupo va en la ruta de la partición)
+COLUMNAS_ARCHIVO = [columna for columna in COLUMNAS_CANONICAS if columna != 'Grupo']
+
+if ARROW_DISPONIBLE:
+    ESQUEMA_PARTICIONES = pa.schema([
+        ('anio', pa.int32()),
+        ('institucion', pa.string()),
+        ('grupo', pa.string()),
+    ])
+    ESQUEMA_ARCHIVO = pa.schema(
+        [(columna, pa.string()) for columna in COLUMNAS_TEXTO if columna != 'Grupo']
+        + [(columna, pa.float64()) for columna in COLUMNAS_PUNTAJE]
+    )
+
+
+def clave_institucion(nombre):
+    """'Instituto Tecnológico Calarcá' -> 'instituto_tecnologico_calarca'"""
+    texto = unicodedata.normalize('NFKD', str(nombre)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '_', texto.lower()).strip('_') or 'institucion'
+
+
+class AlmacenHistorico:
+    """Resultados por estudiante particionados por año, institución y grupo"""
+
+    def __init__(self, carpeta=CARPETA_ALMACEN):
+        """
+        Args:
+            carpeta: Raíz del dataset particionado
+        """
+        if not ARROW_DISPONIBLE:
+            raise ImportError('El almacén histórico necesita pyarrow: pip install pyarrow')
+        self.carpeta = carpeta
+        self.particiones = ds.partitioning(ESQUEMA_PARTICIONES, flavor='hive')
+
+    def version(self):
+        """Fecha de la última escritura (None si el almacén está vacío)"""
+        try:
+            return os.stat(os.path.join(self.carpeta, ARCHIVO_VERSION)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _marcar_version(self):
+        """Actualiza _actualizado tras una escritura"""
+        ruta = os.path.join(self.carpeta, ARCHIVO_VERSION)
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(pd.Timestamp.now().isoformat())
+
+    def agregar(self, estudiantes, anio, institucion):
+        """
+        Guarda los resultados de una institución en un año, reemplazando los anteriores
+
+        Args:
+            estudiantes: DataFrame con COLUMNAS_CANONICAS (Grupo vacío -> 'sin_grupo')
+            anio: Año de los resultados
+            institucion: Nombre de la institución (se guarda su clave)
+
+        Returns:
+            int: Número de estudiantes guardados
+        """
+        clave = clave_institucion(institucion)
+        relativa = os.path.join(f'anio={int(anio)}', f'institucion={clave}')
+        destino = os.path.join(self.carpeta, relativa)
+
+        tabla = pa.Table.from_pandas(estudiantes[COLUMNAS_ARCHIVO], schema=ESQUEMA_ARCHIVO, preserve_index=False)
+        grupos = estudiantes['Grupo'].fillna('').astype(str).str.strip().replace('', 'sin_grupo')
+        total = len(tabla)
+        tabla = tabla.append_column('anio', pa.array([int(anio)] * total, pa.int32()))
+        tabla = tabla.append_column('institucion', pa.array([clave] * total, pa.string()))
+        tabla = tabla.append_column('grupo', pa.array(grupos.tolist(), pa.string()))
+        # Ordenados por grupo, cada lote que reparte write_dataset cae casi entero en una partición
+        tabla = tabla.sort_by('grupo')
+
+        temporal = os.path.join(self.carpeta, f'{PREFIJO_TEMPORAL}{os.getpid()}')
+        if os.path.isdir(temporal):
+            shutil.rmtree(temporal)
+        try:
+            ds.write_dataset(
+                tabla, temporal, format='parquet', partitioning=self.particiones,
+                basename_template='parte-{i}.parquet', existing_data_behavior='error',
+                min_rows_per_group=FILAS_POR_ROW_GROUP, max_rows_per_group=FILAS_POR_ROW_GROUP
+            )
+            nueva = os.path.join(temporal, relativa)
+            if not os.path.isdir(nueva):
+                os.makedirs(nueva)
+            # Cambio con dos renombres: la versión anterior sale a la carpeta oculta y se borra con ella
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            if os.path.isdir(destino):
+                os.rename(destino, os.path.join(temporal, 'anterior'))
+            os.rename(nueva, destino)
+        finally:
+            shutil.rmtree(temporal, ignore_errors=True)
+        self._marcar_version()
+        return total
+
+    def importar_excel(self, rutas_excel, anio, institucion):
+        """
+        Agrega uno o varios Excel de resultados (o sus Parquet, si están al día)
+
+        Como agregar() reemplaza la institución-año completa, los archivos de
+        una misma institución y año se juntan y se guardan en una sola
+        escritura. Si un documento aparece en varios archivos queda el del
+        último.
+
+        Args:
+            rutas_excel: Ruta o lista de rutas de los Excel
+            anio: Año de los resultados
+            institucion: Nombre de la institución
+
+        Returns:
+            int: Número de estudiantes guardados
+        """
+        if isinstance(rutas_excel, str):
+            rutas_excel = [rutas_excel]
+        estudiantes = pd.concat([cargar_resultados(ruta)['estudiantes'] for ruta in rutas_excel],
+                                ignore_index=True)
+        estudiantes = estudiantes.drop_duplicates('Número de documento', keep='last')
+        return self.agregar(estudiantes, anio, institucion)
+
+    def _dataset(self):
+        """Dataset particionado (None si todavía no hay datos)"""
+        if self.version() is None:
+            return None
+        return ds.dataset(self.carpeta, format='parquet', partitioning=self.particiones)
+
+    @staticmethod
+    def _filtro(anios=None, institucion=None, grupo=None):
+        """Expresión de filtro sobre las particiones"""
+        condiciones = []
+        if anios is not None:
+            condiciones.append(ds.field('anio').isin([int(anio) for anio in anios]))
+        if institucion is not None:
+            condiciones.append(ds.field('institucion') == clave_institucion(institucion))
+        if grupo is not None:
+            condiciones.append(ds.field('grupo') == str(grupo))
+        filtro = None
+        for condicion in condiciones:
+            filtro = condicion if filtro is None else filtro & condicion
+        return filtro
+
+    def particiones_guardadas(self):
+        """
+        Años, instituciones y grupos presentes (solo recorre las carpetas)
+
+        Returns:
+            DataFrame con columnas anio, institucion, grupo
+        """
+        filas = []
+        for carpeta_anio in sorted(os.listdir(self.carpeta)) if os.path.isdir(self.carpeta) else []:
+            if not carpeta_anio.startswith('anio='):
+                continue
+            ruta_anio = os.path.join(self.carpeta, carpeta_anio)
+            for carpeta_institucion in sorted(os.listdir(ruta_anio)):
+                ruta_institucion = os.path.join(ruta_anio, carpeta_institucion)
+                for carpeta_grupo in sorted(os.listdir(ruta_institucion)):
+                    filas.append({
+                        'anio': int(carpeta_anio.split('=', 1)[1]),
+                        'institucion': unquote(carpeta_institucion.split('=', 1)[1]),
+                        'grupo': unquote(carpeta_grupo.split('=', 1)[1]),
+                    })
+        return pd.DataFrame(filas, columns=['anio', 'institucion', 'grupo'])
+
+    def anios(self, institucion=None):
+        """Años con resultados (de una institución, si se indica)"""
+        particiones = self.particiones_guardadas()
+        if institucion is not None:
+            particiones = particiones[particiones['institucion'] == clave_institucion(institucion)]
+        return sorted(particiones['anio'].unique().tolist())
+
+    def consultar(self, anios=None, institucion=None, grupo=None, columnas=None):
+        """
+        Estudiantes guardados, filtrando por partición
+
+        Args:
+            anios: Lista de años (None = todos)
+            institucion: Nombre o clave de la institución (None = todas)
+            grupo: Grupo (None = todos)
+            columnas: Columnas a leer (None = todas, con anio/institucion/grupo)
+
+        Returns:
+            DataFrame
+        """
+        dataset = self._dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=columnas or COLUMNAS_ARCHIVO + ['anio', 'institucion', 'grupo'])
+        return dataset.to_table(columns=columnas, filter=self._filtro(anios, institucion, grupo)).to_pandas()
+
+    def promedios_por_anio(self, anios=None, institucion=None, grupo=None):
+        """
+        Promedio de cada área y del puntaje global por año, calculado desde los estudiantes
+
+        Solo se leen las columnas de puntaje de las particiones pedidas y la
+        agregación se hace en Arrow.
+
+        Returns:
+            DataFrame con índice = año y columnas COLUMNAS_PUNTAJE + 'Estudiantes'
+        """
+        dataset = self._dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=COLUMNAS_PUNTAJE + ['Estudiantes'])
+        tabla = dataset.to_table(columns=['anio'] + COLUMNAS_PUNTAJE,
+                                 filter=self._filtro(anios, institucion, grupo))
+        agregados = tabla.group_by('anio').aggregate(
+            [(columna, 'mean') for columna in COLUMNAS_PUNTAJE]
+            + [('Puntaje Global', 'count', pc.CountOptions(mode='all'))]
+        )
+        promedios = agregados.to_pandas().set_index('anio').sort_index()
+        promedios.index.name = None
+        promedios = promedios.rename(columns={f'{columna}_mean': columna for columna in COLUMNAS_PUNTAJE})
+        return promedios.rename(columns={'Puntaje Global_count': 'Estudiantes'})[COLUMNAS_PUNTAJE + ['Estudiantes']]
+
+    def comparar_anios(self, anio_base, anio_comparado, institucion=None, grupo=None):
+        """
+        Comparación de promedios entre dos años (lo que muestra la pestaña de comparación)
+
+        Args:
+            anio_base: Año de referencia (p. ej. 2024)
+            anio_comparado: Año que se compara contra la referencia (p. ej. 2025)
+            institucion, grupo: Filtros opcionales
+
+        Returns:
+            DataFrame con índice [str(anio_comparado), str(anio_base), 'Avance']
+            y columnas COLUMNAS_PUNTAJE (la misma forma que la tabla de resumen
+            de resultados_icfes), o None si falta alguno de los dos años
+        """
+        promedios = self.promedios_por_anio([anio_base, anio_comparado], institucion, grupo)
+        if int(anio_base) not in promedios.index or int(anio_comparado) not in promedios.index:
+            return None
+        comparado = promedios.loc[int(anio_comparado), COLUMNAS_PUNTAJE].astype(float)
+        base = promedios.loc[int(anio_base), COLUMNAS_PUNTAJE].astype(float)
+        return pd.DataFrame(
+            [comparado, base, comparado - base],
+            index=[str(anio_comparado), str(anio_base), 'Avance']
+        )
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Almacén incremental de puntajes extraídos (SQLite).
+
+Cada estudiante se guarda apenas se extrae, con una transacción propia, así
+que una caída a mitad de la ejecución no pierde lo ya procesado. El Excel con
+el formato que esperan los dashboards se genera a demanda con exportar_excel().
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from estado_descargas import normalizar_documento
+from resultados_icfes import documento_para_excel
+
+# Columnas en el orden del Excel RESULTADOS-ICFES-*.xlsx
+COLUMNAS = [
+    'Grupo',
+    'Primer Apellido',
+    'Segundo Apellido',
+    'Primer Nombre',
+    'Segundo Nombre',
+    'Tipo de documento',
+    'Número de documento',
+    'Puntaje Global',
+    'Lectura Crítica',
+    'Matemáticas',
+    'Sociales y Ciudadanas',
+    'Ciencias Naturales',
+    'Inglés',
+]
+
+COLUMNAS_NUMERICAS = COLUMNAS[COLUMNAS.index('Puntaje Global'):]
+
+
+def _columna(nombre):
+    """Cita un nombre de columna con espacios/tildes para SQLite"""
+    return '"' + nombre.replace('"', '""') + '"'
+
+
+class AlmacenResultados:
+    """Tabla de resultados con un registro por número de documento"""
+
+    def __init__(self, ruta_db):
+        """
+        Abre (o crea) la base de datos de resultados
+
+        Args:
+            ruta_db: Ruta del archivo .sqlite
+        """
+        self.ruta_db = ruta_db
+        carpeta = os.path.dirname(ruta_db)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+
+        self.conexion = sqlite3.connect(ruta_db)
+        # WAL: cada estudiante es una escritura pequeña que sobrevive a una caída
+        self.conexion.execute('PRAGMA journal_mode=WAL')
+        self.conexion.execute('PRAGMA synchronous=NORMAL')
+
+        definiciones = ', '.join(
+            f'{_columna(nombre)} {"INTEGER" if nombre in COLUMNAS_NUMERICAS else "TEXT"}'
+            for nombre in COLUMNAS if nombre != 'Número de documento'
+        )
+        with self.conexion:
+            self.conexion.execute(
+                f'CREATE TABLE IF NOT EXISTS resultados ('
+                f'{_columna("Número de documento")} TEXT PRIMARY KEY, {definiciones}, '
+                f'actualizado TEXT)'
+            )
+            # Bases creadas antes de que existiera una columna (p. ej. Grupo): se agrega vacía
+            existentes = {fila[1] for fila in self.conexion.execute('PRAGMA table_info(resultados)')}
+            for nombre in COLUMNAS:
+                if nombre not in existentes:
+                    tipo = 'INTEGER' if nombre in COLUMNAS_NUMERICAS else 'TEXT'
+                    self.conexion.execute(f'ALTER TABLE resultados ADD COLUMN {_columna(nombre)} {tipo}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        """Cierra la conexión"""
+        self.conexion.close()
+
+    def guardar(self, resultado):
+        """
+        Inserta o reemplaza el resultado de un estudiante
+
+        Args:
+            resultado: dict con las claves de COLUMNAS (las faltantes quedan vacías)
+        """
+        valores = []
+        for nombre in COLUMNAS:
+            valor = resultado.get(nombre)
+            if nombre == 'Número de documento':
+                valor = normalizar_documento(valor)
+            elif valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+                valor = None
+            elif nombre in COLUMNAS_NUMERICAS:
+                valor = int(valor)
+            valores.append(valor)
+        valores.append(datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+        columnas = ', '.join(_columna(nombre) for nombre in COLUMNAS + ['actualizado'])
+        marcadores = ', '.join('?' for _ in valores)
+        with self.conexion:
+            self.conexion.execute(
+                f'INSERT OR REPLACE INTO resultados ({columnas}) VALUES ({marcadores})', valores
+            )
+
+    def documentos(self):
+        """Retorna el conjunto de números de documento ya guardados"""
+        cursor = self.conexion.execute(f'SELECT {_columna("Número de documento")} FROM resultados')
+        return {fila[0] for fila in cursor}
+
+    def contar(self):
+        """Número de estudiantes guardados"""
+        return self.conexion.execute('SELECT COUNT(*) FROM resultados').fetchone()[0]
+
+    def a_dataframe(self):
+        """Retorna todos los resultados con las columnas del Excel, en orden de apellidos"""
+        columnas = ', '.join(_columna(nombre) for nombre in COLUMNAS)
+        df = pd.read_sql_query(
+            f'SELECT {columnas} FROM resultados ORDER BY '
+            f'{_columna("Primer Apellido")}, {_columna("Segundo Apellido")}, {_columna("Primer Nombre")}',
+            self.conexion
+        )
+        for nombre in COLUMNAS_NUMERICAS:
+            df[nombre] = df[nombre].astype('Int64')
+        return df
+
+    def exportar_excel(self, ruta_excel):
+        """
+        Genera el Excel con el formato que esperan los dashboards
+
+        La base guarda el documento como texto (es la clave); en el Excel se
+        escribe como número, como en los archivos de resultados originales.
+
+        Returns:
+            int: Número de estudiantes exportados
+        """
+        df = self.a_dataframe()
+        df['Número de documento'] = df['Número de documento'].map(documento_para_excel).astype(object)
+        df.to_excel(ruta_excel, index=False)
+        return len(df)
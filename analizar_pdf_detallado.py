@@ -10,12 +10,20 @@ import re
 from pdf2image import convert_from_path
 import pytesseract
 from PIL import Image
+from cache_ocr import cache_por_defecto
 
 def extraer_texto_ocr(pdf_path, dpi=300):
-    """Extrae texto de todas las páginas del PDF"""
+    """Extrae texto de todas las páginas del PDF (reutiliza la caché OCR si ya se procesó)"""
     print(f'\n📄 Procesando: {pdf_path}')
     print(f'   DPI: {dpi}')
     
+    cache = cache_por_defecto()
+    config = {'dpi': dpi, 'lang': 'spa', 'modos': ['normal', 'psm6_si_falta'], 'modo': 'todas_las_paginas'}
+    entrada = cache.obtener(pdf_path, config)
+    if entrada is not None:
+        print(f'   ♻️  Texto OCR tomado de la caché ({cache.carpeta})')
+        return entrada['paginas']
+    
     try:
         # Convertir PDF a imágenes
         print('   🔄 Convirtiendo PDF a imágenes...')
@@ -32,10 +40,13 @@ def extraer_texto_ocr(pdf_path, dpi=300):
             print('      🔍 Extrayendo texto (modo normal)...')
             texto_normal = pytesseract.image_to_string(image, lang='spa')
             
-            print('      🔍 Extrayendo texto (modo con configuración)...')
-            # Configuración para mejorar detección de números
-            custom_config = r'--oem 3 --psm 6'
-            texto_config = pytesseract.image_to_string(image, lang='spa', config=custom_config)
+            # La segunda pasada (psm 6) solo si la primera no trae puntajes "NN/100"
+            texto_config = None
+            if '/100' not in texto_normal and '/500' not in texto_normal:
+                print('      🔍 Extrayendo texto (modo con configuración)...')
+                # Configuración para mejorar detección de números
+                custom_config = r'--oem 3 --psm 6'
+                texto_config = pytesseract.image_to_string(image, lang='spa', config=custom_config)
             
             textos_por_pagina.append({
                 'pagina': i,
@@ -45,6 +56,7 @@ def extraer_texto_ocr(pdf_path, dpi=300):
             
             print(f'      ✅ Texto extraído: {len(texto_normal)} caracteres')
         
+        cache.guardar(pdf_path, config, {'paginas': textos_por_pagina})
         return textos_por_pagina
         
     except Exception as e:
@@ -180,7 +192,7 @@ def main():
                 f.write('\n\n')
                 f.write('TEXTO CON CONFIGURACIÓN:\n')
                 f.write('-'*80 + '\n')
-                f.write(datos['texto_config'])
+                f.write(datos['texto_config'] or '(no fue necesaria: el modo normal ya trae puntajes)')
                 f.write('\n\n')
         
         print('✅ Análisis guardado en: analisis_detallado_ocr.txt')
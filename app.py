@@ -11,7 +11,7 @@ import plotly.graph_objects as go
 from datetime import datetime
 import numpy as np
 from scipy import stats
-import os
+from resultados_icfes import cargar_resultados, existen_resultados
 
 # Configuración de la página
 st.set_page_config(
@@ -73,11 +73,11 @@ def obtener_archivo_datos():
     # Prioridad 3: Archivo de ejemplo
     archivo_ejemplo = 'RESULTADOS-ICFES-EJEMPLO.xlsx'
 
-    if os.path.exists(archivo_itc):
+    if existen_resultados(archivo_itc):
         return archivo_itc, False  # False = no es ejemplo (datos reales ITC)
-    elif os.path.exists(archivo_real):
+    elif existen_resultados(archivo_real):
         return archivo_real, False  # False = no es ejemplo
-    elif os.path.exists(archivo_ejemplo):
+    elif existen_resultados(archivo_ejemplo):
         return archivo_ejemplo, True  # True = es ejemplo
     else:
         return None, None
@@ -91,18 +91,8 @@ def cargar_datos():
         return None, None
     
     try:
-        df = pd.read_excel(archivo)
-        
-        # Filtrar solo las filas de estudiantes reales (con grupo asignado)
-        df = df[df['Grupo'].notna()].copy()
-
-        # Crear nombre completo
-        df['Nombre Completo'] = (
-            df['Primer Nombre'].fillna('') + ' ' +
-            df['Segundo Nombre'].fillna('') + ' ' +
-            df['Primer Apellido'].fillna('') + ' ' +
-            df['Segundo Apellido'].fillna('')
-        ).str.strip().str.replace(r'\s+', ' ', regex=True)
+        # Parquet si está al día; el Excel solo si no (ver resultados_icfes)
+        df = cargar_resultados(archivo)['estudiantes']
         
         # Clasificación por puntaje global
         def clasificar_puntaje(puntaje):
@@ -14,7 +14,11 @@ from plotly.subplots import make_subplots
 import numpy as np
 from scipy import stats
 from datetime import datetime
+import os
 import warnings
+from resultados_icfes import AREAS, ANIO_RESULTADOS, COLUMNAS_PUNTAJE, cargar_resultados, rutas_parquet
+from almacen_historico import ARROW_DISPONIBLE, AlmacenHistorico
+from agregados_icfes import ARCHIVO_AGREGADOS, AgregadosResultados
 warnings.filterwarnings('ignore')
 
 # Configuración de la página
@@ -64,7 +68,8 @@ st.markdown("""
 
 # Constantes
 ARCHIVO_EXCEL = 'RESULTADOS-ICFES-AULA-REGULAR-2025.xlsx'
-AREAS = ['Lectura Crítica', 'Matemáticas', 'Sociales y Ciudadanas', 'Ciencias Naturales', 'Inglés']
+# Institución cuyos años se comparan en el almacén histórico
+INSTITUCION = 'Instituto Tecnológico Calarcá'
 COLORES = {
     'Lectura Crítica': '#1f77b4',
     'Matemáticas': '#ff7f0e',
@@ -73,75 +78,135 @@ COLORES = {
     'Inglés': '#9467bd',
     'Puntaje Global': '#8c564b'
 }
-
-@st.cache_data
-def cargar_datos():
-    """Carga y preprocesa los datos del Excel"""
+# Intervalos de los histogramas del puntaje global y de cada área
+NBINS_GLOBAL = 20
+NBINS_AREA = 15
+
+def version_datos():
+    """(tamaño, fecha de modificación) del Excel y de su Parquet; None si no hay ninguno"""
+    version = []
+    for ruta in (ARCHIVO_EXCEL,) + rutas_parquet(ARCHIVO_EXCEL):
+        try:
+            estado = os.stat(ruta)
+            version.append((estado.st_size, estado.st_mtime_ns))
+        except OSError:
+            version.append(None)
+    return tuple(version) if any(version) else None
+
+@st.cache_resource(max_entries=2)
+def cargar_libro(version):
+    """
+    Resultados ya separados, leídos una vez por versión de los archivos
+
+    Se lee el Parquet (memory-map) si está al día; el Excel solo si no.
+
+    Args:
+        version: Resultado de version_datos(); al cambiar un archivo se vuelve a leer
+
+    Returns:
+        dict de cargar_resultados, o None si no se pudo leer
+    """
+    if version is None:
+        st.error(f"No se encontró {ARCHIVO_EXCEL} ni su versión Parquet")
+        return None
     try:
-        df = pd.read_excel(ARCHIVO_EXCEL)
-
-        # ⚠️ CORRECCIÓN CRÍTICA: Filtrar solo las 36 filas de estudiantes reales
-        # Las últimas 4 filas (36-39) contienen estadísticas agregadas:
-        # - Fila 36: Vacía (separador)
-        # - Fila 37: Promedios 2025
-        # - Fila 38: Promedios 2024
-        # - Fila 39: Avance (diferencia 2025-2024)
-        # Estas filas NO deben incluirse en el análisis de estudiantes individuales
-
-        # Filtrar solo filas con Grupo no nulo (estudiantes reales)
-        df = df[df['Grupo'].notna()].copy()
-
-        # Validación: debe haber exactamente 36 estudiantes
-        if len(df) != 36:
-            st.warning(f"⚠️ Advertencia: Se esperaban 36 estudiantes, se encontraron {len(df)}")
-
-        # Limpiar datos adicionales
-        df = df.dropna(subset=['Número de documento'])
-
-        # Crear nombre completo
-        df['Nombre Completo'] = (
-            df['Primer Nombre'].fillna('') + ' ' +
-            df['Segundo Nombre'].fillna('') + ' ' +
-            df['Primer Apellido'].fillna('') + ' ' +
-            df['Segundo Apellido'].fillna('')
-        ).str.strip().str.replace(r'\s+', ' ', regex=True)
-
-        # Convertir puntajes a numérico
-        for area in AREAS + ['Puntaje Global']:
-            df[area] = pd.to_numeric(df[area], errors='coerce')
-
-        return df
+        libro = cargar_resultados(ARCHIVO_EXCEL)
     except Exception as e:
         st.error(f"Error al cargar el archivo: {e}")
         return None
+    return libro
 
-@st.cache_data
-def cargar_datos_historicos():
-    """Carga los datos históricos de comparación entre años"""
+def cargar_datos():
+    """Tabla de estudiantes de la versión actual del Excel (None si no se pudo leer)"""
+    libro = cargar_libro(version_datos())
+    return None if libro is None else libro['estudiantes']
+
+@st.cache_resource
+def abrir_almacen():
+    """Almacén histórico (None sin pyarrow)"""
+    return AlmacenHistorico() if ARROW_DISPONIBLE else None
+
+def version_agregados():
+    """Fecha de los agregados que mantienen los extractores (None si no hay)"""
     try:
-        df_completo = pd.read_excel(ARCHIVO_EXCEL)
-
-        # Extraer las filas de datos históricos
-        # Fila 37 (índice 37): Promedios 2025
-        # Fila 38 (índice 38): Promedios 2024
-        # Fila 39 (índice 39): Avance (diferencia)
-
-        if len(df_completo) >= 40:
-            datos_2025 = df_completo.iloc[37][AREAS + ['Puntaje Global']].to_dict()
-            datos_2024 = df_completo.iloc[38][AREAS + ['Puntaje Global']].to_dict()
-            avance = df_completo.iloc[39][AREAS + ['Puntaje Global']].to_dict()
-
-            return {
-                '2025': datos_2025,
-                '2024': datos_2024,
-                'Avance': avance
-            }
-        else:
-            return None
-    except Exception as e:
-        st.error(f"Error al cargar datos históricos: {e}")
+        return os.stat(ARCHIVO_AGREGADOS).st_mtime_ns
+    except OSError:
+        return None
+
+@st.cache_resource(max_entries=2)
+def cargar_agregados(version):
+    """
+    Agregados incrementales de los extractores, leídos una vez por versión
+
+    Son un archivo pequeño ya agregado: leerlo no recorre a los estudiantes.
+
+    Returns:
+        AgregadosResultados, o None si no hay archivo
+    """
+    return AgregadosResultados(ARCHIVO_AGREGADOS) if version is not None else None
+
+@st.cache_data(max_entries=4)
+def cargar_promedios_anuales(version, version_almacen, version_agr=None):
+    """
+    Promedios por año de la institución
+
+    Los años del almacén histórico se calculan desde los estudiantes; los
+    que no están ahí salen de las filas de resumen (oficiales) del Excel.
+    Los agregados de los extractores (resultados en curso, parciales) solo
+    cubren los años que no tienen ninguna de las dos fuentes.
+
+    Args:
+        version, version_almacen, version_agr: Versiones del Excel, del almacén
+            y de los agregados (claves de la caché)
+
+    Returns:
+        DataFrame con índice = año (texto) y columnas COLUMNAS_PUNTAJE
+    """
+    promedios = {}
+    almacen = abrir_almacen()
+    if almacen is not None and version_almacen is not None:
+        calculados = almacen.promedios_por_anio(institucion=INSTITUCION)
+        for anio, valores in calculados.iterrows():
+            promedios[str(anio)] = valores[COLUMNAS_PUNTAJE]
+
+    libro = cargar_libro(version)
+    if libro is not None and libro['resumen'] is not None:
+        for fila, valores in libro['resumen'].iterrows():
+            if fila != 'Avance':
+                promedios.setdefault(str(fila), valores[COLUMNAS_PUNTAJE])
+
+    agregados = cargar_agregados(version_agr)
+    if agregados is not None:
+        for anio, valores in agregados.promedios_por_anio(institucion=INSTITUCION).iterrows():
+            promedios.setdefault(str(anio), valores[COLUMNAS_PUNTAJE])
+
+    return pd.DataFrame(promedios).T.sort_index().astype(float)
+
+def promedios_anuales():
+    """Promedios por año de las versiones actuales del Excel, del almacén y de los agregados"""
+    almacen = abrir_almacen()
+    return cargar_promedios_anuales(version_datos(), almacen.version() if almacen is not None else None,
+                                    version_agregados())
+
+def cargar_datos_historicos(anio_base=ANIO_RESULTADOS - 1, anio_comparado=ANIO_RESULTADOS):
+    """
+    Promedios de dos años y el avance entre ambos
+
+    Returns:
+        dict {'<anio_comparado>': {...}, '<anio_base>': {...}, 'Avance': {...}}
+        con una entrada por área y 'Puntaje Global', o None si falta un año
+    """
+    promedios = promedios_anuales()
+    comparado, base = str(anio_comparado), str(anio_base)
+    if comparado not in promedios.index or base not in promedios.index:
         return None
 
+    return {
+        comparado: promedios.loc[comparado].to_dict(),
+        base: promedios.loc[base].to_dict(),
+        'Avance': (promedios.loc[comparado] - promedios.loc[base]).to_dict()
+    }
+
 def calcular_estadisticas(df, columna):
     """Calcula estadísticas descriptivas para una columna"""
     datos = df[columna].dropna()
@@ -160,6 +225,48 @@ def calcular_estadisticas(df, columna):
         'Coef. Variación': (datos.std() / datos.mean() * 100) if datos.mean() != 0 else 0
     }
 
+def calcular_histograma(df, columna, nbins):
+    """
+    Conteos de un histograma de nbins intervalos iguales, para dibujarlo con go.Bar
+
+    Returns:
+        dict con 'centros', 'anchos' y 'conteos' de cada intervalo
+    """
+    datos = df[columna].dropna().to_numpy()
+    if len(datos) == 0:
+        return {'centros': [], 'anchos': [], 'conteos': []}
+    conteos, bordes = np.histogram(datos, bins=nbins)
+    return {
+        'centros': (bordes[:-1] + bordes[1:]) / 2,
+        'anchos': np.diff(bordes),
+        'conteos': conteos
+    }
+
+def calcular_caja(df, columna):
+    """
+    Cuartiles, bigotes (1.5 × rango intercuartil) y atípicos de una columna, para go.Box
+
+    Returns:
+        dict con los parámetros de go.Box y 'atipicos' (puntajes fuera de los bigotes),
+        o None si la columna no tiene datos
+    """
+    datos = df[columna].dropna().to_numpy()
+    if len(datos) == 0:
+        return None
+    q1, mediana, q3 = np.percentile(datos, [25, 50, 75])
+    rango = q3 - q1
+    dentro = datos[(datos >= q1 - 1.5 * rango) & (datos <= q3 + 1.5 * rango)]
+    return {
+        'q1': q1,
+        'mediana': mediana,
+        'q3': q3,
+        'bigote_inferior': dentro.min(),
+        'bigote_superior': dentro.max(),
+        'promedio': datos.mean(),
+        'desviacion': datos.std(ddof=1) if len(datos) > 1 else 0.0,
+        'atipicos': datos[(datos < dentro.min()) | (datos > dentro.max())]
+    }
+
 def clasificar_por_rango(puntaje):
     """Clasifica un puntaje global en categorías"""
     if pd.isna(puntaje):
@@ -173,6 +280,141 @@ def clasificar_por_rango(puntaje):
     else:
         return 'Superior (401-500)'
 
+def clasificar_puntajes(puntajes):
+    """Versión vectorizada de clasificar_por_rango para una serie de puntajes"""
+    categorias = np.select(
+        [puntajes.isna(), puntajes <= 200, puntajes <= 300, puntajes <= 400],
+        ['Sin datos', 'Bajo (0-200)', 'Medio (201-300)', 'Alto (301-400)'],
+        default='Superior (401-500)'
+    )
+    return pd.Series(categorias, index=puntajes.index)
+
+def tabla_enteros(df, columnas):
+    """Copia de las columnas con los puntajes redondeados a enteros (NaN -> 0)"""
+    tabla = df[columnas].copy()
+    for col in columnas:
+        if col in AREAS or col == 'Puntaje Global':
+            tabla[col] = tabla[col].fillna(0).round(0).astype(int)
+    return tabla
+
+def numerar(tabla, nombre_indice=None):
+    """Índice 1..n (posición) para mostrar una tabla ya ordenada"""
+    tabla = tabla.reset_index(drop=True)
+    tabla.index = tabla.index + 1
+    tabla.index.name = nombre_indice
+    return tabla
+
+def construir_instantanea(df):
+    """
+    Precalcula todo lo que muestran las pestañas
+
+    Streamlit vuelve a ejecutar main() con cada interacción; las pestañas
+    solo consultan este dict (estadísticas por área, histogramas, cajas,
+    rankings, percentiles y clasificación), así que una interacción no recorre ni ordena el grupo
+    completo. No se modifica después de construido.
+
+    Args:
+        df: Estudiantes tal como los devuelve cargar_datos
+
+    Returns:
+        dict con la instantánea de los datos
+    """
+    df = df.copy()
+    columnas_puntaje = ['Puntaje Global'] + AREAS
+    globales = df['Puntaje Global']
+    total = len(df)
+
+    df['Clasificación'] = clasificar_puntajes(globales)
+    # Mismo criterio que contar cuántos tienen un puntaje global mayor, + 1
+    df['Ranking'] = globales.rank(method='min', ascending=False).fillna(1).astype(int)
+    df['Percentil'] = (total - df['Ranking'] + 1) / total * 100
+
+    estadisticas = {area: calcular_estadisticas(df, area) for area in AREAS + ['Puntaje Global']}
+    resumen_areas = pd.DataFrame([{
+        'Área': area,
+        'Promedio': f"{int(round(estadisticas[area]['Promedio']))}",
+        'Mediana': f"{int(round(estadisticas[area]['Mediana']))}",
+        'Desv. Std': f"{estadisticas[area]['Desv. Estándar']:.0f}"
+    } for area in AREAS])
+
+    # Ranking general y tabla de resultados, ordenados una sola vez
+    orden = np.argsort(-globales.fillna(0).round(0).to_numpy(), kind='stable')
+    ordenado = df.iloc[orden]
+    ranking_general = numerar(tabla_enteros(ordenado, ['Nombre Completo'] + columnas_puntaje), 'Posición')
+    tabla_resultados = numerar(tabla_enteros(ordenado, ['Nombre Completo'] + columnas_puntaje + ['Clasificación']))
+
+    rankings_area, top_area, bottom_area = {}, {}, {}
+    for area in AREAS + ['Puntaje Global']:
+        enteros = tabla_enteros(df, ['Nombre Completo', area])
+        orden_area = np.argsort(-enteros[area].to_numpy(), kind='stable')
+        rankings_area[area] = numerar(enteros.iloc[orden_area], 'Posición')
+        top_area[area] = numerar(tabla_enteros(df.nlargest(10, area), ['Nombre Completo', area]))
+        bottom_area[area] = numerar(tabla_enteros(df.nsmallest(10, area), ['Nombre Completo', area]))
+
+    percentil_90 = globales.quantile(0.90)
+    percentil_20 = globales.quantile(0.20)
+    destacados = tabla_enteros(ordenado[ordenado['Puntaje Global'] >= percentil_90], ['Nombre Completo'] + columnas_puntaje)
+    apoyo = tabla_enteros(df[globales <= percentil_20], ['Nombre Completo'] + columnas_puntaje)
+    apoyo = apoyo.iloc[np.argsort(apoyo['Puntaje Global'].to_numpy(), kind='stable')]
+
+    # Histogramas y cajas ya resumidos: los gráficos no recorren el grupo en cada interacción
+    histogramas = {area: calcular_histograma(df, area, NBINS_AREA) for area in AREAS}
+    histogramas['Puntaje Global'] = calcular_histograma(df, 'Puntaje Global', NBINS_GLOBAL)
+    cajas = {area: calcular_caja(df, area) for area in AREAS}
+
+    conteo_clasificacion = df['Clasificación'].value_counts()
+    resumen_clasificacion = pd.DataFrame({
+        'Clasificación': conteo_clasificacion.index,
+        'Cantidad': conteo_clasificacion.values,
+        'Porcentaje': (conteo_clasificacion.values / total * 100).round(1)
+    })
+
+    return {
+        'df': df,
+        'total': total,
+        'estadisticas': estadisticas,
+        'resumen_areas': resumen_areas,
+        'histogramas': histogramas,
+        'cajas': cajas,
+        'busqueda_nombres': df['Nombre Completo'].fillna('').str.lower(),
+        'busqueda_documentos': df['Número de documento'].astype(str),
+        'ranking_general': ranking_general,
+        'rankings_area': rankings_area,
+        'top_area': top_area,
+        'bottom_area': bottom_area,
+        'percentil_90': percentil_90,
+        'percentil_20': percentil_20,
+        'destacados': numerar(destacados),
+        'apoyo': numerar(apoyo),
+        'conteo_clasificacion': conteo_clasificacion,
+        'resumen_clasificacion': resumen_clasificacion,
+        'clasificaciones': df['Clasificación'].unique(),
+        'tabla_resultados': tabla_resultados,
+        # Puntaje sin redondear y clasificación, alineados con tabla_resultados (para los filtros)
+        'globales_ordenados': ordenado['Puntaje Global'].to_numpy(),
+        'clasificacion_ordenada': ordenado['Clasificación'].to_numpy(),
+        'csv_completo': tabla_resultados.to_csv(index=False).encode('utf-8'),
+    }
+
+@st.cache_resource(max_entries=2)
+def cargar_instantanea(version):
+    """
+    Instantánea de los datos, construida una vez por versión del Excel
+
+    Se guarda como recurso (sin copiarla en cada ejecución): las pestañas
+    solo la leen.
+
+    Args:
+        version: Resultado de version_datos(); al cambiar el archivo se reconstruye
+
+    Returns:
+        dict de construir_instantanea, o None si no hay datos
+    """
+    libro = cargar_libro(version)
+    if libro is None or len(libro['estudiantes']) == 0:
+        return None
+    return construir_instantanea(libro['estudiantes'])
+
 def crear_radar_chart(estudiante_data, areas):
     """Crea un gráfico de radar para un estudiante"""
     valores = [estudiante_data[area] for area in areas]
@@ -209,17 +451,21 @@ def main():
     st.markdown('<div class="institution-header">Instituto Tecnológico Calarcá</div>', unsafe_allow_html=True)
     st.markdown('<div class="main-header">📊 Análisis de Resultados ICFES Saber 11 - 2025</div>', unsafe_allow_html=True)
     
-    # Cargar datos
-    df = cargar_datos()
+    # Cargar datos (instantánea precalculada; se reconstruye solo si cambia el Excel)
+    instantanea = cargar_instantanea(version_datos())
     
-    if df is None or len(df) == 0:
+    if instantanea is None:
         st.error("No se pudieron cargar los datos. Verifica que el archivo Excel exista.")
         return
+
+    df = instantanea['df']
+    estadisticas = instantanea['estadisticas']
+    stats_global = estadisticas['Puntaje Global']
     
 
     # Tabs principales
     tab6, tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "📅 Comparación 2024-2025",
+        "📅 Comparación entre Años",
         "📊 Vista General",
         "👤 Por Estudiante",
         "📚 Por Área",
@@ -244,11 +490,11 @@ def main():
             st.metric(
                 "Estudiantes Analizados",
                 len(df),
-                help="Total de estudiantes con resultados (36 estudiantes)"
+                help="Total de estudiantes con resultados en el archivo"
             )
 
         with col2:
-            promedio_global = df['Puntaje Global'].mean()
+            promedio_global = stats_global['Promedio']
             st.metric(
                 "Promedio Global",
                 f"{int(round(promedio_global))}",
@@ -256,7 +502,7 @@ def main():
             )
 
         with col3:
-            mediana_global = df['Puntaje Global'].median()
+            mediana_global = stats_global['Mediana']
             st.metric(
                 "Mediana Global",
                 f"{int(round(mediana_global))}",
@@ -265,6 +511,24 @@ def main():
 
         st.markdown("---")
 
+        # Resultados en curso: agregados que actualizan los extractores
+        agregados = cargar_agregados(version_agregados())
+        if agregados is not None:
+            stats_vivo = {columna: agregados.estadisticas(columna, institucion=INSTITUCION)
+                          for columna in AREAS + ['Puntaje Global']}
+            if stats_vivo['Puntaje Global'] is not None and stats_vivo['Puntaje Global']['Estudiantes'] != instantanea['total']:
+                with st.expander(f"📡 Extracción en curso: {stats_vivo['Puntaje Global']['Estudiantes']} "
+                                 f"estudiante(s) con puntajes (el archivo tiene {instantanea['total']})"):
+                    st.dataframe(pd.DataFrame([{
+                        'Área': columna,
+                        'Estudiantes': stats_vivo[columna]['Estudiantes'],
+                        'Promedio': f"{int(round(stats_vivo[columna]['Promedio']))}",
+                        'Mediana': f"{int(round(stats_vivo[columna]['Mediana']))}",
+                        'Desv. Std': f"{stats_vivo[columna]['Desv. Estándar']:.0f}"
+                    } for columna in AREAS + ['Puntaje Global'] if stats_vivo[columna] is not None]),
+                        use_container_width=True, hide_index=True)
+                st.markdown("---")
+
         # Estadísticas por área (sin comparaciones)
         col1, col2 = st.columns(2)
 
@@ -272,32 +536,23 @@ def main():
             st.subheader("📊 Estadísticas por Área")
             st.markdown("*Cada área se analiza de forma independiente*")
 
-            stats_data = []
-            for area in AREAS:
-                stats_data.append({
-                    'Área': area,
-                    'Promedio': f"{int(round(df[area].mean()))}",
-                    'Mediana': f"{int(round(df[area].median()))}",
-                    'Desv. Std': f"{df[area].std():.0f}"
-                })
-
-            stats_df = pd.DataFrame(stats_data)
-            st.dataframe(stats_df, use_container_width=True, hide_index=True)
+            st.dataframe(instantanea['resumen_areas'], use_container_width=True, hide_index=True)
         
         with col2:
             st.subheader("📈 Distribución del Puntaje Global")
-            fig = px.histogram(
-                df,
-                x='Puntaje Global',
-                nbins=20,
-                labels={'Puntaje Global': 'Puntaje Global', 'count': 'Frecuencia'},
-                color_discrete_sequence=['#1f77b4']
-            )
+            histograma = instantanea['histogramas']['Puntaje Global']
+            fig = go.Figure(go.Bar(
+                x=histograma['centros'],
+                y=histograma['conteos'],
+                width=histograma['anchos'],
+                marker_color='#1f77b4'
+            ))
+            fig.update_layout(xaxis_title='Puntaje Global', yaxis_title='Frecuencia', bargap=0)
             fig.add_vline(
-                x=df['Puntaje Global'].mean(),
+                x=stats_global['Promedio'],
                 line_dash="dash",
                 line_color="red",
-                annotation_text=f"Promedio: {int(round(df['Puntaje Global'].mean()))}"
+                annotation_text=f"Promedio: {int(round(stats_global['Promedio']))}"
             )
             fig.update_layout(height=400)
             st.plotly_chart(fig, use_container_width=True)
@@ -312,21 +567,21 @@ def main():
         with col1:
             st.metric(
                 "Puntaje Máximo",
-                f"{int(round(df['Puntaje Global'].max()))}",
+                f"{int(round(stats_global['Máximo']))}",
                 help="Mejor puntaje global del grupo"
             )
 
         with col2:
             st.metric(
                 "Puntaje Mínimo",
-                f"{int(round(df['Puntaje Global'].min()))}",
+                f"{int(round(stats_global['Mínimo']))}",
                 help="Menor puntaje global del grupo"
             )
 
         with col3:
             st.metric(
                 "Rango",
-                f"{int(round(df['Puntaje Global'].max() - df['Puntaje Global'].min()))}",
+                f"{int(round(stats_global['Rango']))}",
                 help="Diferencia entre el máximo y mínimo"
             )
 
@@ -350,8 +605,8 @@ def main():
         # Filtrar estudiantes
         if busqueda:
             df_filtrado = df[
-                df['Nombre Completo'].str.contains(busqueda, case=False, na=False) |
-                df['Número de documento'].astype(str).str.contains(busqueda, na=False)
+                instantanea['busqueda_nombres'].str.contains(busqueda.lower(), regex=False) |
+                instantanea['busqueda_documentos'].str.contains(busqueda, regex=False)
             ]
         elif mostrar_todos:
             df_filtrado = df
@@ -388,15 +643,12 @@ def main():
                     st.markdown("### 🎯 Puntaje Global")
                     puntaje_global = estudiante['Puntaje Global']
                     st.metric("Puntaje Total", f"{int(round(puntaje_global))}/500")
-                    clasificacion = clasificar_por_rango(puntaje_global)
-                    st.write(f"**Clasificación:** {clasificacion}")
+                    st.write(f"**Clasificación:** {estudiante['Clasificación']}")
                 
                 with col3:
                     st.markdown("### 📊 Posición")
-                    ranking = (df['Puntaje Global'] > puntaje_global).sum() + 1
-                    st.metric("Ranking General", f"{ranking}° de {len(df)}")
-                    percentil = ((len(df) - ranking + 1) / len(df)) * 100
-                    st.write(f"**Percentil:** {percentil:.0f}%")
+                    st.metric("Ranking General", f"{estudiante['Ranking']}° de {instantanea['total']}")
+                    st.write(f"**Percentil:** {estudiante['Percentil']:.0f}%")
                 
                 st.markdown("---")
                 
@@ -407,7 +659,7 @@ def main():
                     st.markdown("### 📚 Puntajes por Área")
                     for area in AREAS:
                         puntaje = estudiante[area]
-                        promedio_area = df[area].mean()
+                        promedio_area = estadisticas[area]['Promedio']
                         diferencia = puntaje - promedio_area
                         
                         col_a, col_b, col_c = st.columns([2, 1, 1])
@@ -441,7 +693,7 @@ def main():
         # Estadísticas del área
         st.subheader(f"📊 Estadísticas de {area_seleccionada}")
 
-        stats_area = calcular_estadisticas(df, area_seleccionada)
+        stats_area = estadisticas[area_seleccionada]
 
         col1, col2, col3, col4, col5 = st.columns(5)
 
@@ -463,13 +715,14 @@ def main():
         with col1:
             # Histograma de distribución
             st.subheader("📈 Distribución de Puntajes")
-            fig = px.histogram(
-                df,
-                x=area_seleccionada,
-                nbins=15,
-                labels={area_seleccionada: 'Puntaje', 'count': 'Frecuencia'},
-                color_discrete_sequence=[COLORES.get(area_seleccionada, '#1f77b4')]
-            )
+            histograma = instantanea['histogramas'][area_seleccionada]
+            fig = go.Figure(go.Bar(
+                x=histograma['centros'],
+                y=histograma['conteos'],
+                width=histograma['anchos'],
+                marker_color=COLORES.get(area_seleccionada, '#1f77b4')
+            ))
+            fig.update_layout(xaxis_title='Puntaje', yaxis_title='Frecuencia', bargap=0)
             fig.add_vline(
                 x=stats_area['Promedio'],
                 line_dash="dash",
@@ -487,16 +740,31 @@ def main():
         with col2:
             # Box plot detallado
             st.subheader("📦 Análisis de Dispersión")
+            # Caja con los cuartiles precalculados; de los puntos solo se dibujan los atípicos
+            caja = instantanea['cajas'][area_seleccionada]
+            color = COLORES.get(area_seleccionada, '#1f77b4')
             fig = go.Figure()
-            fig.add_trace(go.Box(
-                y=df[area_seleccionada],
-                name=area_seleccionada,
-                marker_color=COLORES.get(area_seleccionada, '#1f77b4'),
-                boxmean='sd',
-                boxpoints='all',
-                jitter=0.3,
-                pointpos=-1.8
-            ))
+            if caja is not None:
+                fig.add_trace(go.Box(
+                    x=[area_seleccionada],
+                    q1=[caja['q1']],
+                    median=[caja['mediana']],
+                    q3=[caja['q3']],
+                    lowerfence=[caja['bigote_inferior']],
+                    upperfence=[caja['bigote_superior']],
+                    mean=[caja['promedio']],
+                    sd=[caja['desviacion']],
+                    name=area_seleccionada,
+                    marker_color=color,
+                    boxpoints=False
+                ))
+                fig.add_trace(go.Scatter(
+                    x=[area_seleccionada] * len(caja['atipicos']),
+                    y=caja['atipicos'],
+                    mode='markers',
+                    name='Atípicos',
+                    marker_color=color
+                ))
             fig.update_layout(
                 yaxis_title="Puntaje",
                 showlegend=False,
@@ -540,21 +808,11 @@ def main():
 
         with col1:
             st.subheader(f"🏆 Top 10 en {area_seleccionada}")
-            top_10 = df.nlargest(10, area_seleccionada)[['Nombre Completo', area_seleccionada]].copy()
-            # Redondear puntajes a enteros (manejar NaN)
-            top_10[area_seleccionada] = top_10[area_seleccionada].fillna(0).round(0).astype(int)
-            top_10 = top_10.reset_index(drop=True)
-            top_10.index = top_10.index + 1
-            st.dataframe(top_10, use_container_width=True)
+            st.dataframe(instantanea['top_area'][area_seleccionada], use_container_width=True)
 
         with col2:
             st.subheader(f"📉 Estudiantes que Requieren Apoyo")
-            bottom_10 = df.nsmallest(10, area_seleccionada)[['Nombre Completo', area_seleccionada]].copy()
-            # Redondear puntajes a enteros (manejar NaN)
-            bottom_10[area_seleccionada] = bottom_10[area_seleccionada].fillna(0).round(0).astype(int)
-            bottom_10 = bottom_10.reset_index(drop=True)
-            bottom_10.index = bottom_10.index + 1
-            st.dataframe(bottom_10, use_container_width=True)
+            st.dataframe(instantanea['bottom_area'][area_seleccionada], use_container_width=True)
 
     # TAB 4: Rankings y Estudiantes Destacados
     with tab4:
@@ -579,13 +837,7 @@ def main():
         # Ranking general
         st.subheader("🥇 Ranking General por Puntaje Global")
 
-        df_ranking = df[['Nombre Completo', 'Puntaje Global'] + AREAS].copy()
-        # Redondear puntajes a enteros (manejar NaN)
-        for col in ['Puntaje Global'] + AREAS:
-            df_ranking[col] = df_ranking[col].fillna(0).round(0).astype(int)
-        df_ranking = df_ranking.sort_values('Puntaje Global', ascending=False).reset_index(drop=True)
-        df_ranking.index = df_ranking.index + 1
-        df_ranking.index.name = 'Posición'
+        df_ranking = instantanea['ranking_general']
 
         # Mostrar top 10 por defecto
         mostrar_completo = st.checkbox("Mostrar ranking completo", value=False)
@@ -606,12 +858,7 @@ def main():
             key='area_ranking'
         )
 
-        df_area_ranking = df[['Nombre Completo', area_ranking]].copy()
-        # Redondear puntajes a enteros (manejar NaN)
-        df_area_ranking[area_ranking] = df_area_ranking[area_ranking].fillna(0).round(0).astype(int)
-        df_area_ranking = df_area_ranking.sort_values(area_ranking, ascending=False).reset_index(drop=True)
-        df_area_ranking.index = df_area_ranking.index + 1
-        df_area_ranking.index.name = 'Posición'
+        df_area_ranking = instantanea['rankings_area'][area_ranking]
 
         col1, col2 = st.columns(2)
 
@@ -628,31 +875,20 @@ def main():
         # Identificar estudiantes destacados
         st.subheader("⭐ Estudiantes Destacados (Top 10%)")
 
-        percentil_90 = df['Puntaje Global'].quantile(0.90)
-        destacados = df[df['Puntaje Global'] >= percentil_90][['Nombre Completo', 'Puntaje Global'] + AREAS].copy()
-        # Redondear puntajes a enteros (manejar NaN)
-        for col in ['Puntaje Global'] + AREAS:
-            destacados[col] = destacados[col].fillna(0).round(0).astype(int)
-        destacados = destacados.sort_values('Puntaje Global', ascending=False).reset_index(drop=True)
-        destacados.index = destacados.index + 1
-
-        st.info(f"Estudiantes con puntaje global ≥ {int(round(percentil_90))} (Top 10%)")
-        st.dataframe(destacados, use_container_width=True)
+        st.info(f"Estudiantes con puntaje global ≥ {int(round(instantanea['percentil_90']))} (Top 10%)")
+        st.dataframe(instantanea['destacados'], use_container_width=True)
 
     # TAB 5: Segmentación
     with tab5:
         st.header("📈 Segmentación y Categorización")
 
-        # Clasificar estudiantes por rango
-        df['Clasificación'] = df['Puntaje Global'].apply(clasificar_por_rango)
-
         # Distribución por clasificación
         st.subheader("📊 Distribución por Rango de Puntaje")
 
         col1, col2 = st.columns(2)
 
         with col1:
-            clasificacion_counts = df['Clasificación'].value_counts()
+            clasificacion_counts = instantanea['conteo_clasificacion']
 
             fig = px.pie(
                 values=clasificacion_counts.values,
@@ -665,28 +901,15 @@ def main():
 
         with col2:
             st.markdown("### 📋 Resumen por Clasificación")
-            resumen_df = pd.DataFrame({
-                'Clasificación': clasificacion_counts.index,
-                'Cantidad': clasificacion_counts.values,
-                'Porcentaje': (clasificacion_counts.values / len(df) * 100).round(1)
-            })
-            st.dataframe(resumen_df, use_container_width=True, hide_index=True)
+            st.dataframe(instantanea['resumen_clasificacion'], use_container_width=True, hide_index=True)
 
         st.markdown("---")
 
         # Estudiantes que requieren apoyo
         st.subheader("🎯 Estudiantes que Requieren Apoyo (Bottom 20%)")
 
-        percentil_20 = df['Puntaje Global'].quantile(0.20)
-        apoyo = df[df['Puntaje Global'] <= percentil_20][['Nombre Completo', 'Puntaje Global'] + AREAS].copy()
-        # Redondear puntajes a enteros (manejar NaN)
-        for col in ['Puntaje Global'] + AREAS:
-            apoyo[col] = apoyo[col].fillna(0).round(0).astype(int)
-        apoyo = apoyo.sort_values('Puntaje Global').reset_index(drop=True)
-        apoyo.index = apoyo.index + 1
-
-        st.warning(f"Estudiantes con puntaje global ≤ {int(round(percentil_20))} (Bottom 20%)")
-        st.dataframe(apoyo, use_container_width=True)
+        st.warning(f"Estudiantes con puntaje global ≤ {int(round(instantanea['percentil_20']))} (Bottom 20%)")
+        st.dataframe(instantanea['apoyo'], use_container_width=True)
 
         st.markdown("---")
 
@@ -706,40 +929,39 @@ def main():
         with col1:
             filtro_clasificacion = st.multiselect(
                 "Filtrar por clasificación:",
-                options=df['Clasificación'].unique(),
-                default=df['Clasificación'].unique()
+                options=instantanea['clasificaciones'],
+                default=instantanea['clasificaciones']
             )
 
         with col2:
             rango_puntaje = st.slider(
                 "Rango de puntaje global:",
-                float(df['Puntaje Global'].min()),
-                float(df['Puntaje Global'].max()),
-                (float(df['Puntaje Global'].min()), float(df['Puntaje Global'].max()))
+                float(stats_global['Mínimo']),
+                float(stats_global['Máximo']),
+                (float(stats_global['Mínimo']), float(stats_global['Máximo']))
             )
 
-        # Aplicar filtros
-        df_filtrado = df[
-            (df['Clasificación'].isin(filtro_clasificacion)) &
-            (df['Puntaje Global'] >= rango_puntaje[0]) &
-            (df['Puntaje Global'] <= rango_puntaje[1])
-        ]
+        # Aplicar filtros sobre la tabla ya ordenada (sin volver a ordenar)
+        globales = instantanea['globales_ordenados']
+        seleccion = (
+            np.isin(instantanea['clasificacion_ordenada'], filtro_clasificacion) &
+            (globales >= rango_puntaje[0]) &
+            (globales <= rango_puntaje[1])
+        )
 
-        st.info(f"Mostrando {len(df_filtrado)} de {len(df)} estudiantes")
+        st.info(f"Mostrando {int(seleccion.sum())} de {instantanea['total']} estudiantes")
 
         # Mostrar tabla
-        columnas_mostrar = ['Nombre Completo', 'Puntaje Global'] + AREAS + ['Clasificación']
-        df_mostrar = df_filtrado[columnas_mostrar].copy()
-        # Redondear puntajes a enteros (manejar NaN)
-        for col in ['Puntaje Global'] + AREAS:
-            df_mostrar[col] = df_mostrar[col].fillna(0).round(0).astype(int)
-        df_mostrar = df_mostrar.sort_values('Puntaje Global', ascending=False).reset_index(drop=True)
-        df_mostrar.index = df_mostrar.index + 1
+        if seleccion.all():
+            df_mostrar = instantanea['tabla_resultados']
+            csv = instantanea['csv_completo']
+        else:
+            df_mostrar = numerar(instantanea['tabla_resultados'][seleccion])
+            csv = df_mostrar.to_csv(index=False).encode('utf-8')
 
         st.dataframe(df_mostrar, use_container_width=True, height=400)
 
         # Botón de descarga
-        csv = df_mostrar.to_csv(index=False).encode('utf-8')
         st.download_button(
             label="📥 Descargar datos filtrados (CSV)",
             data=csv,
@@ -747,16 +969,28 @@ def main():
             mime="text/csv"
         )
 
-    # TAB 6: Comparación 2024-2025
+    # TAB 6: Comparación entre años
     with tab6:
-        st.header("📅 Comparación de Resultados 2024 vs 2025")
+        anios_disponibles = promedios_anuales().index.tolist()
+        anterior, actual = str(ANIO_RESULTADOS - 1), str(ANIO_RESULTADOS)
+        if len(anios_disponibles) > 2 or (len(anios_disponibles) == 2 and not {anterior, actual} <= set(anios_disponibles)):
+            col1, col2 = st.columns(2)
+            with col1:
+                anterior = st.selectbox("Año base:", anios_disponibles,
+                                        index=anios_disponibles.index(anterior) if anterior in anios_disponibles else 0)
+            with col2:
+                actual = st.selectbox("Año comparado:", anios_disponibles,
+                                      index=anios_disponibles.index(actual) if actual in anios_disponibles else len(anios_disponibles) - 1)
+
+        st.header(f"📅 Comparación de Resultados {anterior} vs {actual}")
 
         # Cargar datos históricos
-        datos_historicos = cargar_datos_historicos()
+        datos_historicos = cargar_datos_historicos(anterior, actual) if anterior != actual else None
 
         if datos_historicos is None:
-            st.warning("⚠️ No se encontraron datos históricos de comparación en el archivo Excel.")
-            st.info("Los datos históricos deben estar en las filas 37-39 del archivo Excel.")
+            st.warning(f"⚠️ No se encontraron datos de {anterior} y {actual} para comparar.")
+            st.info("Los promedios por año salen del almacén histórico (24-importar_resultados_almacen.py) "
+                    "o de las filas sin grupo al final del archivo Excel: promedios por año y avance.")
         else:
             # Nota metodológica
             st.info("""
@@ -772,19 +1006,19 @@ def main():
             col1, col2, col3 = st.columns(3)
 
             with col1:
-                puntaje_2025 = datos_historicos['2025']['Puntaje Global']
+                puntaje_actual = datos_historicos[actual]['Puntaje Global']
                 st.metric(
-                    "Puntaje Global 2025",
-                    f"{int(round(puntaje_2025))}",
-                    help="Promedio del puntaje global en 2025"
+                    f"Puntaje Global {actual}",
+                    f"{int(round(puntaje_actual))}",
+                    help=f"Promedio del puntaje global en {actual}"
                 )
 
             with col2:
-                puntaje_2024 = datos_historicos['2024']['Puntaje Global']
+                puntaje_anterior = datos_historicos[anterior]['Puntaje Global']
                 st.metric(
-                    "Puntaje Global 2024",
-                    f"{int(round(puntaje_2024))}",
-                    help="Promedio del puntaje global en 2024"
+                    f"Puntaje Global {anterior}",
+                    f"{int(round(puntaje_anterior))}",
+                    help=f"Promedio del puntaje global en {anterior}"
                 )
 
             with col3:
@@ -794,7 +1028,7 @@ def main():
                     "Avance",
                     f"{int(round(avance_global))}",
                     delta=f"{int(round(avance_global))} puntos",
-                    help="Diferencia entre 2025 y 2024"
+                    help=f"Diferencia entre {actual} y {anterior}"
                 )
 
             st.markdown("---")
@@ -807,10 +1041,10 @@ def main():
             for area in AREAS:
                 comparacion_data.append({
                     'Área': area,
-                    '2024': datos_historicos['2024'][area],
-                    '2025': datos_historicos['2025'][area],
+                    anterior: datos_historicos[anterior][area],
+                    actual: datos_historicos[actual][area],
                     'Avance': datos_historicos['Avance'][area],
-                    'Avance %': (datos_historicos['Avance'][area] / datos_historicos['2024'][area] * 100) if datos_historicos['2024'][area] != 0 else 0
+                    'Avance %': (datos_historicos['Avance'][area] / datos_historicos[anterior][area] * 100) if datos_historicos[anterior][area] != 0 else 0
                 })
 
             df_comparacion = pd.DataFrame(comparacion_data)
@@ -824,20 +1058,20 @@ def main():
                 fig = go.Figure()
 
                 fig.add_trace(go.Bar(
-                    name='2024',
+                    name=anterior,
                     x=AREAS,
-                    y=[datos_historicos['2024'][area] for area in AREAS],
+                    y=[datos_historicos[anterior][area] for area in AREAS],
                     marker_color='#ff7f0e',
-                    text=[f"{int(round(datos_historicos['2024'][area]))}" for area in AREAS],
+                    text=[f"{int(round(datos_historicos[anterior][area]))}" for area in AREAS],
                     textposition='outside'
                 ))
 
                 fig.add_trace(go.Bar(
-                    name='2025',
+                    name=actual,
                     x=AREAS,
-                    y=[datos_historicos['2025'][area] for area in AREAS],
+                    y=[datos_historicos[actual][area] for area in AREAS],
                     marker_color='#1f77b4',
-                    text=[f"{int(round(datos_historicos['2025'][area]))}" for area in AREAS],
+                    text=[f"{int(round(datos_historicos[actual][area]))}" for area in AREAS],
                     textposition='outside'
                 ))
 
@@ -893,8 +1127,8 @@ def main():
 
             # Formatear tabla
             df_tabla = df_comparacion.copy()
-            df_tabla['2024'] = df_tabla['2024'].apply(lambda x: f"{int(round(x))}")
-            df_tabla['2025'] = df_tabla['2025'].apply(lambda x: f"{int(round(x))}")
+            df_tabla[anterior] = df_tabla[anterior].apply(lambda x: f"{int(round(x))}")
+            df_tabla[actual] = df_tabla[actual].apply(lambda x: f"{int(round(x))}")
             df_tabla['Avance'] = df_tabla['Avance'].apply(lambda x: f"{int(round(x)):+d}")
             df_tabla['Avance %'] = df_tabla['Avance %'].apply(lambda x: f"{x:+.0f}%")
 
@@ -974,7 +1208,7 @@ def main():
             st.download_button(
                 label="📥 Descargar comparación (CSV)",
                 data=csv_comparacion,
-                file_name=f"comparacion_2024_2025_{datetime.now().strftime('%Y%m%d')}.csv",
+                file_name=f"comparacion_{anterior}_{actual}_{datetime.now().strftime('%Y%m%d')}.csv",
                 mime="text/csv"
             )
 
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de punta a punta del descargador y de los extractores de puntajes.
+
+Ejecuta contra una cohorte sintética fija (generar_datos_ejemplo.py) y el
+sitio simulado (sitio_simulado_icfes.py), sin red:
+- descargador: DescargadorICFES (navigate, fill, wait, print, logout)
+- web:         ExtractorPuntajesICFES (navigate, fill, wait, extract, logout)
+- ocr:         extractor de extraer_puntajes_de_pdfs.py (text_layer, rasterize, roi, ocr, parse)
+
+Reporta percentiles de latencia por fase y estudiantes por minuto, guarda
+el resultado en JSON y lo compara contra una línea base.
+
+Uso:
+    python benchmark_icfes.py --estudiantes 36 --suites ocr
+    python benchmark_icfes.py --estudiantes 1000 --guardar-linea-base
+    python benchmark_icfes.py --estudiantes 1000 --linea-base benchmarks/linea_base.json
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from estudiantes_icfes import estudiantes_desde_dataframe
+from generar_datos_ejemplo import generar_estudiantes
+from sitio_simulado_icfes import (ConfiguracionSitio, iniciar_en_segundo_plano,
+                                  puntajes_simulados, generar_pdf_resultados, AREAS)
+from telemetria_icfes import Telemetria, percentil
+
+CARPETA_BENCHMARKS = 'benchmarks'
+LINEA_BASE_POR_DEFECTO = os.path.join(CARPETA_BENCHMARKS, 'linea_base.json')
+SUITES = ('descargador', 'web', 'ocr')
+TOLERANCIA_POR_DEFECTO = 0.10  # 10 % de empeoramiento antes de marcar regresión
+# Fases de la telemetría del descargador que forman la fase 'wait' del benchmark
+FASES_ESPERA = ('esperar_captcha', 'hacer_clic_ingresar')
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def cargar_script(nombre_archivo, nombre_modulo):
+    """Importa un script del proyecto cuyo nombre no es un identificador válido (p. ej. 12-...)"""
+    ruta = os.path.join(DIRECTORIO, nombre_archivo)
+    spec = importlib.util.spec_from_file_location(nombre_modulo, ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def resumir_fases(tiempos):
+    """Convierte {fase: [segundos]} en percentiles por fase"""
+    resumen = {}
+    for fase, valores in tiempos.items():
+        resumen[fase] = {
+            'n': len(valores),
+            'media': sum(valores) / len(valores),
+            'p50': percentil(valores, 50),
+            'p95': percentil(valores, 95),
+            'p99': percentil(valores, 99),
+            'max': max(valores),
+        }
+    return resumen
+
+
+def cronometrar(objeto, metodo, fase, tiempos):
+    """Envuelve un método de una instancia para acumular su duración en tiempos[fase]"""
+    original = getattr(objeto, metodo)
+
+    def envoltura(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            tiempos.setdefault(fase, []).append(time.perf_counter() - inicio)
+
+    setattr(objeto, metodo, envoltura)
+
+
+def cohorte_como_inscritos(cantidad):
+    """
+    Cohorte sintética con las columnas del archivo de INSCRITOS
+    """
+    df = generar_estudiantes(cantidad)
+    df['Número de registro'] = 'AC' + df['Número de documento'].astype(str)
+    return df
+
+
+def resolver_reto_simulado(driver):
+    """Resuelve el reto falso del sitio simulado (nunca se usa con el portal real)"""
+    from selenium.webdriver.common.by import By
+
+    casillas = driver.find_elements(By.ID, 'reto-casilla')
+    if casillas and not casillas[0].is_selected():
+        casillas[0].click()
+
+    respuestas = driver.find_elements(By.ID, 'reto-respuesta')
+    if respuestas:
+        etiqueta = respuestas[0].find_element(By.XPATH, '..').text
+        sumandos = re.findall(r'\d+', etiqueta)
+        respuestas[0].clear()
+        respuestas[0].send_keys(str(sum(int(n) for n in sumandos)))
+
+
+def ingresar_en_sitio_simulado(driver, esperas):
+    """Hace lo que haría el operador: resolver el reto, clic en Ingresar y esperar resultados"""
+    from selenium.webdriver.common.by import By
+
+    resolver_reto_simulado(driver)
+    driver.find_element(By.XPATH, "//button[contains(text(), 'Ingresar')]").click()
+    esperas.esperar_vista_resultados()
+
+
+@contextlib.contextmanager
+def silenciar(activo):
+    """Oculta la salida de los scripts durante la medición"""
+    if not activo:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def medir_descargador(cohorte, url, carpeta, verbose=False):
+    """Mide DescargadorICFES contra el sitio simulado"""
+    modulo = cargar_script('12-descargar_resultados_icfes.py', 'descargador_icfes')
+    modulo.URL_ICFES = url
+    modulo.CARPETA_PDFS = os.path.join(carpeta, 'pdfs')
+    modulo.DELAY_ENTRE_ESTUDIANTES = 0
+    os.makedirs(modulo.CARPETA_PDFS, exist_ok=True)
+
+    class DescargadorBenchmark(modulo.DescargadorICFES):
+        def esperar_captcha_manual(self, ventana=None):
+            resolver_reto_simulado(self.driver)
+
+    descargador = DescargadorBenchmark(modo_headless=True)
+    # Solo en memoria: de sus eventos sale la fase 'wait' de cada estudiante
+    descargador.telemetria = Telemetria()
+    tiempos = {}
+    for metodo, fase in [('navegar_a_login', 'navigate'), ('llenar_formulario', 'fill'),
+                         ('descargar_pdf', 'print'), ('hacer_logout', 'logout')]:
+        cronometrar(descargador, metodo, fase, tiempos)
+
+    with silenciar(not verbose):
+        descargador.iniciar_navegador()
+    try:
+        inicio = time.perf_counter()
+        with silenciar(not verbose):
+            for indice, estudiante in enumerate(estudiantes_desde_dataframe(cohorte)):
+                descargador.procesar_estudiante(estudiante, indice, len(cohorte))
+        duracion = time.perf_counter() - inicio
+    finally:
+        with silenciar(not verbose):
+            descargador.cerrar_navegador()
+
+    # 'wait' = CAPTCHA + Ingresar del mismo estudiante; si falló antes no aporta
+    esperas = [
+        sum(evento['fases'][fase] for fase in FASES_ESPERA if fase in evento['fases'])
+        for evento in descargador.telemetria.eventos
+        if any(fase in evento['fases'] for fase in FASES_ESPERA)
+    ]
+    if esperas:
+        tiempos['wait'] = esperas
+
+    return {
+        'estudiantes': len(cohorte),
+        'exitosos': len(descargador.estudiantes_exitosos),
+        'errores': len(descargador.estudiantes_error),
+        'duracion_s': duracion,
+        'estudiantes_por_minuto': len(cohorte) / duracion * 60 if duracion else None,
+        'fases': resumir_fases(tiempos),
+    }
+
+
+def medir_extractor_web(cohorte, url, verbose=False):
+    """Mide ExtractorPuntajesICFES contra el sitio simulado"""
+    modulo = cargar_script('21-extraer_puntajes_desde_web.py', 'extractor_web_icfes')
+    modulo.URL_ICFES = url
+    from selenium import webdriver
+    from selenium.webdriver.firefox.options import Options
+    from esperas_icfes import EsperasICFES
+
+    class ExtractorBenchmark(modulo.ExtractorPuntajesICFES):
+        def iniciar_navegador(self):
+            opciones = Options()
+            opciones.add_argument('--headless')
+            self.driver = webdriver.Firefox(options=opciones)
+
+        def esperar_login_manual(self):
+            ingresar_en_sitio_simulado(self.driver, EsperasICFES(self.driver))
+
+    extractor = ExtractorBenchmark(modo_prueba=False)
+    tiempos = {}
+    for metodo, fase in [('navegar_a_icfes', 'navigate'), ('ingresar_datos_estudiante', 'fill'),
+                         ('esperar_login_manual', 'wait'), ('extraer_puntajes_de_pagina', 'extract'),
+                         ('hacer_logout', 'logout')]:
+        cronometrar(extractor, metodo, fase, tiempos)
+
+    with silenciar(not verbose):
+        extractor.iniciar_navegador()
+    try:
+        inicio = time.perf_counter()
+        with silenciar(not verbose):
+            for estudiante in estudiantes_desde_dataframe(cohorte):
+                extractor.procesar_estudiante(estudiante)
+        duracion = time.perf_counter() - inicio
+    finally:
+        with silenciar(not verbose):
+            extractor.cerrar_navegador()
+
+    aciertos = sum(
+        1 for resultado in extractor.resultados
+        if all(resultado.get(area) == puntajes_simulados(resultado['Número de documento'])[area]
+               for area in AREAS + ['Puntaje Global'])
+    )
+
+    return {
+        'estudiantes': len(cohorte),
+        'exitosos': len(extractor.resultados),
+        'errores': len(extractor.errores),
+        'aciertos': aciertos,
+        'duracion_s': duracion,
+        'estudiantes_por_minuto': len(cohorte) / duracion * 60 if duracion else None,
+        'fases': resumir_fases(tiempos),
+    }
+
+
+def medir_extractor_ocr(cohorte, carpeta, verbose=False):
+    """Mide el extractor OCR sobre PDFs generados con el formato del sitio simulado"""
+    modulo = cargar_script('extraer_puntajes_de_pdfs.py', 'extractor_ocr_icfes')
+    modulo.ARCHIVO_PLANTILLAS_ROI = os.path.join(carpeta, 'plantillas_roi.json')
+
+    carpeta_pdfs = os.path.join(carpeta, 'pdfs_ocr')
+    os.makedirs(carpeta_pdfs, exist_ok=True)
+    pdfs = []
+    for _, estudiante in cohorte.iterrows():
+        documento = str(estudiante['Número de documento'])
+        ruta = os.path.join(carpeta_pdfs, f'{documento}.pdf')
+        with open(ruta, 'wb') as f:
+            f.write(generar_pdf_resultados(f'ESTUDIANTE {documento}', documento,
+                                           puntajes_simulados(documento)))
+        pdfs.append((documento, ruta))
+
+    tiempos = {'text_layer': [], 'rasterize': [], 'roi': [], 'ocr': [], 'parse': []}
+    aciertos = 0
+    aciertos_texto = 0
+    aciertos_roi = 0
+    errores = 0
+    textos_ocr = []
+
+    inicio = time.perf_counter()
+    with silenciar(not verbose):
+        for documento, ruta in pdfs:
+            esperado = puntajes_simulados(documento)
+            try:
+                inicio_texto = time.perf_counter()
+                puntajes_texto = modulo.extraer_puntajes_capa_texto(ruta)
+                tiempos['text_layer'].append(time.perf_counter() - inicio_texto)
+                if puntajes_texto == esperado:
+                    aciertos_texto += 1
+            except Exception:
+                pass
+            try:
+                t0 = time.perf_counter()
+                imagen = modulo.rasterizar_primera_pagina(ruta)
+                t1 = time.perf_counter()
+                tiempos['rasterize'].append(t1 - t0)
+                try:
+                    inicio_roi = time.perf_counter()
+                    puntajes_roi = modulo.extraer_puntajes_roi(imagen)
+                    tiempos['roi'].append(time.perf_counter() - inicio_roi)
+                    if puntajes_roi == esperado:
+                        aciertos_roi += 1
+                except Exception:
+                    pass
+                t1 = time.perf_counter()
+                texto = modulo.ocr_imagen(imagen)
+                t2 = time.perf_counter()
+                puntajes = modulo.extraer_puntajes(texto)
+                t3 = time.perf_counter()
+            except Exception:
+                errores += 1
+                continue
+            tiempos['ocr'].append(t2 - t1)
+            tiempos['parse'].append(t3 - t2)
+            textos_ocr.append(texto)
+            if all(puntajes.get(area) == esperado[area] for area in AREAS + ['Puntaje Global']):
+                aciertos += 1
+    duracion = time.perf_counter() - inicio
+
+    # Re-interpretar todos los textos OCR de una vez (como al re-leer la caché)
+    validos_lote = 0
+    if textos_ocr:
+        inicio_lote = time.perf_counter()
+        lote = modulo.extraer_puntajes_lote(textos_ocr)
+        tiempos['parse_batch'] = [time.perf_counter() - inicio_lote]
+        validos_lote = int((lote['confianza'] == 'alta').sum())
+
+    return {
+        'estudiantes': len(pdfs),
+        'exitosos': len(pdfs) - errores,
+        'errores': errores,
+        'aciertos': aciertos,
+        'aciertos_capa_texto': aciertos_texto,
+        'aciertos_roi': aciertos_roi,
+        'validos_lote': validos_lote,
+        'duracion_s': duracion,
+        'estudiantes_por_minuto': len(pdfs) / duracion * 60 if duracion else None,
+        'fases': resumir_fases({fase: valores for fase, valores in tiempos.items() if valores}),
+    }
+
+
+def ejecutar_benchmark(estudiantes, suites, latencia_ms=0, reto='casilla', tasa_fallos=0.0,
+                       verbose=False):
+    """
+    Ejecuta las suites pedidas y retorna el reporte completo
+
+    Returns:
+        dict serializable a JSON
+    """
+    cohorte = cohorte_como_inscritos(estudiantes)
+    reporte = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'estudiantes': estudiantes,
+        'entorno': {'python': platform.python_version(), 'plataforma': platform.platform(),
+                    'cpus': os.cpu_count()},
+        'sitio': {'latencia_ms': latencia_ms, 'reto': reto, 'tasa_fallos': tasa_fallos},
+        'suites': {},
+    }
+
+    configuracion = ConfiguracionSitio(latencia_ms=latencia_ms, reto=reto,
+                                       tasa_fallos=tasa_fallos, semilla=42)
+    servidor, url = iniciar_en_segundo_plano(configuracion)
+
+    try:
+        with tempfile.TemporaryDirectory(prefix='benchmark_icfes_') as carpeta:
+            for suite in suites:
+                print(f'\n⏱️  Ejecutando suite "{suite}" con {estudiantes} estudiantes...')
+                try:
+                    if suite == 'descargador':
+                        resultado = medir_descargador(cohorte, url, carpeta, verbose)
+                    elif suite == 'web':
+                        resultado = medir_extractor_web(cohorte, url, verbose)
+                    else:
+                        resultado = medir_extractor_ocr(cohorte, carpeta, verbose)
+                except Exception as e:
+                    # Falta de dependencias (selenium, Firefox, Tesseract...) o fallo de la suite
+                    print(f'   ⚠️  Suite "{suite}" no disponible: {e}')
+                    resultado = {'error': str(e)}
+                reporte['suites'][suite] = resultado
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+    return reporte
+
+
+def mostrar_reporte(reporte):
+    """Imprime el resumen por suite y por fase"""
+    print('\n' + '='*80)
+    print(f'📊 BENCHMARK ICFES - {reporte["estudiantes"]} estudiantes')
+    print('='*80)
+
+    for suite, resultado in reporte['suites'].items():
+        print(f'\n▶ {suite}')
+        if 'error' in resultado:
+            print(f'   ⚠️  {resultado["error"]}')
+            continue
+
+        aciertos = f'  aciertos: {resultado["aciertos"]}' if 'aciertos' in resultado else ''
+        print(f'   Estudiantes/minuto: {resultado["estudiantes_por_minuto"]:.1f}  '
+              f'(exitosos: {resultado["exitosos"]}, errores: {resultado["errores"]}{aciertos}, '
+              f'duración: {resultado["duracion_s"]:.1f} s)')
+        print(f'   {"Fase":<12}{"n":>7}{"p50 (s)":>11}{"p95 (s)":>11}{"p99 (s)":>11}{"máx (s)":>11}')
+        for fase, datos in resultado['fases'].items():
+            print(f'   {fase:<12}{datos["n"]:>7}{datos["p50"]:>11.3f}{datos["p95"]:>11.3f}'
+                  f'{datos["p99"]:>11.3f}{datos["max"]:>11.3f}')
+
+
+def comparar_con_linea_base(reporte, linea_base, tolerancia=TOLERANCIA_POR_DEFECTO):
+    """
+    Compara el reporte con una línea base
+
+    Returns:
+        list: Descripciones de las regresiones encontradas (vacía si no hay)
+    """
+    regresiones = []
+    print('\n' + '='*80)
+    print(f'📐 COMPARACIÓN CON LÍNEA BASE ({linea_base.get("fecha", "sin fecha")})')
+    print('='*80)
+
+    for suite, actual in reporte['suites'].items():
+        base = linea_base.get('suites', {}).get(suite)
+        if not base or 'error' in base or 'error' in actual:
+            continue
+
+        cambio = actual['estudiantes_por_minuto'] / base['estudiantes_por_minuto'] - 1
+        marca = '❌' if cambio < -tolerancia else '✅'
+        print(f'\n{marca} {suite}: {base["estudiantes_por_minuto"]:.1f} → '
+              f'{actual["estudiantes_por_minuto"]:.1f} estudiantes/minuto ({cambio:+.1%})')
+        if cambio < -tolerancia:
+            regresiones.append(f'{suite}: estudiantes/minuto {cambio:+.1%}')
+
+        for fase, datos in actual['fases'].items():
+            datos_base = base['fases'].get(fase)
+            if not datos_base or not datos_base['p95']:
+                continue
+            cambio_fase = datos['p95'] / datos_base['p95'] - 1
+            marca = '❌' if cambio_fase > tolerancia else '  '
+            print(f'   {marca} {fase:<12} p95 {datos_base["p95"]:.3f} → {datos["p95"]:.3f} s '
+                  f'({cambio_fase:+.1%})')
+            if cambio_fase > tolerancia:
+                regresiones.append(f'{suite}/{fase}: p95 {cambio_fase:+.1%}')
+
+    return regresiones
+
+
+def guardar_json(datos, ruta):
+    """Guarda un reporte en JSON creando la carpeta si hace falta"""
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Benchmark de estudiantes/minuto del proyecto ICFES')
+    parser.add_argument('--estudiantes', type=int, default=36,
+                        help='Tamaño de la cohorte sintética (p. ej. 36, 1000, 10000)')
+    parser.add_argument('--suites', default=','.join(SUITES),
+                        help=f'Suites separadas por comas ({", ".join(SUITES)})')
+    parser.add_argument('--latencia-ms', type=int, default=0, help='Latencia del sitio simulado')
+    parser.add_argument('--reto', default='casilla', help='Reto del sitio simulado')
+    parser.add_argument('--tasa-fallos', type=float, default=0.0, help='Fallos 503 del sitio simulado')
+    parser.add_argument('--salida', default=None, help='Ruta del JSON de resultados')
+    parser.add_argument('--linea-base', default=None, help='JSON de línea base para comparar')
+    parser.add_argument('--guardar-linea-base', action='store_true',
+                        help=f'Guarda este resultado como línea base ({LINEA_BASE_POR_DEFECTO})')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_POR_DEFECTO,
+                        help='Empeoramiento relativo permitido antes de marcar regresión')
+    parser.add_argument('--verbose', action='store_true', help='Muestra la salida de los scripts')
+    args = parser.parse_args()
+
+    suites = [suite.strip() for suite in args.suites.split(',') if suite.strip()]
+    desconocidas = [suite for suite in suites if suite not in SUITES]
+    if desconocidas:
+        parser.error(f'Suites desconocidas: {", ".join(desconocidas)}')
+
+    reporte = ejecutar_benchmark(args.estudiantes, suites, args.latencia_ms, args.reto,
+                                 args.tasa_fallos, args.verbose)
+    mostrar_reporte(reporte)
+
+    salida = args.salida or os.path.join(
+        CARPETA_BENCHMARKS, f'benchmark_{args.estudiantes}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
+    guardar_json(reporte, salida)
+    print(f'\n💾 Resultados guardados en: {salida}')
+
+    if args.guardar_linea_base:
+        guardar_json(reporte, LINEA_BASE_POR_DEFECTO)
+        print(f'📌 Línea base actualizada: {LINEA_BASE_POR_DEFECTO}')
+
+    if args.linea_base:
+        with open(args.linea_base, 'r', encoding='utf-8') as f:
+            linea_base = json.load(f)
+        regresiones = comparar_con_linea_base(reporte, linea_base, args.tolerancia)
+        if regresiones:
+            print('\n❌ Regresiones detectadas:')
+            for regresion in regresiones:
+                print(f'   - {regresion}')
+            sys.exit(1)
+        print('\n✅ Sin regresiones respecto a la línea base')
+
+
+if __name__ == '__main__':
+    main()
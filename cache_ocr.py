@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché en disco de resultados de OCR/extracción, direccionada por contenido.
+
+La clave es el SHA-256 de los bytes del PDF más la configuración del OCR
+(DPI, PSM, idioma, ...): si el PDF o la configuración cambian, la entrada
+deja de coincidir sola. Cada entrada es un JSON con el texto OCR crudo (por
+región o de la página completa), las regiones usadas, los niveles de OCR
+intentados, la versión del parser y, cuando el OCR fue por regiones, los
+puntajes ya interpretados; así, después de corregir el parser solo hay que
+volver a interpretar el texto guardado.
+
+El tamaño total se limita expulsando primero las entradas usadas hace más
+tiempo (LRU por fecha de modificación, que se renueva en cada acierto).
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+CARPETA_CACHE_OCR = os.environ.get('ICFES_CACHE_OCR', os.path.join('logs', 'cache_ocr'))
+LIMITE_CACHE_MB = int(os.environ.get('ICFES_CACHE_OCR_MB', 512))
+
+
+def hash_archivo(ruta, tamano_bloque=1024 * 1024):
+    """SHA-256 de un archivo leído por bloques"""
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def hash_config(config):
+    """Huella estable de un dict de configuración"""
+    texto = json.dumps(config, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:16]
+
+
+class CacheOCR:
+    """Caché de entradas JSON por (PDF, configuración) con límite de tamaño"""
+
+    def __init__(self, carpeta=CARPETA_CACHE_OCR, limite_mb=LIMITE_CACHE_MB):
+        """
+        Args:
+            carpeta: Carpeta de la caché (se crea si no existe)
+            limite_mb: Tamaño máximo aproximado antes de expulsar entradas
+        """
+        self.carpeta = carpeta
+        self.limite_bytes = limite_mb * 1024 * 1024
+        self.aciertos = 0
+        self.fallos = 0
+        self._hashes = {}
+        self._tamano_total = None
+        self._candado = threading.Lock()
+
+    def _hash_pdf(self, ruta_pdf):
+        """Hash del PDF, memorizado mientras no cambien su tamaño ni su fecha"""
+        estado = os.stat(ruta_pdf)
+        firma = (os.path.abspath(ruta_pdf), estado.st_size, estado.st_mtime_ns)
+        if firma not in self._hashes:
+            self._hashes[firma] = hash_archivo(ruta_pdf)
+        return self._hashes[firma]
+
+    def ruta_entrada(self, ruta_pdf, config):
+        """Ruta del JSON de la entrada (subcarpeta por los 2 primeros caracteres del hash)"""
+        hash_pdf = self._hash_pdf(ruta_pdf)
+        return os.path.join(self.carpeta, hash_pdf[:2], f'{hash_pdf}_{hash_config(config)}.json')
+
+    def obtener(self, ruta_pdf, config):
+        """
+        Busca la entrada de un PDF con una configuración
+
+        Returns:
+            dict con los datos guardados, o None si no está en caché
+        """
+        ruta = self.ruta_entrada(ruta_pdf, config)
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            self.fallos += 1
+            return None
+
+        # Renovar la fecha: es la que decide el orden de expulsión
+        try:
+            os.utime(ruta, None)
+        except OSError:
+            pass
+        self.aciertos += 1
+        return datos
+
+    def guardar(self, ruta_pdf, config, datos):
+        """
+        Guarda (o reemplaza) la entrada de un PDF con una configuración
+
+        Args:
+            ruta_pdf: Ruta del PDF de origen
+            config: dict con la configuración del OCR usada
+            datos: dict serializable (texto, palabras, puntajes, ...)
+        """
+        ruta = self.ruta_entrada(ruta_pdf, config)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+
+        contenido = json.dumps({**datos, 'config': config}, ensure_ascii=False).encode('utf-8')
+        ruta_temporal = f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(ruta_temporal, 'wb') as f:
+            f.write(contenido)
+        os.replace(ruta_temporal, ruta)
+
+        with self._candado:
+            if self._tamano_total is None:
+                self._tamano_total = sum(tamano for _, tamano, _ in self._entradas())
+            else:
+                self._tamano_total += len(contenido)
+            if self._tamano_total > self.limite_bytes:
+                self._expulsar()
+
+    def _entradas(self):
+        """Lista (ruta, tamaño, fecha) de todas las entradas"""
+        entradas = []
+        try:
+            subcarpetas = list(os.scandir(self.carpeta))
+        except FileNotFoundError:
+            return entradas
+        for subcarpeta in subcarpetas:
+            if not subcarpeta.is_dir():
+                continue
+            for entrada in os.scandir(subcarpeta.path):
+                if entrada.name.endswith('.json'):
+                    try:
+                        estado = entrada.stat()
+                    except FileNotFoundError:
+                        continue
+                    entradas.append((entrada.path, estado.st_size, estado.st_mtime))
+        return entradas
+
+    def _expulsar(self):
+        """Borra las entradas menos usadas hasta quedar en el 90 % del límite"""
+        entradas = sorted(self._entradas(), key=lambda entrada: entrada[2])
+        total = sum(tamano for _, tamano, _ in entradas)
+        objetivo = self.limite_bytes * 0.9
+        for ruta, tamano, _ in entradas:
+            if total <= objetivo:
+                break
+            try:
+                os.remove(ruta)
+                total -= tamano
+            except FileNotFoundError:
+                total -= tamano
+        self._tamano_total = total
+
+
+_cache_por_defecto = None
+
+
+def cache_por_defecto():
+    """Instancia compartida por los scripts (una por proceso)"""
+    global _cache_por_defecto
+    if _cache_por_defecto is None:
+        _cache_por_defecto = CacheOCR()
+    return _cache_por_defecto
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Catálogo de los PDFs descargados, indexado por número de documento.
+
+Los PDFs se llaman APELLIDOS_NOMBRES_DOCUMENTO.pdf y, si el descargador
+encontró el nombre ocupado, APELLIDOS_NOMBRES_DOCUMENTO_1.pdf, _2, ... La
+carpeta se recorre una sola vez con os.scandir, incluidas las subcarpetas de
+cada listado que crea la descarga en lote (las ocultas, como .descargas, se
+omiten), y cada archivo se indexa por su documento (el último token numérico)
+y por su nombre normalizado, así que buscar el PDF de un estudiante es una
+consulta a un dict. Las entradas se identifican por su ruta relativa a la
+carpeta: un mismo nombre en dos listados son dos entradas del mismo
+documento, y gana la preferida (completa y más reciente).
+
+El índice se guarda en disco con el tamaño y la fecha de cada archivo: al
+actualizar solo se vuelven a revisar (cabecera y %%EOF) los archivos nuevos
+o modificados.
+"""
+
+import json
+import os
+import re
+import unicodedata
+
+from estado_descargas import normalizar_documento, pdf_completo
+
+CARPETA_PDFS = 'pdfs_descargados'
+ARCHIVO_INDICE_PDFS = os.path.join('logs', 'indice_pdfs.json')
+VERSION_INDICE = 2
+
+# Sufijo de copia que agrega el descargador cuando el nombre ya existe
+PATRON_COPIA = re.compile(r'^(?P<base>.*_\d{5,})_(?P<copia>\d{1,3})$')
+
+
+def normalizar_nombre(nombre):
+    """
+    Clave de nombre independiente de tildes, mayúsculas, separadores y copia
+
+    'Pérez_Gómez_ana_123456_1.pdf' -> 'PEREZ_GOMEZ_ANA_123456'
+    """
+    base = nombre[:-4] if nombre.lower().endswith('.pdf') else nombre
+    base = unicodedata.normalize('NFKD', base).encode('ascii', 'ignore').decode('ascii').upper()
+    base = re.sub(r'[^A-Z0-9]+', '_', base).strip('_')
+    coincidencia = PATRON_COPIA.match(base)
+    return coincidencia.group('base') if coincidencia else base
+
+
+def descomponer_nombre(nombre):
+    """
+    Separa el nombre de un PDF en (documento, número de copia)
+
+    Returns:
+        tuple: (documento o None si el nombre no termina en un número, copia)
+               con copia 0 para el archivo original
+    """
+    base = nombre[:-4] if nombre.lower().endswith('.pdf') else nombre
+    copia = 0
+    coincidencia = PATRON_COPIA.match(base)
+    if coincidencia:
+        base, copia = coincidencia.group('base'), int(coincidencia.group('copia'))
+    documento = base.rsplit('_', 1)[-1]
+    if not documento.isdigit():
+        return None, copia
+    return normalizar_documento(documento), copia
+
+
+class CatalogoPDFs:
+    """Índice de la carpeta de PDFs por documento y por nombre normalizado"""
+
+    def __init__(self, carpeta=CARPETA_PDFS, ruta_indice=ARCHIVO_INDICE_PDFS):
+        """
+        Carga el índice guardado (si existe) y lo actualiza con la carpeta
+
+        Args:
+            carpeta: Carpeta de los PDFs descargados
+            ruta_indice: JSON donde se persiste el índice (None = no persistir)
+        """
+        self.carpeta = carpeta
+        self.ruta_indice = ruta_indice
+        self.archivos = self._cargar_indice()
+        self.por_documento = {}
+        self.por_nombre = {}
+        self.actualizar()
+
+    def _cargar_indice(self):
+        """Entradas del índice guardado, o {} si no existe o es de otra carpeta"""
+        if not self.ruta_indice or not os.path.exists(self.ruta_indice):
+            return {}
+        try:
+            with open(self.ruta_indice, 'r', encoding='utf-8') as f:
+                indice = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if (indice.get('version') != VERSION_INDICE
+                or indice.get('carpeta') != os.path.abspath(self.carpeta)):
+            return {}
+        return indice.get('archivos', {})
+
+    def _guardar_indice(self):
+        """Escribe el índice de forma atómica"""
+        carpeta = os.path.dirname(self.ruta_indice)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        indice = {
+            'version': VERSION_INDICE,
+            'carpeta': os.path.abspath(self.carpeta),
+            'archivos': self.archivos,
+        }
+        ruta_temporal = f'{self.ruta_indice}.{os.getpid()}.tmp'
+        try:
+            with open(ruta_temporal, 'w', encoding='utf-8') as f:
+                json.dump(indice, f, ensure_ascii=False)
+            os.replace(ruta_temporal, self.ruta_indice)
+        except OSError as e:
+            print(f'⚠️  No se pudo guardar el índice de PDFs: {e}')
+
+    def actualizar(self):
+        """
+        Recorre la carpeta (y sus subcarpetas) una vez y revisa solo los archivos nuevos o modificados
+
+        Returns:
+            int: Número de archivos nuevos o modificados
+        """
+        vistos = {}
+        cambios = 0
+        pendientes = ['']
+        while pendientes:
+            relativa = pendientes.pop()
+            try:
+                with os.scandir(os.path.join(self.carpeta, relativa)) as entradas:
+                    for entrada in entradas:
+                        nombre = f'{relativa}/{entrada.name}' if relativa else entrada.name
+                        if entrada.is_dir():
+                            if not entrada.name.startswith('.'):
+                                pendientes.append(nombre)
+                            continue
+                        if not entrada.name.lower().endswith('.pdf') or not entrada.is_file():
+                            continue
+                        estado = entrada.stat()
+                        anterior = self.archivos.get(nombre)
+                        if (anterior and anterior['tamano'] == estado.st_size
+                                and anterior['mtime_ns'] == estado.st_mtime_ns):
+                            vistos[nombre] = anterior
+                            continue
+                        documento, copia = descomponer_nombre(entrada.name)
+                        vistos[nombre] = {
+                            'tamano': estado.st_size,
+                            'mtime_ns': estado.st_mtime_ns,
+                            'documento': documento,
+                            'copia': copia,
+                            'nombre': normalizar_nombre(entrada.name),
+                            'completo': pdf_completo(entrada.path),
+                        }
+                        cambios += 1
+            except FileNotFoundError:
+                pass
+
+        eliminados = len(self.archivos.keys() - vistos.keys())
+        self.archivos = vistos
+        self._indexar()
+        if self.ruta_indice and (cambios or eliminados):
+            self._guardar_indice()
+        return cambios
+
+    def _indexar(self):
+        """Reconstruye los dicts de búsqueda (copias ordenadas de la más reciente a la más antigua)"""
+        self.por_documento = {}
+        self.por_nombre = {}
+        for nombre, datos in self.archivos.items():
+            if datos['documento']:
+                self.por_documento.setdefault(datos['documento'], []).append(nombre)
+            self.por_nombre.setdefault(datos['nombre'], []).append(nombre)
+        for indice in (self.por_documento, self.por_nombre):
+            for nombres in indice.values():
+                nombres.sort(key=self._prioridad)
+
+    def _prioridad(self, nombre):
+        """Primero los PDFs completos y, entre ellos, el más reciente"""
+        datos = self.archivos[nombre]
+        return (not datos['completo'], -datos['mtime_ns'], datos['copia'])
+
+    def __len__(self):
+        return len(self.archivos)
+
+    def ruta(self, nombre):
+        """Ruta completa de un archivo del catálogo (nombre = ruta relativa a la carpeta)"""
+        return os.path.join(self.carpeta, *nombre.split('/'))
+
+    def relativa(self, ruta):
+        """Clave del catálogo (ruta relativa con '/') de una ruta devuelta por buscar"""
+        return os.path.relpath(ruta, self.carpeta).replace(os.sep, '/')
+
+    def copias(self, documento):
+        """Rutas relativas de los PDFs de un documento, el preferido primero"""
+        return list(self.por_documento.get(normalizar_documento(documento), []))
+
+    def buscar(self, documento=None, nombre_esperado=None):
+        """
+        Busca el PDF de un estudiante: por documento y, si no hay, por nombre
+
+        Args:
+            documento: Número de documento del estudiante
+            nombre_esperado: Nombre de archivo esperado (con o sin .pdf)
+
+        Returns:
+            str: Ruta del PDF preferido, o None si no hay ninguno
+        """
+        nombres = self.copias(documento) if documento is not None else []
+        if not nombres and nombre_esperado:
+            nombres = self.por_nombre.get(normalizar_nombre(nombre_esperado), [])
+        return self.ruta(nombres[0]) if nombres else None
+
+    def documentos(self):
+        """Conjunto de documentos con al menos un PDF"""
+        return set(self.por_documento)
+
+    def sin_documento(self):
+        """Rutas relativas de los PDFs cuyo nombre no termina en un número de documento"""
+        return sorted(nombre for nombre, datos in self.archivos.items() if not datos['documento'])
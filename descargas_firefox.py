@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Utilidades para recoger los archivos que Firefox descarga por su cuenta.
+
+Firefox escribe primero un archivo .part y al terminar lo renombra; una
+descarga se considera completa cuando ya no hay .part y su tamaño se
+mantiene estable entre dos revisiones.
+"""
+
+import os
+import time
+
+EXTENSIONES_TEMPORALES = ('.part', '.crdownload', '.tmp')
+
+
+def archivos_en_carpeta(carpeta):
+    """Retorna el conjunto de nombres de archivo de una carpeta (vacío si no existe)"""
+    try:
+        with os.scandir(carpeta) as entradas:
+            return {entrada.name for entrada in entradas if entrada.is_file()}
+    except FileNotFoundError:
+        return set()
+
+
+def es_temporal(nombre):
+    """Indica si el archivo es una descarga aún en curso"""
+    return nombre.endswith(EXTENSIONES_TEMPORALES)
+
+
+def esperar_descarga_completa(carpeta, previos, timeout=30, intervalo=0.2, extension='.pdf'):
+    """
+    Espera a que aparezca en la carpeta un archivo nuevo y terminado
+
+    Args:
+        carpeta: Carpeta de descargas del navegador
+        previos: Nombres que ya estaban antes de iniciar la descarga
+        timeout: Segundos máximos de espera
+        intervalo: Segundos entre revisiones
+        extension: Extensión esperada del archivo
+
+    Returns:
+        str: Ruta del archivo descargado, o None si no llegó a tiempo
+    """
+    limite = time.monotonic() + timeout
+    tamanos = {}
+
+    while time.monotonic() < limite:
+        nuevos = archivos_en_carpeta(carpeta) - previos
+        en_curso = any(es_temporal(nombre) for nombre in nuevos)
+
+        if not en_curso:
+            for nombre in sorted(nuevos):
+                if not nombre.lower().endswith(extension):
+                    continue
+                ruta = os.path.join(carpeta, nombre)
+                try:
+                    tamano = os.path.getsize(ruta)
+                except OSError:
+                    continue
+                # Completa cuando el tamaño no cambió desde la revisión anterior
+                if tamano > 0 and tamanos.get(nombre) == tamano:
+                    return ruta
+                tamanos[nombre] = tamano
+
+        time.sleep(intervalo)
+
+    return None
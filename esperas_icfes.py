@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Capa de esperas por eventos para la automatización del portal ICFES.
+
+Reemplaza los time.sleep() fijos por esperas sobre condiciones concretas del
+DOM (Angular estable, opciones del ng-select visibles, vista de resultados
+renderizada, etc.). Cada espera tiene un tiempo máximo y queda registrada con
+su duración para poder ver a dónde se va el tiempo de cada estudiante.
+"""
+
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+# Tiempos máximos por defecto (segundos)
+TIMEOUT_POR_DEFECTO = 10
+TIMEOUT_RESULTADOS = 20
+INTERVALO_SONDEO = 0.1
+
+# El portal es una SPA en Angular 9: las "testabilities" indican si hay
+# peticiones HTTP o temporizadores pendientes. Si la página no es Angular se
+# usa solo document.readyState.
+JS_ANGULAR_ESTABLE = """
+if (document.readyState !== 'complete') { return false; }
+if (typeof window.getAllAngularTestabilities !== 'function') { return true; }
+var testabilities = window.getAllAngularTestabilities();
+for (var i = 0; i < testabilities.length; i++) {
+    if (!testabilities[i].isStable()) { return false; }
+}
+return true;
+"""
+
+# Fuentes e imágenes cargadas: condición previa para imprimir la página
+JS_RECURSOS_CARGADOS = """
+if (document.readyState !== 'complete') { return false; }
+if (document.fonts && document.fonts.status !== 'loaded') { return false; }
+var imagenes = document.images;
+for (var i = 0; i < imagenes.length; i++) {
+    if (!imagenes[i].complete) { return false; }
+}
+return true;
+"""
+
+XPATH_BOTON_IMPRIMIR = "//button[contains(., 'Imprimir PDF')] | //a[contains(., 'Imprimir PDF')]"
+SELECTOR_OPCIONES_NG_SELECT = '.ng-dropdown-panel .ng-option, .ng-option'
+
+
+def angular_estable(driver):
+    """Condición: la aplicación Angular no tiene tareas pendientes"""
+    try:
+        return bool(driver.execute_script(JS_ANGULAR_ESTABLE))
+    except WebDriverException:
+        return False
+
+
+def recursos_cargados(driver):
+    """Condición: el documento, sus fuentes e imágenes terminaron de cargar"""
+    try:
+        return bool(driver.execute_script(JS_RECURSOS_CARGADOS))
+    except WebDriverException:
+        return False
+
+
+def opciones_ng_select_visibles(driver):
+    """Condición: el panel del ng-select está abierto y tiene opciones visibles"""
+    opciones = driver.find_elements(By.CSS_SELECTOR, SELECTOR_OPCIONES_NG_SELECT)
+    opciones_visibles = [opcion for opcion in opciones if opcion.is_displayed()]
+    return opciones_visibles or False
+
+
+def valor_en_campo(localizador, valor):
+    """
+    Condición: el campo tiene el valor esperado (el portal lo pasa a mayúsculas)
+
+    Args:
+        localizador: Tupla (By, selector) del campo
+        valor: Texto que se escribió en el campo
+    """
+    esperado = str(valor).strip().upper()
+
+    def _condicion(driver):
+        try:
+            actual = driver.find_element(*localizador).get_attribute('value') or ''
+        except WebDriverException:
+            return False
+        return actual.strip().upper() == esperado
+
+    return _condicion
+
+
+def texto_en_seleccion(texto):
+    """Condición: el ng-select muestra el texto indicado como valor seleccionado"""
+    esperado = str(texto).strip().upper()
+
+    def _condicion(driver):
+        valores = driver.find_elements(By.CSS_SELECTOR, 'ng-select .ng-value')
+        return any(esperado in valor.text.strip().upper() for valor in valores)
+
+    return _condicion
+
+
+class EsperasICFES:
+    """Esperas acotadas sobre condiciones del portal, con registro de duración"""
+
+    def __init__(self, driver, timeout=TIMEOUT_POR_DEFECTO, intervalo=INTERVALO_SONDEO):
+        """
+        Inicializa la capa de esperas
+
+        Args:
+            driver: Instancia de WebDriver sobre la que se espera
+            timeout: Tiempo máximo por defecto de cada espera (segundos)
+            intervalo: Frecuencia de sondeo de las condiciones (segundos)
+        """
+        self.driver = driver
+        self.timeout = timeout
+        self.intervalo = intervalo
+        self.registro = []
+
+    def esperar(self, nombre, condicion, timeout=None, obligatoria=True):
+        """
+        Espera a que una condición se cumpla y registra cuánto tardó
+
+        Args:
+            nombre: Nombre de la espera (para el registro)
+            condicion: Callable que recibe el driver (como las de expected_conditions)
+            timeout: Tiempo máximo en segundos (None = el valor por defecto)
+            obligatoria: Si True, relanza TimeoutException al agotar el tiempo;
+                         si False, retorna None y el proceso continúa
+
+        Returns:
+            El valor retornado por la condición, o None si no se cumplió
+        """
+        limite = self.timeout if timeout is None else timeout
+        inicio = time.monotonic()
+        try:
+            resultado = WebDriverWait(
+                self.driver, limite, poll_frequency=self.intervalo
+            ).until(condicion)
+            self._registrar(nombre, inicio, True)
+            return resultado
+        except TimeoutException:
+            self._registrar(nombre, inicio, False)
+            if obligatoria:
+                raise TimeoutException(f'Espera "{nombre}" agotada tras {limite} s')
+            return None
+
+    def _registrar(self, nombre, inicio, exito):
+        """Agrega una espera al registro"""
+        self.registro.append({
+            'espera': nombre,
+            'segundos': round(time.monotonic() - inicio, 3),
+            'exito': exito
+        })
+
+    # Esperas específicas del portal
+
+    def esperar_angular_estable(self, timeout=None):
+        """Espera a que Angular termine peticiones y renderizado pendientes"""
+        return self.esperar('angular_estable', angular_estable, timeout, obligatoria=False)
+
+    def esperar_formulario_login(self, timeout=None, obligatoria=True):
+        """Espera a que el formulario de login esté listo para usarse"""
+        self.esperar_angular_estable(timeout)
+        return self.esperar(
+            'formulario_login',
+            EC.element_to_be_clickable((By.CSS_SELECTOR, 'ng-select')),
+            timeout,
+            obligatoria=obligatoria
+        )
+
+    def esperar_opciones_ng_select(self, timeout=None):
+        """Espera a que el ng-select abierto muestre sus opciones"""
+        return self.esperar('opciones_ng_select', opciones_ng_select_visibles, timeout)
+
+    def esperar_seleccion(self, texto, timeout=None):
+        """Espera a que el ng-select refleje la opción seleccionada"""
+        return self.esperar('seleccion_tipo_documento', texto_en_seleccion(texto),
+                            timeout, obligatoria=False)
+
+    def esperar_valor(self, localizador, valor, timeout=None):
+        """Espera a que un campo de texto contenga el valor escrito"""
+        return self.esperar(f'valor_{localizador[1]}', valor_en_campo(localizador, valor),
+                            timeout, obligatoria=False)
+
+    def esperar_vista_resultados(self, timeout=TIMEOUT_RESULTADOS, obligatoria=True):
+        """Espera a que la vista de resultados esté renderizada"""
+        elemento = self.esperar(
+            'vista_resultados',
+            EC.presence_of_element_located((By.XPATH, XPATH_BOTON_IMPRIMIR)),
+            timeout,
+            obligatoria=obligatoria
+        )
+        if elemento is not None:
+            self.esperar_angular_estable()
+        return elemento
+
+    def esperar_recursos_cargados(self, timeout=None):
+        """Espera a que fuentes e imágenes estén cargadas (antes de imprimir)"""
+        return self.esperar('recursos_cargados', recursos_cargados, timeout, obligatoria=False)
+
+    def esperar_elemento_clickeable(self, nombre, localizador, timeout=None, obligatoria=True):
+        """Espera a que un elemento sea clickeable"""
+        return self.esperar(nombre, EC.element_to_be_clickable(localizador), timeout, obligatoria)
+
+    def esperar_elementos_visibles(self, nombre, localizador, timeout=None, obligatoria=True):
+        """Espera a que haya al menos un elemento visible para el localizador"""
+        return self.esperar(nombre, EC.visibility_of_any_elements_located(localizador),
+                            timeout, obligatoria)
+
+    def esperar_desaparicion(self, nombre, elemento, timeout=None):
+        """Espera a que un elemento deje de estar en el DOM (cambio de vista)"""
+        return self.esperar(nombre, EC.staleness_of(elemento), timeout, obligatoria=False)
+
+    def resumen(self):
+        """
+        Resume el registro de esperas
+
+        Returns:
+            dict: {nombre: {'cantidad', 'total', 'maximo', 'agotadas'}}
+        """
+        resumen = {}
+        for entrada in self.registro:
+            datos = resumen.setdefault(entrada['espera'], {
+                'cantidad': 0, 'total': 0.0, 'maximo': 0.0, 'agotadas': 0
+            })
+            datos['cantidad'] += 1
+            datos['total'] += entrada['segundos']
+            datos['maximo'] = max(datos['maximo'], entrada['segundos'])
+            if not entrada['exito']:
+                datos['agotadas'] += 1
+        return resumen
+
+    def reiniciar_registro(self):
+        """Vacía el registro de esperas y retorna las entradas previas"""
+        registro, self.registro = self.registro, []
+        return registro
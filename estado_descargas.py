@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estado persistente por estudiante para el descargador de resultados ICFES.
+
+Es un diario JSONL de solo-anexar: cada vez que se termina de procesar un
+estudiante se escribe una línea con su estado y se hace fsync, así que un
+fallo a mitad de la ejecución no pierde lo ya procesado. Al releer el diario
+gana la última línea de cada número de documento.
+"""
+
+import json
+import os
+from datetime import datetime
+
+# Estados posibles de un estudiante
+ESTADO_EXITOSO = 'exitoso'
+ESTADO_SIN_RESULTADOS = 'sin_resultados'
+ESTADO_ERROR = 'error'
+ESTADO_PENDIENTE = 'pendiente'
+
+
+def normalizar_documento(valor):
+    """
+    Normaliza un número de documento para usarlo como clave
+
+    Excel puede entregar el documento como int, float ('1043592724.0') o texto.
+    """
+    texto = str(valor).strip()
+    if texto.endswith('.0') and texto[:-2].isdigit():
+        texto = texto[:-2]
+    return texto
+
+
+def pdf_valido(ruta_pdf):
+    """Verifica que el archivo exista, no esté vacío y tenga cabecera PDF"""
+    if not ruta_pdf or not os.path.isfile(ruta_pdf):
+        return False
+    try:
+        if os.path.getsize(ruta_pdf) == 0:
+            return False
+        with open(ruta_pdf, 'rb') as f:
+            return f.read(5) == b'%PDF-'
+    except OSError:
+        return False
+
+
+def pdf_completo(ruta_pdf):
+    """Verifica cabecera PDF y que el archivo termine con %%EOF (descarga no truncada)"""
+    if not pdf_valido(ruta_pdf):
+        return False
+    try:
+        with open(ruta_pdf, 'rb') as f:
+            f.seek(max(0, os.path.getsize(ruta_pdf) - 1024))
+            return b'%%EOF' in f.read()
+    except OSError:
+        return False
+
+
+class EstadoDescargas:
+    """Diario JSONL con el último estado conocido de cada estudiante"""
+
+    def __init__(self, ruta_diario, carpeta_pdfs=None, solo_lectura=False):
+        """
+        Abre (o crea) el diario de estado
+
+        Args:
+            ruta_diario: Ruta del archivo .jsonl
+            carpeta_pdfs: Carpeta de PDFs ya descargados; sus PDFs completos de
+                          documentos sin registro se registran como exitosos
+            solo_lectura: No crea ni escribe el diario (lo registrado queda en memoria)
+        """
+        self.ruta_diario = ruta_diario
+        self.solo_lectura = solo_lectura
+        self.estados = {}
+        self.sembrados = 0
+        carpeta = os.path.dirname(ruta_diario)
+        if carpeta and not solo_lectura:
+            os.makedirs(carpeta, exist_ok=True)
+        self._cargar()
+        if carpeta_pdfs:
+            self.sembrados = self.sembrar_desde_pdfs(carpeta_pdfs)
+
+    def _cargar(self):
+        """Reproduce el diario; ignora una última línea truncada por un fallo"""
+        if not os.path.exists(self.ruta_diario):
+            return
+
+        with open(self.ruta_diario, 'r', encoding='utf-8') as f:
+            for linea in f:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    registro = json.loads(linea)
+                except json.JSONDecodeError:
+                    continue
+                documento = registro.get('documento')
+                if documento:
+                    self.estados[documento] = registro
+
+    def registrar(self, documento, estado, **datos):
+        """
+        Anexa el estado de un estudiante al diario y lo sincroniza a disco
+
+        Args:
+            documento: Número de documento del estudiante
+            estado: Uno de ESTADO_EXITOSO, ESTADO_SIN_RESULTADOS, ESTADO_ERROR, ESTADO_PENDIENTE
+            **datos: Campos adicionales (nombre, pdf, error, ...)
+        """
+        documento = normalizar_documento(documento)
+        anterior = self.estados.get(documento, {})
+        registro = {
+            'documento': documento,
+            'estado': estado,
+            'intentos': anterior.get('intentos', 0) + 1,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            **datos
+        }
+
+        self._anexar([registro])
+        return registro
+
+    def _anexar(self, registros):
+        """Escribe registros al final del diario con un solo fsync (en solo lectura, solo en memoria)"""
+        if not self.solo_lectura:
+            with open(self.ruta_diario, 'a', encoding='utf-8') as f:
+                for registro in registros:
+                    f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+        for registro in registros:
+            self.estados[registro['documento']] = registro
+
+    def sembrar_desde_pdfs(self, carpeta_pdfs):
+        """
+        Registra como exitosos los documentos que ya tienen un PDF completo
+
+        Sirve para un diario recién creado junto a una carpeta con descargas
+        anteriores (o hechas a mano), o para otra carpeta de salida: esos
+        estudiantes no se vuelven a procesar. En solo lectura no se escribe
+        el índice de la carpeta.
+
+        Args:
+            carpeta_pdfs: Carpeta de PDFs descargados (ver catalogo_pdfs)
+
+        Returns:
+            int: Número de documentos registrados
+        """
+        # Importación local: catalogo_pdfs usa las funciones de este módulo
+        from catalogo_pdfs import CatalogoPDFs
+
+        catalogo = CatalogoPDFs(carpeta_pdfs, None) if self.solo_lectura else CatalogoPDFs(carpeta_pdfs)
+        marca = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        registros = []
+        for documento in sorted(catalogo.documentos()):
+            if documento in self.estados:
+                continue
+            nombre = catalogo.copias(documento)[0]
+            if not catalogo.archivos[nombre]['completo']:
+                continue
+            registros.append({
+                'documento': documento,
+                'estado': ESTADO_EXITOSO,
+                'intentos': 0,
+                'timestamp': marca,
+                'pdf': catalogo.ruta(nombre),
+                'origen': 'carpeta_pdfs',
+            })
+        if registros:
+            self._anexar(registros)
+        return len(registros)
+
+    def obtener(self, documento):
+        """Retorna el último registro de un estudiante (o None)"""
+        return self.estados.get(normalizar_documento(documento))
+
+    def debe_procesar(self, documento):
+        """
+        Indica si un estudiante debe (re)procesarse
+
+        Se omite solo si su último estado es exitoso y el PDF registrado
+        sigue existiendo y es válido; los fallidos y pendientes se reintentan.
+        """
+        registro = self.obtener(documento)
+        if registro is None:
+            return True
+        if registro.get('estado') != ESTADO_EXITOSO:
+            return True
+        return not pdf_valido(registro.get('pdf'))
+
+    def contar_por_estado(self):
+        """Cuenta los estudiantes por su último estado"""
+        conteo = {}
+        for registro in self.estados.values():
+            conteo[registro['estado']] = conteo.get(registro['estado'], 0) + 1
+        return conteo
+
+    def compactar(self):
+        """Reescribe el diario dejando solo el último registro de cada estudiante"""
+        ruta_temporal = self.ruta_diario + '.tmp'
+        with open(ruta_temporal, 'w', encoding='utf-8') as f:
+            for registro in self.estados.values():
+                f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(ruta_temporal, self.ruta_diario)
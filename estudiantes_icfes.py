@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tabla de estudiantes inscritos compartida por el descargador, el verificador
+y el extractor OCR.
+
+El archivo de INSCRITOS trae unas filas de título antes del encabezado y
+rótulos con variantes ('Segundo Nombre ' con espacio, 'Tipo documento' o
+'Tipo de documento'). Aquí se detecta la fila del encabezado, se normalizan
+los rótulos y cada fila se convierte en un Estudiante con los campos ya
+limpios y su clave de archivo calculada una sola vez. La tabla se carga una
+vez por ejecución y se reutiliza mientras el archivo no cambie.
+
+Leer el .xls es lo más lento del arranque, así que la tabla ya validada se
+guarda además en un Parquet junto a los logs, con el hash del .xls en el
+nombre: las ejecuciones siguientes leen el Parquet (con memory-map) y solo se
+vuelve a leer el Excel si su contenido cambia. Sin pyarrow se lee siempre el
+Excel.
+"""
+
+import os
+import re
+import unicodedata
+
+import pandas as pd
+
+from cache_ocr import hash_archivo
+from estado_descargas import normalizar_documento
+
+try:
+    import pyarrow  # noqa: F401  (motor de Parquet de pandas)
+    PARQUET_DISPONIBLE = True
+except ImportError:
+    PARQUET_DISPONIBLE = False
+
+ARCHIVO_INSCRITOS = 'INSCRITOS_EXAMEN SABER 11 (36).xls'
+CARPETA_INSCRITOS_PARQUET = os.path.join('logs', 'inscritos')
+# Súbelo al cambiar COLUMNAS_INSCRITOS o la limpieza: invalida los Parquet guardados
+VERSION_TABLA = 2
+
+# Rótulo normalizado (sin tildes, minúsculas, espacios simples) -> atributo
+COLUMNAS_INSCRITOS = {
+    'primer apellido': 'primer_apellido',
+    'segundo apellido': 'segundo_apellido',
+    'primer nombre': 'primer_nombre',
+    'segundo nombre': 'segundo_nombre',
+    'tipo documento': 'tipo_documento',
+    'tipo de documento': 'tipo_documento',
+    'numero de documento': 'documento',
+    'numero de registro': 'registro',
+    'departamento': 'departamento',
+    'municipio': 'municipio',
+    'grupo': 'grupo',
+    'curso': 'grupo',
+}
+
+# Atributo -> rótulo con que se guarda la tabla normalizada
+ROTULOS_TABLA = {
+    'primer_apellido': 'Primer Apellido',
+    'segundo_apellido': 'Segundo Apellido',
+    'primer_nombre': 'Primer Nombre',
+    'segundo_nombre': 'Segundo Nombre',
+    'tipo_documento': 'Tipo documento',
+    'documento': 'Número de documento',
+    'registro': 'Número de registro',
+    'departamento': 'Departamento',
+    'municipio': 'Municipio',
+    'grupo': 'Grupo',
+}
+
+# Sin estas columnas no se puede trabajar; las demás solo generan un aviso
+COLUMNAS_OBLIGATORIAS = ['primer_apellido', 'segundo_apellido', 'primer_nombre',
+                         'tipo_documento', 'documento', 'registro']
+# El listado oficial no trae el grupo (lo agregan algunas instituciones): si falta no se avisa
+COLUMNAS_SIN_AVISO = {'grupo'}
+
+# Filas del inicio del archivo donde se busca el encabezado
+FILAS_BUSQUEDA_ENCABEZADO = 20
+
+CARACTERES_INVALIDOS = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
+
+
+def normalizar_rotulo(valor):
+    """'Número de documento ' -> 'numero de documento'"""
+    texto = unicodedata.normalize('NFKD', str(valor)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'\s+', ' ', texto).strip().lower()
+
+
+def limpiar_texto(valor):
+    """Texto sin espacios sobrantes; vacío si la celda está vacía o es 'NAN'"""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return ''
+    texto = str(valor).strip()
+    return '' if texto.upper() == 'NAN' else texto
+
+
+class Estudiante:
+    """Un estudiante inscrito, con sus campos limpios y su clave de archivo"""
+
+    __slots__ = ('primer_apellido', 'segundo_apellido', 'primer_nombre', 'segundo_nombre',
+                 'tipo_documento', 'documento', 'registro', 'departamento', 'municipio',
+                 'grupo', 'fila', 'clave_archivo')
+
+    def __init__(self, primer_apellido, segundo_apellido, primer_nombre, segundo_nombre='',
+                 tipo_documento='', documento='', registro='', departamento='', municipio='',
+                 grupo='', fila=None):
+        """
+        Args:
+            primer_apellido, segundo_apellido, primer_nombre, segundo_nombre: Nombres
+            tipo_documento: 'TI', 'CC', ...
+            documento: Número de documento (int, float o texto; se normaliza)
+            registro: Número de registro (AC...)
+            departamento, municipio: Ubicación del colegio
+            grupo: Grupo o curso (vacío si el listado no lo trae)
+            fila: Posición del estudiante en el archivo de inscritos
+        """
+        self.primer_apellido = limpiar_texto(primer_apellido)
+        self.segundo_apellido = limpiar_texto(segundo_apellido)
+        self.primer_nombre = limpiar_texto(primer_nombre)
+        self.segundo_nombre = limpiar_texto(segundo_nombre)
+        self.tipo_documento = limpiar_texto(tipo_documento).upper()
+        self.documento = normalizar_documento(limpiar_texto(documento))
+        self.registro = limpiar_texto(registro)
+        self.departamento = limpiar_texto(departamento)
+        self.municipio = limpiar_texto(municipio)
+        self.grupo = limpiar_texto(grupo)
+        self.fila = fila
+        self.clave_archivo = self._construir_clave_archivo()
+
+    def _construir_clave_archivo(self):
+        """APELLIDO1_APELLIDO2_NOMBRE1[_NOMBRE2]_DOCUMENTO, sin caracteres inválidos"""
+        partes = [self.primer_apellido, self.segundo_apellido, self.primer_nombre]
+        if self.segundo_nombre:
+            partes.append(self.segundo_nombre)
+        partes.append(self.documento)
+        clave = '_'.join(parte.upper() for parte in partes)
+        for caracter in CARACTERES_INVALIDOS:
+            clave = clave.replace(caracter, '_')
+        return clave
+
+    @property
+    def nombre_pdf(self):
+        """Nombre del PDF del estudiante"""
+        return f'{self.clave_archivo}.pdf'
+
+    @property
+    def nombre_completo(self):
+        """'APELLIDO1 APELLIDO2 NOMBRE1 NOMBRE2'"""
+        partes = [self.primer_apellido, self.segundo_apellido, self.primer_nombre, self.segundo_nombre]
+        return ' '.join(parte for parte in partes if parte)
+
+    def __repr__(self):
+        return f'Estudiante({self.clave_archivo!r})'
+
+
+def estudiantes_desde_dataframe(df):
+    """
+    Convierte un DataFrame con las columnas de inscritos en Estudiantes
+
+    Los rótulos se reconocen sin importar tildes, mayúsculas ni espacios; se
+    omiten las filas sin número de documento.
+
+    Returns:
+        list de Estudiante
+    """
+    atributos = {}
+    for columna in df.columns:
+        atributo = COLUMNAS_INSCRITOS.get(normalizar_rotulo(columna))
+        if atributo and atributo not in atributos:
+            atributos[atributo] = columna
+
+    faltantes = {'primer_apellido', 'primer_nombre', 'documento'} - atributos.keys()
+    if faltantes:
+        raise ValueError(f'Faltan columnas en el archivo de inscritos: {", ".join(sorted(faltantes))}')
+
+    columnas = {atributo: df[columna].tolist() for atributo, columna in atributos.items()}
+    estudiantes = []
+    for fila in range(len(df)):
+        datos = {atributo: valores[fila] for atributo, valores in columnas.items()}
+        if not limpiar_texto(datos['documento']):
+            continue
+        estudiantes.append(Estudiante(
+            datos.get('primer_apellido'), datos.get('segundo_apellido'), datos.get('primer_nombre'),
+            datos.get('segundo_nombre'), datos.get('tipo_documento'), datos['documento'],
+            datos.get('registro'), datos.get('departamento'), datos.get('municipio'),
+            datos.get('grupo'), fila=len(estudiantes)
+        ))
+    return estudiantes
+
+
+def leer_inscritos(ruta):
+    """
+    Lee el archivo de inscritos detectando la fila del encabezado
+
+    Returns:
+        DataFrame con el encabezado ya aplicado
+    """
+    crudo = pd.read_excel(ruta, header=None, dtype=object)
+    for fila in range(min(FILAS_BUSQUEDA_ENCABEZADO, len(crudo))):
+        rotulos = {normalizar_rotulo(valor) for valor in crudo.iloc[fila] if limpiar_texto(valor)}
+        if 'numero de documento' in rotulos and 'primer apellido' in rotulos:
+            df = crudo.iloc[fila + 1:].reset_index(drop=True)
+            df.columns = [limpiar_texto(valor) for valor in crudo.iloc[fila]]
+            return df
+    raise ValueError(f'No se encontró el encabezado de estudiantes en {ruta}')
+
+
+def normalizar_inscritos(df):
+    """
+    Tabla de inscritos con rótulos canónicos (ROTULOS_TABLA) y celdas como texto limpio
+
+    Valida las columnas: si falta una de COLUMNAS_OBLIGATORIAS lanza
+    ValueError; si faltan Departamento o Municipio solo avisa. Se omiten las
+    filas sin número de documento.
+    """
+    columnas = {}
+    for columna in df.columns:
+        atributo = COLUMNAS_INSCRITOS.get(normalizar_rotulo(columna))
+        if atributo and atributo not in columnas:
+            columnas[atributo] = columna
+
+    faltantes = [ROTULOS_TABLA[atributo] for atributo in COLUMNAS_OBLIGATORIAS if atributo not in columnas]
+    if faltantes:
+        raise ValueError(f'Faltan columnas en el archivo de inscritos: {", ".join(faltantes)}')
+    opcionales = [ROTULOS_TABLA[atributo] for atributo in ROTULOS_TABLA
+                  if atributo not in columnas and atributo not in COLUMNAS_SIN_AVISO]
+    if opcionales:
+        print(f'⚠️  El archivo de inscritos no tiene: {", ".join(opcionales)}')
+
+    tabla = pd.DataFrame({
+        ROTULOS_TABLA[atributo]: [limpiar_texto(valor) for valor in df[columnas[atributo]]]
+        if atributo in columnas else [''] * len(df)
+        for atributo in ROTULOS_TABLA
+    })
+    tabla['Número de documento'] = tabla['Número de documento'].map(normalizar_documento)
+    return tabla[tabla['Número de documento'] != ''].reset_index(drop=True)
+
+
+def ruta_parquet_inscritos(ruta):
+    """Parquet de un archivo de inscritos, nombrado por el hash de su contenido"""
+    base = os.path.splitext(os.path.basename(ruta))[0]
+    base = re.sub(r'[^\w-]+', '_', base).strip('_')
+    return os.path.join(CARPETA_INSCRITOS_PARQUET,
+                        f'{base}_{hash_archivo(ruta)[:16]}_v{VERSION_TABLA}.parquet')
+
+
+def tabla_inscritos(ruta=ARCHIVO_INSCRITOS):
+    """
+    Tabla normalizada de inscritos, del Parquet si ya existe para este contenido
+
+    La primera vez se lee el Excel, se valida y se guarda el Parquet.
+
+    Returns:
+        DataFrame con los rótulos de ROTULOS_TABLA
+    """
+    if not PARQUET_DISPONIBLE:
+        return normalizar_inscritos(leer_inscritos(ruta))
+
+    ruta_parquet = ruta_parquet_inscritos(ruta)
+    if os.path.exists(ruta_parquet):
+        try:
+            return pd.read_parquet(ruta_parquet, memory_map=True)
+        except Exception as e:
+            print(f'⚠️  No se pudo leer {ruta_parquet}, se vuelve a leer el Excel: {e}')
+
+    tabla = normalizar_inscritos(leer_inscritos(ruta))
+    try:
+        os.makedirs(CARPETA_INSCRITOS_PARQUET, exist_ok=True)
+        ruta_temporal = f'{ruta_parquet}.{os.getpid()}.tmp'
+        tabla.to_parquet(ruta_temporal, index=False)
+        os.replace(ruta_temporal, ruta_parquet)
+    except Exception as e:
+        print(f'⚠️  No se pudo guardar {ruta_parquet}: {e}')
+    return tabla
+
+
+_tablas = {}
+
+
+def cargar_estudiantes(ruta=ARCHIVO_INSCRITOS):
+    """
+    Estudiantes del archivo de inscritos, leídos una vez por ejecución
+
+    La tabla se reutiliza mientras el archivo no cambie de tamaño ni de fecha;
+    entre ejecuciones se reutiliza el Parquet (ver tabla_inscritos).
+
+    Returns:
+        tuple de Estudiante, en el orden del archivo
+    """
+    estado = os.stat(ruta)
+    firma = (os.path.abspath(ruta), estado.st_size, estado.st_mtime_ns)
+    if firma not in _tablas:
+        _tablas[firma] = tuple(estudiantes_desde_dataframe(tabla_inscritos(ruta)))
+    return _tablas[firma]
@@ -9,9 +9,17 @@ from pdf2image import convert_from_path
 import os
 import sys
 import re
+from cache_ocr import cache_por_defecto
 
 def extraer_texto_con_ocr(pdf_path, max_pages=3):
-    """Extrae texto de un PDF usando OCR"""
+    """Extrae texto de un PDF usando OCR (reutiliza la caché OCR si ya se procesó)"""
+    cache = cache_por_defecto()
+    config = {'dpi': 300, 'lang': 'spa', 'paginas': max_pages, 'modo': 'texto_completo'}
+    entrada = cache.obtener(pdf_path, config)
+    if entrada is not None:
+        print(f"\n♻️  Texto OCR tomado de la caché ({cache.carpeta})")
+        return entrada['texto']
+    
     print(f"\n🔍 Convirtiendo PDF a imágenes...")
     
     try:
@@ -36,6 +44,7 @@ def extraer_texto_con_ocr(pdf_path, max_pages=3):
             full_text += text
             full_text += "\n"
         
+        cache.guardar(pdf_path, config, {'texto': full_text})
         return full_text
         
     except Exception as e:
@@ -3,15 +3,33 @@
 """
 Script para extraer puntajes de los PDFs de resultados ICFES usando OCR mejorado.
 Los puntajes SÍ están en los PDFs en la sección "Puntaje por pruebas".
+
+Primero se lee la capa de texto del PDF (milisegundos); el OCR solo se usa
+si el PDF no tiene texto o los puntajes leídos no pasan la validación. El OCR
+se hace sobre recortes del bloque "Puntaje por pruebas" (plantilla por diseño
+de página), empezando por un nivel barato (DPI bajo) y subiendo de nivel solo
+si la validación falla; la página completa es el último recurso.
+Los PDFs se procesan en paralelo con un pool de procesos (NUM_PROCESOS).
 """
 
 import pandas as pd
+import numpy as np
 import os
 import sys
 import re
+import json
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pdfplumber
 from pdf2image import convert_from_path
 import pytesseract
 from datetime import datetime
+from agregados_icfes import AgregadosResultados, bloquear_archivo, desbloquear_archivo
+from cache_ocr import cache_por_defecto
+from catalogo_pdfs import CatalogoPDFs
+from estudiantes_icfes import cargar_estudiantes
 
 # Configuración
 ARCHIVO_EXCEL_ENTRADA = 'INSCRITOS_EXAMEN SABER 11 (36).xls'
@@ -19,25 +37,585 @@ ARCHIVO_EXCEL_SALIDA = 'RESULTADOS-ICFES-AULA-REGULAR.xlsx'
 CARPETA_PDFS = 'pdfs_descargados'
 CARPETA_LOGS = 'logs'
 
+AREAS = ['Lectura Crítica', 'Matemáticas', 'Sociales y Ciudadanas', 'Ciencias Naturales', 'Inglés']
+
+# Primera palabra (sin tildes, en minúscula) con que empieza el rótulo de cada área
+PALABRA_AREA = {
+    'lectura': 'Lectura Crítica',
+    'matematicas': 'Matemáticas',
+    'sociales': 'Sociales y Ciudadanas',
+    'ciencias': 'Ciencias Naturales',
+    'ingles': 'Inglés',
+}
+
+PATRON_PUNTAJE_AREA = re.compile(r'(\d{1,3})\s*/\s*100\b')
+PATRON_PUNTAJE_GLOBAL = re.compile(r'(\d{1,3})\s*/\s*500\b')
+TOLERANCIA_LINEA = 3  # puntos PDF de diferencia vertical para considerar la misma línea
+
+# Plantillas de regiones (ROI) por diseño de página, localizadas una sola vez
+ARCHIVO_PLANTILLAS_ROI = os.path.join(CARPETA_LOGS, 'plantillas_roi.json')
+# Solo dígitos y '/' en los recortes: evita leer "57/100" como "57100"
+CONFIG_OCR_ROI = r'--oem 3 --psm {psm} -c tessedit_char_whitelist=0123456789/'
+
+# Niveles del OCR por regiones, del más barato al más costoso. Se sube de nivel
+# solo si los puntajes no pasan la validación (psm 7 = una línea, 8 = una palabra)
+NIVELES_OCR = [
+    {'nombre': 'rapido', 'dpi': 150, 'psm': 7},
+    {'nombre': 'estandar', 'dpi': 300, 'psm': 7},
+    {'nombre': 'alto', 'dpi': 400, 'psm': 8},
+]
+DPI_LOCALIZACION = 300  # DPI mínimo para localizar una plantilla nueva
+DPI_PAGINA_COMPLETA = 300
+TOLERANCIA_GLOBAL = 1  # diferencia admitida por redondeo entre el global leído y el calculado
+# Parser por lotes: números de 2-6 dígitos y puntaje global "XXX/500"
+PATRON_NUMEROS_LINEA = re.compile(r'(\d{2,6})')
+PATRON_GLOBAL_OCR = re.compile(r'(\d{1,3})\s*/\s*500')
+# Palabras del OCR que pueden ser un puntaje: "57/100", "57", "57100"
+PATRON_TOKEN_PUNTAJE = re.compile(r'^\d{1,3}(/\d{0,3})?$|^\d{4,6}$')
+
+# Parte de la clave de la caché OCR: si cambia, la caché se invalida
+CONFIG_OCR = {'niveles': NIVELES_OCR, 'dpi_pagina': DPI_PAGINA_COMPLETA, 'lang': 'spa',
+              'psm_pagina': 6, 'whitelist': '0123456789/'}
+# Súbelo al cambiar leer_puntaje_recorte: la caché por regiones se re-interpreta sin OCR
+# (el texto de página completa se interpreta siempre al leerlo)
+VERSION_PARSER = 1
+
+def nucleos_disponibles():
+    """Núcleos que este proceso puede usar (respeta taskset/cgroups en Linux)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+# Procesos para OCR en paralelo (1 = secuencial en este mismo proceso)
+NUM_PROCESOS = int(os.environ.get('ICFES_PROCESOS_OCR', nucleos_disponibles()))
+# Trabajos enviados al pool sin recoger; limita memoria y resultados en espera
+MAX_EN_VUELO_POR_PROCESO = 2
+
+def rasterizar_primera_pagina(pdf_path, dpi=300):
+    """Convierte la primera página del PDF (donde están los puntajes) en imagen"""
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=1, last_page=1)
+    return images[0] if images else None
+
+def ocr_imagen(imagen):
+    """Aplica Tesseract a una imagen con configuración optimizada para números"""
+    custom_config = r'--oem 3 --psm 6'
+    return pytesseract.image_to_string(imagen, lang='spa', config=custom_config)
+
 def extraer_texto_pdf(pdf_path):
     """Extrae texto de la primera página del PDF usando OCR"""
     try:
-        # Convertir solo la primera página (donde están los puntajes)
-        images = convert_from_path(pdf_path, dpi=300, first_page=1, last_page=1)
+        imagen = rasterizar_primera_pagina(pdf_path)
         
-        if not images:
+        if imagen is None:
             return None
         
-        # Extraer texto con configuración optimizada para números
-        custom_config = r'--oem 3 --psm 6'
-        texto = pytesseract.image_to_string(images[0], lang='spa', config=custom_config)
-        
-        return texto
+        return ocr_imagen(imagen)
         
     except Exception as e:
         print(f'   ❌ Error al extraer texto: {e}')
         return None
 
+def sin_tildes(texto):
+    """'Matemáticas' -> 'matematicas'"""
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii').lower()
+
+def emparejar_rotulos(rotulos, numeros, tolerancia):
+    """
+    Asigna a cada rótulo el número más cercano (cada número se usa una sola vez)
+
+    El número puede estar a la derecha en la misma línea o, si la tabla va
+    en columnas, debajo del rótulo.
+
+    Args:
+        rotulos: [(clave, palabra), ...] con palabras {'x0', 'x1', 'top'}
+        numeros: [palabra, ...]
+        tolerancia: Diferencia vertical máxima para considerar la misma línea
+
+    Returns:
+        dict: {clave: índice en numeros}
+    """
+    candidatos = []
+    for clave, rotulo in rotulos:
+        for indice, numero in enumerate(numeros):
+            dy = numero['top'] - rotulo['top']
+            if abs(dy) <= tolerancia and numero['x0'] >= rotulo['x0']:
+                distancia = numero['x0'] - rotulo['x1']
+            elif dy > tolerancia:
+                centro_rotulo = (rotulo['x0'] + rotulo['x1']) / 2
+                centro_numero = (numero['x0'] + numero['x1']) / 2
+                distancia = dy + abs(centro_numero - centro_rotulo)
+            else:
+                continue
+            candidatos.append((distancia, clave, indice))
+
+    asignados = {}
+    usados = set()
+    for _, clave, indice in sorted(candidatos):
+        if clave not in asignados and indice not in usados:
+            asignados[clave] = indice
+            usados.add(indice)
+    return asignados
+
+def agrupar_lineas(palabras):
+    """
+    Agrupa las palabras de pdfplumber en líneas según su posición vertical
+
+    Returns:
+        list: [(texto_linea, [(inicio_en_texto, palabra), ...]), ...] de arriba a abajo
+    """
+    lineas = []
+    for palabra in sorted(palabras, key=lambda p: (round(p['top']), p['x0'])):
+        if lineas and abs(lineas[-1][0] - palabra['top']) <= TOLERANCIA_LINEA:
+            lineas[-1][1].append(palabra)
+        else:
+            lineas.append((palabra['top'], [palabra]))
+
+    resultado = []
+    for _, palabras_linea in lineas:
+        palabras_linea.sort(key=lambda p: p['x0'])
+        texto = ''
+        posiciones = []
+        for palabra in palabras_linea:
+            if texto:
+                texto += ' '
+            posiciones.append((len(texto), palabra))
+            texto += palabra['text']
+        resultado.append((texto, posiciones))
+    return resultado
+
+def _palabra_en(posiciones, indice):
+    """Palabra de la línea que contiene el carácter indice"""
+    elegida = posiciones[0][1]
+    for inicio, palabra in posiciones:
+        if inicio > indice:
+            break
+        elegida = palabra
+    return elegida
+
+def extraer_puntajes_capa_texto(pdf_path):
+    """
+    Lee los puntajes de la capa de texto de la primera página (sin OCR)
+
+    Cada "NN/100" se asigna al rótulo de área más cercano: el primero a su
+    derecha en la misma línea o, si la tabla va en columnas, el que queda
+    justo encima.
+
+    Returns:
+        dict: Puntajes (None donde no se encontró); None si el PDF no tiene texto
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        if not pdf.pages:
+            return None
+        pagina = pdf.pages[0]
+        palabras = pagina.extract_words(keep_blank_chars=False, use_text_flow=False)
+
+    if not palabras:
+        return None
+
+    puntajes = {area: None for area in AREAS}
+    puntajes['Puntaje Global'] = None
+
+    rotulos = []
+    numeros = []
+    for texto, posiciones in agrupar_lineas(palabras):
+        if puntajes['Puntaje Global'] is None:
+            match_global = PATRON_PUNTAJE_GLOBAL.search(texto)
+            if match_global:
+                puntajes['Puntaje Global'] = int(match_global.group(1))
+
+        for _, palabra in posiciones:
+            area = PALABRA_AREA.get(sin_tildes(palabra['text']).strip(':'))
+            if area:
+                rotulos.append((area, palabra))
+
+        for match in PATRON_PUNTAJE_AREA.finditer(texto):
+            palabra = _palabra_en(posiciones, match.start())
+            numeros.append((int(match.group(1)), palabra))
+
+    numeros = [(valor, palabra) for valor, palabra in numeros if 0 <= valor <= 100]
+    asignados = emparejar_rotulos(rotulos, [palabra for _, palabra in numeros], TOLERANCIA_LINEA)
+    for area, indice in asignados.items():
+        puntajes[area] = numeros[indice][0]
+
+    return puntajes
+
+def calcular_puntaje_global(puntajes):
+    """Puntaje global ICFES: promedio ponderado (peso 3 las cuatro primeras, 1 inglés) x 5"""
+    ponderado = sum(3 * puntajes[area] for area in AREAS[:4]) + puntajes['Inglés']
+    return round(ponderado / 13 * 5)
+
+def puntajes_validos(puntajes):
+    """
+    Valida los invariantes de un resultado ICFES
+
+    Las cinco áreas presentes y en 0-100, el global en 0-500 y coherente
+    con el global calculado a partir de las áreas.
+    """
+    if not puntajes:
+        return False
+    if any(puntajes.get(area) is None or not 0 <= puntajes[area] <= 100 for area in AREAS):
+        return False
+    global_ = puntajes.get('Puntaje Global')
+    if global_ is None or not 0 <= global_ <= 500:
+        return False
+    return abs(global_ - calcular_puntaje_global(puntajes)) <= TOLERANCIA_GLOBAL
+
+def palabras_ocr(imagen):
+    """Palabras de la página con su caja en píxeles, en el formato de pdfplumber"""
+    datos = pytesseract.image_to_data(imagen, lang='spa', config=r'--oem 3 --psm 6',
+                                      output_type=pytesseract.Output.DICT)
+    palabras = []
+    for texto, x, y, ancho, alto in zip(datos['text'], datos['left'], datos['top'],
+                                        datos['width'], datos['height']):
+        texto = texto.strip()
+        if texto:
+            palabras.append({'text': texto, 'x0': x, 'x1': x + ancho, 'top': y, 'bottom': y + alto})
+    return palabras
+
+def localizar_plantilla(imagen):
+    """
+    Ubica las regiones de los puntajes con un OCR completo de la página
+
+    Usa el ancla "Puntaje por pruebas" para quedarse con los rótulos de
+    área del bloque de puntajes (no con menciones en otras partes).
+
+    Returns:
+        dict: {'regiones': {clave: [x0, y0, x1, y1]}} en fracciones de la página,
+              o None si no se encontraron las seis regiones
+    """
+    ancho, alto = imagen.size
+    palabras = palabras_ocr(imagen)
+    if not palabras:
+        return None
+
+    alto_linea = sorted(p['bottom'] - p['top'] for p in palabras)[len(palabras) // 2]
+    ancla = next((p['top'] for p in palabras if sin_tildes(p['text']) == 'pruebas'), None)
+
+    rotulos = []
+    numeros = []
+    for palabra in palabras:
+        clave = sin_tildes(palabra['text']).strip(':')
+        if clave in PALABRA_AREA and (ancla is None or palabra['top'] >= ancla - alto_linea):
+            rotulos.append((PALABRA_AREA[clave], palabra))
+        elif clave == 'global':
+            rotulos.append(('Puntaje Global', palabra))
+        elif PATRON_TOKEN_PUNTAJE.match(palabra['text']):
+            numeros.append(palabra)
+
+    asignados = emparejar_rotulos(rotulos, numeros, alto_linea / 2)
+    if len(asignados) < len(AREAS) + 1:
+        return None
+
+    regiones = {}
+    for clave, indice in asignados.items():
+        numero = numeros[indice]
+        margen = numero['bottom'] - numero['top']
+        # A la derecha cabe el "/100" aunque el OCR lo haya separado del número
+        caja = (max(0, numero['x0'] - margen), max(0, numero['top'] - margen / 2),
+                min(ancho, numero['x1'] + 3 * margen), min(alto, numero['bottom'] + margen / 2))
+        regiones[clave] = [caja[0] / ancho, caja[1] / alto, caja[2] / ancho, caja[3] / alto]
+    return {'regiones': regiones}
+
+_plantillas_roi = None
+
+def _clave_plantilla(imagen, dpi):
+    """Tamaño de la página en puntos, que identifica su diseño: '612x792'"""
+    return f'{round(imagen.size[0] * 72 / dpi)}x{round(imagen.size[1] * 72 / dpi)}'
+
+def obtener_plantilla(imagen, dpi):
+    """
+    Plantilla de regiones para el diseño de esta página (por tamaño de página)
+
+    Se localiza una sola vez por diseño y se guarda en ARCHIVO_PLANTILLAS_ROI.
+    Las regiones van en fracciones de la página, así que sirven para cualquier
+    DPI; solo se localizan en imágenes de al menos DPI_LOCALIZACION.
+
+    Args:
+        imagen: Primera página rasterizada
+        dpi: DPI con que se rasterizó (para obtener el tamaño en puntos)
+    """
+    global _plantillas_roi
+    if _plantillas_roi is None:
+        try:
+            with open(ARCHIVO_PLANTILLAS_ROI, 'r', encoding='utf-8') as f:
+                _plantillas_roi = json.load(f)
+        except (OSError, ValueError):
+            _plantillas_roi = {}
+
+    clave = _clave_plantilla(imagen, dpi)
+    if clave not in _plantillas_roi:
+        if dpi < DPI_LOCALIZACION:
+            return None
+        plantilla = localizar_plantilla(imagen)
+        if plantilla is None:
+            return None
+        guardar_plantilla(imagen, dpi, plantilla)
+    return _plantillas_roi[clave]
+
+def guardar_plantilla(imagen, dpi, plantilla):
+    """
+    Reemplaza la plantilla compartida del diseño de esta página y la escribe a disco
+
+    Los procesos del pool escriben el mismo archivo: bajo un bloqueo se vuelve
+    a leer y solo se reemplaza la clave de este diseño, así no se pierden las
+    plantillas que otro proceso guardó entre tanto.
+    """
+    global _plantillas_roi
+    clave = _clave_plantilla(imagen, dpi)
+    _plantillas_roi[clave] = plantilla
+    try:
+        os.makedirs(CARPETA_LOGS, exist_ok=True)
+        with open(f'{ARCHIVO_PLANTILLAS_ROI}.lock', 'a+b') as candado:
+            bloquear_archivo(candado)
+            try:
+                try:
+                    with open(ARCHIVO_PLANTILLAS_ROI, 'r', encoding='utf-8') as f:
+                        plantillas = json.load(f)
+                except (OSError, ValueError):
+                    plantillas = {}
+                plantillas[clave] = plantilla
+                ruta_temporal = f'{ARCHIVO_PLANTILLAS_ROI}.{os.getpid()}.tmp'
+                with open(ruta_temporal, 'w', encoding='utf-8') as f:
+                    json.dump(plantillas, f, ensure_ascii=False, indent=2)
+                os.replace(ruta_temporal, ARCHIVO_PLANTILLAS_ROI)
+            finally:
+                desbloquear_archivo(candado)
+        # Las plantillas que guardaron los demás procesos también sirven a este
+        _plantillas_roi = {**_plantillas_roi, **plantillas}
+    except OSError as e:
+        print(f'   ⚠️  No se pudo guardar la plantilla de regiones: {e}')
+
+def leer_puntaje_recorte(texto, maximo):
+    """
+    Interpreta el OCR de un recorte: "57/100" -> 57
+
+    Si el OCR perdió la barra ("57100"), se quita el sufijo del máximo.
+    """
+    texto = re.sub(r'\s', '', texto or '')
+    match = re.match(r'(\d{1,3})/', texto)
+    if match:
+        valor = int(match.group(1))
+    else:
+        digitos = re.sub(r'\D', '', texto)
+        sufijo = str(maximo)
+        if digitos.endswith(sufijo) and len(digitos) > len(sufijo):
+            digitos = digitos[:-len(sufijo)]
+        if not digitos or len(digitos) > 3:
+            return None
+        valor = int(digitos)
+    return valor if 0 <= valor <= maximo else None
+
+def ocr_regiones(imagen, plantilla, psm=7):
+    """
+    OCR de cada región de la plantilla (solo dígitos y '/')
+
+    Returns:
+        dict: {clave: texto OCR crudo del recorte}
+    """
+    ancho, alto = imagen.size
+    textos = {}
+    for clave, (x0, y0, x1, y1) in plantilla['regiones'].items():
+        recorte = imagen.crop((int(x0 * ancho), int(y0 * alto), int(x1 * ancho), int(y1 * alto)))
+        textos[clave] = pytesseract.image_to_string(recorte, lang='spa',
+                                                    config=CONFIG_OCR_ROI.format(psm=psm))
+    return textos
+
+def puntajes_de_regiones(textos):
+    """Interpreta los textos crudos de ocr_regiones()"""
+    puntajes = {area: None for area in AREAS}
+    puntajes['Puntaje Global'] = None
+    for clave, texto in textos.items():
+        puntajes[clave] = leer_puntaje_recorte(texto, 500 if clave == 'Puntaje Global' else 100)
+    return puntajes
+
+def leer_regiones(imagen, dpi=300, psm=7, relocalizacion=None):
+    """
+    OCR por regiones; si no valida, relocaliza la plantilla una vez por PDF
+
+    La plantilla relocalizada es local al PDF: la compartida solo se
+    reemplaza cuando la nueva produce puntajes válidos, así un PDF dañado no
+    estropea la plantilla de los demás.
+
+    Args:
+        relocalizacion: dict por PDF compartido entre niveles (None = uno nuevo);
+                        guarda la plantilla relocalizada para que los niveles
+                        siguientes la reutilicen sin otro OCR de página completa
+
+    Returns:
+        tuple: (puntajes, textos, plantilla), o (None, None, None) si no hay plantilla
+    """
+    if relocalizacion is None:
+        relocalizacion = {}
+    plantilla = relocalizacion.get('plantilla') or obtener_plantilla(imagen, dpi)
+    if plantilla is None:
+        return None, None, None
+    textos = ocr_regiones(imagen, plantilla, psm)
+    puntajes = puntajes_de_regiones(textos)
+    if puntajes_validos(puntajes):
+        if relocalizacion.get('plantilla') is plantilla:
+            guardar_plantilla(imagen, dpi, plantilla)
+        return puntajes, textos, plantilla
+    if dpi < DPI_LOCALIZACION or relocalizacion.get('intentada'):
+        return puntajes, textos, plantilla
+
+    # El diseño pudo cambiar con el mismo tamaño de página
+    relocalizacion['intentada'] = True
+    nueva = localizar_plantilla(imagen)
+    if nueva is None:
+        return puntajes, textos, plantilla
+    relocalizacion['plantilla'] = nueva
+    textos = ocr_regiones(imagen, nueva, psm)
+    puntajes = puntajes_de_regiones(textos)
+    if puntajes_validos(puntajes):
+        guardar_plantilla(imagen, dpi, nueva)
+    return puntajes, textos, nueva
+
+def extraer_puntajes_roi(imagen, dpi=300, psm=7):
+    """Puntajes por OCR de regiones, o None si no hay plantilla para esta página"""
+    return leer_regiones(imagen, dpi, psm)[0]
+
+def interpretar_entrada_cache(entrada, interpretar_texto=True):
+    """
+    Puntajes de una entrada de la caché OCR
+
+    Si la entrada por regiones es de otra versión del parser, se vuelven a
+    interpretar los textos crudos guardados sin repetir el OCR. El texto de
+    página completa se interpreta siempre al leerlo (no se guardan sus
+    puntajes), así nunca queda desactualizado.
+
+    Args:
+        entrada: Entrada de la caché (ver ocr_pdf)
+        interpretar_texto: Si False, el texto de página completa se deja sin
+                           interpretar (puntajes None) para hacerlo en lote
+                           con interpretar_pendientes()
+    """
+    metodo = entrada.get('metodo')
+    if str(metodo).startswith('roi'):
+        if entrada.get('version_parser') == VERSION_PARSER:
+            puntajes = entrada.get('puntajes')
+        elif entrada.get('textos_regiones'):
+            puntajes = puntajes_de_regiones(entrada['textos_regiones'])
+        else:
+            puntajes = None
+    elif entrada.get('texto') and interpretar_texto:
+        puntajes = extraer_puntajes(entrada['texto'])
+    else:
+        puntajes = None
+    return puntajes, metodo, entrada.get('texto')
+
+def ocr_pdf(pdf_path):
+    """
+    OCR de un PDF sin capa de texto útil
+
+    Recorre NIVELES_OCR del más barato al más costoso y se detiene en el
+    primero cuyos puntajes pasan la validación; si ninguno pasa, hace OCR de
+    la página completa.
+
+    Returns:
+        dict: Entrada para la caché (metodo, nivel, niveles intentados,
+              textos crudos, regiones y, por regiones, los puntajes), o None
+              si no se pudo leer
+    """
+    entrada = {'version_parser': VERSION_PARSER, 'niveles_intentados': []}
+    imagen_pagina = None
+    relocalizacion = {}
+
+    for nivel in NIVELES_OCR:
+        try:
+            imagen = rasterizar_primera_pagina(pdf_path, dpi=nivel['dpi'])
+            if imagen is None:
+                return None
+            if nivel['dpi'] == DPI_PAGINA_COMPLETA:
+                imagen_pagina = imagen
+            puntajes, textos, plantilla = leer_regiones(imagen, nivel['dpi'], nivel['psm'], relocalizacion)
+        except Exception as e:
+            print(f'   ⚠️  Error en el OCR por regiones ({nivel["nombre"]}): {e}')
+            continue
+
+        if textos is None:
+            continue
+        entrada['niveles_intentados'].append(nivel['nombre'])
+        entrada['textos_regiones'] = textos
+        entrada['regiones'] = plantilla['regiones']
+        if puntajes_validos(puntajes):
+            entrada.update(metodo=f'roi_{nivel["nombre"]}', nivel=nivel['nombre'], puntajes=puntajes)
+            return entrada
+
+    try:
+        imagen = imagen_pagina or rasterizar_primera_pagina(pdf_path, dpi=DPI_PAGINA_COMPLETA)
+        if imagen is None:
+            return None
+        texto = ocr_imagen(imagen)
+    except Exception as e:
+        print(f'   ❌ Error al extraer texto: {e}')
+        return None
+    if not texto:
+        return None
+    entrada.update(metodo='ocr', texto=texto)
+    return entrada
+
+def extraer_puntajes_pdf(pdf_path, usar_cache=True, interpretar_texto=True):
+    """
+    Extrae los puntajes de un PDF: capa de texto, luego OCR por regiones y
+    por último OCR de la página completa
+
+    El resultado del OCR se guarda en la caché (cache_ocr.py) por hash del
+    PDF y configuración, así que un PDF ya visto no se vuelve a rasterizar.
+
+    Args:
+        pdf_path: Ruta del PDF
+        usar_cache: Si False, no se lee ni se escribe la caché OCR
+        interpretar_texto: Ver interpretar_entrada_cache
+
+    Returns:
+        tuple: (puntajes, metodo, texto_ocr) con metodo 'texto', 'roi_<nivel>'
+               u 'ocr'; texto_ocr es None si no se usó el OCR de página completa
+    """
+    try:
+        puntajes = extraer_puntajes_capa_texto(pdf_path)
+        if puntajes_validos(puntajes):
+            return puntajes, 'texto', None
+    except Exception as e:
+        print(f'   ⚠️  No se pudo leer la capa de texto: {e}')
+
+    cache = cache_por_defecto() if usar_cache else None
+    if cache is not None:
+        try:
+            entrada = cache.obtener(pdf_path, CONFIG_OCR)
+        except OSError:
+            entrada = None
+        if entrada is not None:
+            return interpretar_entrada_cache(entrada, interpretar_texto)
+
+    entrada = ocr_pdf(pdf_path)
+    if entrada is None:
+        return None, 'ocr', None
+
+    if cache is not None:
+        try:
+            cache.guardar(pdf_path, CONFIG_OCR, entrada)
+        except OSError as e:
+            print(f'   ⚠️  No se pudo guardar en la caché OCR: {e}')
+    return interpretar_entrada_cache(entrada, interpretar_texto)
+
+def reparar_numeros(numeros):
+    """
+    Recupera el puntaje de números que el OCR pegó con el "/100"
+
+    "407100" → 40, "57100" → 57, "5700" → 57, "157" → 57, "57" → 57
+
+    Args:
+        numeros: Arreglo NumPy de enteros leídos por el OCR
+
+    Returns:
+        numpy.ndarray: Puntajes reparados (sin validar rango)
+    """
+    return np.select(
+        [numeros >= 100000, numeros >= 10000, numeros >= 1000, numeros > 100],
+        [numeros // 10000, numeros // 1000, numeros // 100, numeros % 100],
+        default=numeros
+    )
+
 def extraer_puntajes(texto):
     """
     Extrae los puntajes del texto OCR.
@@ -88,31 +666,13 @@ def extraer_puntajes(texto):
 
             # Buscar todos los números de 2-6 dígitos en esta línea
             # El OCR puede leer "57/100" como "57100", "157 00", "5700", "407100", etc.
-            numeros = re.findall(r'(\d{2,6})', linea)
+            numeros = PATRON_NUMEROS_LINEA.findall(linea)
 
             if len(numeros) >= 5:
                 # Tenemos al menos 5 números, probablemente son los puntajes
-                puntajes_candidatos = []
-
-                for num_str in numeros:
-                    # Intentar extraer el puntaje
-                    # Puede ser: "57100" → 57, "407100" → 40, "5700" → 57, "157" → 57
-                    num = int(num_str)
-
-                    if num >= 100000:  # Formato: 407100 → 40
-                        puntaje = num // 10000
-                    elif num >= 10000:  # Formato: 57100 → 57, 42100 → 42
-                        puntaje = num // 1000
-                    elif num >= 1000:  # Formato: 5700 → 57, 4700 → 47, 2900 → 29
-                        puntaje = num // 100
-                    elif num > 100:  # Formato: 157 → 57 (quitar primer dígito)
-                        puntaje = num % 100
-                    else:  # Formato: 57, 00
-                        puntaje = num
-
-                    # Validar rango y excluir 0 (que suele ser ruido del OCR como "00")
-                    if 1 <= puntaje <= 100:
-                        puntajes_candidatos.append(puntaje)
+                reparados = reparar_numeros(np.array(numeros, dtype=np.int64))
+                # Validar rango y excluir 0 (que suele ser ruido del OCR como "00")
+                puntajes_candidatos = [int(p) for p in reparados if 1 <= p <= 100]
 
                 # Si tenemos exactamente 5 puntajes, asignarlos en orden
                 if len(puntajes_candidatos) >= 5:
@@ -125,22 +685,204 @@ def extraer_puntajes(texto):
 
     return puntajes
 
+def extraer_puntajes_lote(textos):
+    """
+    Versión por lotes de extraer_puntajes para muchos textos OCR a la vez
+
+    Aplica las mismas reglas (línea de nombres de áreas, hasta 3 líneas
+    siguientes con al menos 5 números, reparación de dígitos) con operaciones
+    de pandas/NumPy sobre todo el lote, y valida en bloque áreas y global.
+
+    Args:
+        textos: Series (o lista) de textos OCR; None o vacío se aceptan
+
+    Returns:
+        DataFrame: Una fila por texto (mismo índice) con AREAS, 'Puntaje Global'
+                   (Int64) y 'confianza': 'alta' (todo presente, en rango y el
+                   global coincide con las áreas), 'media' (todo presente pero
+                   el global no coincide, o falta solo el global) o 'baja'
+    """
+    textos = pd.Series(textos, dtype=object)
+    indice = textos.index
+    textos = textos.fillna('').astype(str).reset_index(drop=True)
+    columnas = AREAS + ['Puntaje Global']
+    resultado = pd.DataFrame(np.nan, index=textos.index, columns=columnas)
+
+    globales = textos.str.extract(PATRON_GLOBAL_OCR, expand=False)
+    resultado['Puntaje Global'] = pd.to_numeric(globales, errors='coerce')
+
+    # Una fila por línea: 'texto' es la posición del texto, 'numero' la de la línea
+    lineas = textos.str.split('\n').explode().rename('linea').to_frame()
+    lineas['texto'] = lineas.index
+    lineas['numero'] = lineas.groupby(level=0).cumcount()
+    lineas = lineas.reset_index(drop=True)
+
+    es_nombres = (lineas['linea'].str.contains('Lectura', regex=False)
+                  & lineas['linea'].str.contains('Matemáticas', regex=False)
+                  & lineas['linea'].str.contains('Sociales', regex=False))
+    idx_nombres = lineas[es_nombres].groupby('texto')['numero'].min()
+    distancia = lineas['numero'] - lineas['texto'].map(idx_nombres)
+    candidatas = lineas[distancia.between(1, 3)]
+
+    numeros = candidatas['linea'].str.findall(PATRON_NUMEROS_LINEA).explode().dropna()
+    if not numeros.empty:
+        numeros = numeros.astype(np.int64)
+        # La regla de "al menos 5 números" es sobre los números crudos de la línea
+        suficientes = numeros.groupby(level=0).transform('size') >= 5
+        reparados = pd.Series(reparar_numeros(numeros.to_numpy()), index=numeros.index)
+        reparados = reparados[suficientes.to_numpy() & reparados.between(1, 100).to_numpy()]
+
+        # Primera línea (por texto) con al menos 5 puntajes válidos; sus 5 primeros
+        por_linea = reparados.groupby(level=0)
+        reparados = reparados[por_linea.transform('size') >= 5]
+        fila_linea = reparados.index.to_numpy()
+        textos_linea = candidatas.loc[fila_linea, 'texto'].to_numpy()
+        primera = pd.Series(fila_linea).groupby(textos_linea).transform('min').to_numpy()
+        reparados = reparados[fila_linea == primera]
+        posicion = reparados.groupby(level=0).cumcount().to_numpy()
+        reparados = reparados[posicion < 5]
+
+        areas = pd.DataFrame({
+            'texto': candidatas.loc[reparados.index, 'texto'].to_numpy(),
+            'area': np.array(AREAS)[posicion[posicion < 5]],
+            'puntaje': reparados.to_numpy(),
+        }).pivot(index='texto', columns='area', values='puntaje')
+        resultado.loc[areas.index, areas.columns] = areas
+
+    # Validación en bloque
+    areas_completas = resultado[AREAS].notna().all(axis=1)
+    global_ = resultado['Puntaje Global']
+    global_en_rango = global_.between(0, 500)
+    calculado = np.round((3 * resultado[AREAS[:4]].sum(axis=1) + resultado['Inglés']) / 13 * 5)
+    coincide = (global_ - calculado).abs() <= TOLERANCIA_GLOBAL
+
+    resultado['confianza'] = np.select(
+        [areas_completas & global_en_rango & coincide,
+         areas_completas & (global_en_rango | global_.isna())],
+        ['alta', 'media'],
+        default='baja'
+    )
+    for columna in columnas:
+        resultado[columna] = resultado[columna].astype('Int64')
+    resultado.index = indice
+    return resultado
+
+def interpretar_pendientes(extracciones):
+    """
+    Interpreta en un solo lote los textos OCR que los trabajadores dejaron pendientes
+
+    Args:
+        extracciones: Lista de dicts de procesar_lote (se completan en el lugar)
+
+    Returns:
+        La misma lista
+    """
+    pendientes = [extraccion for extraccion in extracciones
+                  if extraccion['puntajes'] is None and extraccion['texto']]
+    if not pendientes:
+        return extracciones
+    lote = extraer_puntajes_lote([extraccion['texto'] for extraccion in pendientes])
+    columnas = AREAS + ['Puntaje Global']
+    for extraccion, fila in zip(pendientes, lote[columnas].itertuples(index=False)):
+        extraccion['puntajes'] = {columna: (None if pd.isna(valor) else int(valor))
+                                  for columna, valor in zip(columnas, fila)}
+    return extracciones
+
+def _inicializar_trabajador():
+    """Cada proceso del pool usa un solo hilo de Tesseract: el paralelismo lo da el pool"""
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+def _extraer_en_trabajador(pdf_path):
+    """Tarea del pool: nunca lanza excepciones para no afectar a los demás PDFs"""
+    try:
+        # El texto de página completa se interpreta después, en lote (interpretar_pendientes)
+        puntajes, metodo, texto = extraer_puntajes_pdf(pdf_path, interpretar_texto=False)
+        return {'puntajes': puntajes, 'metodo': metodo, 'texto': texto, 'error': None}
+    except Exception as e:
+        return {'puntajes': None, 'metodo': None, 'texto': None, 'error': str(e)}
+
+def _resultado_de(futuro):
+    """Resultado de una tarea del pool; si el proceso murió (p. ej. Tesseract abortó), un error para ese PDF"""
+    try:
+        return futuro.result()
+    except BrokenProcessPool as e:
+        return {'puntajes': None, 'metodo': None, 'texto': None,
+                'error': f'El proceso de OCR terminó de forma inesperada: {e or "pool roto"}'}
+
+def _nuevo_pool(num_procesos):
+    """Pool de procesos con un hilo de Tesseract por proceso"""
+    return ProcessPoolExecutor(max_workers=num_procesos, initializer=_inicializar_trabajador)
+
+def procesar_lote(rutas_pdf, num_procesos=None, max_en_vuelo=None):
+    """
+    Extrae los puntajes de varios PDFs en paralelo, entregando en el orden de entrada
+
+    Si un proceso del pool muere, los PDFs que tenía en curso se entregan
+    como error y el resto del lote sigue en un pool nuevo.
+
+    Args:
+        rutas_pdf: Lista de rutas de PDF
+        num_procesos: Procesos del pool (None = NUM_PROCESOS; 1 = sin pool)
+        max_en_vuelo: Máximo de PDFs enviados y aún no entregados
+                      (None = MAX_EN_VUELO_POR_PROCESO por proceso)
+
+    Yields:
+        dict: {'puntajes', 'metodo', 'texto', 'error'} por cada ruta, en orden;
+              con OCR de página completa 'puntajes' es None hasta pasar el
+              lote por interpretar_pendientes()
+    """
+    num_procesos = max(1, min(num_procesos or NUM_PROCESOS, len(rutas_pdf) or 1))
+
+    if num_procesos == 1:
+        # En el proceso principal: sin inicializador, no se toca su entorno
+        for ruta in rutas_pdf:
+            yield _extraer_en_trabajador(ruta)
+        return
+
+    max_en_vuelo = max(num_procesos, max_en_vuelo or num_procesos * MAX_EN_VUELO_POR_PROCESO)
+    en_vuelo = deque()
+    pool = _nuevo_pool(num_procesos)
+    try:
+        for ruta in rutas_pdf:
+            if len(en_vuelo) >= max_en_vuelo:
+                yield _resultado_de(en_vuelo.popleft())
+            try:
+                futuro = pool.submit(_extraer_en_trabajador, ruta)
+            except BrokenProcessPool:
+                print('   ⚠️  El pool de OCR se rompió; se continúa con uno nuevo')
+                pool.shutdown(wait=False)
+                pool = _nuevo_pool(num_procesos)
+                futuro = pool.submit(_extraer_en_trabajador, ruta)
+            en_vuelo.append(futuro)
+        while en_vuelo:
+            yield _resultado_de(en_vuelo.popleft())
+    finally:
+        pool.shutdown(wait=True)
+
 def procesar_pdf(pdf_path, nombre_estudiante):
     """Procesa un PDF y extrae los puntajes"""
     print(f'\n📄 Procesando: {os.path.basename(pdf_path)}')
     
-    # Extraer texto
-    texto = extraer_texto_pdf(pdf_path)
-    
-    if not texto:
+    # Capa de texto primero; OCR solo si hace falta
+    puntajes, metodo, texto = extraer_puntajes_pdf(pdf_path)
+    return mostrar_puntajes_pdf(puntajes, metodo, texto, nombre_estudiante)
+
+def describir_metodo(metodo):
+    """'roi_rapido' -> 'OCR por regiones, nivel rapido'"""
+    if metodo == 'texto':
+        return 'capa de texto'
+    if metodo and metodo.startswith('roi_'):
+        return f'OCR por regiones, nivel {metodo[len("roi_"):]}'
+    return 'OCR página completa'
+
+def mostrar_puntajes_pdf(puntajes, metodo, texto, nombre_estudiante):
+    """Muestra los puntajes extraídos de un PDF y guarda el texto OCR si faltan"""
+    if puntajes is None:
         print('   ❌ No se pudo extraer texto del PDF')
         return None
     
-    # Extraer puntajes
-    puntajes = extraer_puntajes(texto)
-    
     # Mostrar resultados
-    print('   📊 Puntajes extraídos:')
+    print(f'   📊 Puntajes extraídos ({describir_metodo(metodo)}):')
     for area, puntaje in puntajes.items():
         if puntaje is not None:
             print(f'      ✅ {area}: {puntaje}')
@@ -149,7 +891,7 @@ def procesar_pdf(pdf_path, nombre_estudiante):
     
     # Verificar si se extrajeron todos los puntajes
     puntajes_faltantes = [area for area, puntaje in puntajes.items() if puntaje is None]
-    if puntajes_faltantes:
+    if puntajes_faltantes and texto:
         print(f'   ⚠️  Puntajes faltantes: {", ".join(puntajes_faltantes)}')
         # Guardar texto para análisis
         with open(f'debug_{nombre_estudiante}.txt', 'w', encoding='utf-8') as f:
@@ -158,29 +900,6 @@ def procesar_pdf(pdf_path, nombre_estudiante):
     
     return puntajes
 
-def construir_nombre_pdf(estudiante):
-    """Construye el nombre del archivo PDF basado en los datos del estudiante"""
-    primer_apellido = str(estudiante['Primer Apellido']).strip().upper()
-    segundo_apellido = str(estudiante['Segundo Apellido']).strip().upper()
-    primer_nombre = str(estudiante['Primer Nombre']).strip().upper()
-
-    # Manejar segundo nombre (puede ser NaN o vacío)
-    segundo_nombre = estudiante.get('Segundo Nombre', '')
-    if pd.isna(segundo_nombre) or segundo_nombre == '' or str(segundo_nombre).upper() == 'NAN':
-        segundo_nombre = ''
-    else:
-        segundo_nombre = str(segundo_nombre).strip().upper()
-
-    numero_doc = str(int(estudiante['Número de documento']))  # Convertir a int para quitar decimales
-
-    # Construir nombre
-    if segundo_nombre:
-        nombre_pdf = f"{primer_apellido}_{segundo_apellido}_{primer_nombre}_{segundo_nombre}_{numero_doc}.pdf"
-    else:
-        nombre_pdf = f"{primer_apellido}_{segundo_apellido}_{primer_nombre}_{numero_doc}.pdf"
-
-    return nombre_pdf
-
 def main():
     """Función principal"""
     print('\n' + '='*80)
@@ -198,12 +917,9 @@ def main():
     
     # Leer Excel
     print(f'\n📂 Leyendo archivo: {ARCHIVO_EXCEL_ENTRADA}')
-    df = pd.read_excel(ARCHIVO_EXCEL_ENTRADA, skiprows=4)
-
-    # Limpiar nombres de columnas (quitar espacios)
-    df.columns = df.columns.str.strip()
+    estudiantes = cargar_estudiantes(ARCHIVO_EXCEL_ENTRADA)
 
-    print(f'✅ {len(df)} estudiantes encontrados')
+    print(f'✅ {len(estudiantes)} estudiantes encontrados')
     
     # Preguntar modo
     print('\n' + '='*80)
@@ -219,51 +935,71 @@ def main():
     
     if modo_prueba:
         print('\n🧪 Modo PRUEBA activado (1 estudiante)')
-        df = df.head(1)
+        estudiantes = estudiantes[:1]
     else:
-        print(f'\n🚀 Modo COMPLETO activado ({len(df)} estudiantes)')
+        print(f'\n🚀 Modo COMPLETO activado ({len(estudiantes)} estudiantes)')
     
     # Procesar estudiantes
     resultados = []
     errores = []
+    metodos_usados = {}
+    # Agregados que leen los dashboards (las correcciones reemplazan el aporte anterior)
+    agregados = AgregadosResultados()
     
     print('\n' + '='*80)
-    print('🔄 PROCESANDO ESTUDIANTES')
+    print(f'🔄 PROCESANDO ESTUDIANTES ({NUM_PROCESOS} proceso(s))')
     print('='*80)
     
-    for idx, estudiante in df.iterrows():
-        nombre_completo = f"{estudiante['Primer Apellido']} {estudiante['Segundo Apellido']} {estudiante['Primer Nombre']} {estudiante.get('Segundo Nombre', '')}".strip()
-        
-        print(f'\n👤 [{idx+1}/{len(df)}] {nombre_completo}')
+    # Primero ubicar los PDFs; luego extraerlos todos en paralelo
+    trabajos = []
+    catalogo = CatalogoPDFs(CARPETA_PDFS)
+    for idx, estudiante in enumerate(estudiantes):
+        nombre_completo = estudiante.nombre_completo
         
-        # Construir nombre del PDF
-        nombre_pdf = construir_nombre_pdf(estudiante)
-        ruta_pdf = os.path.join(CARPETA_PDFS, nombre_pdf)
+        # Ubicar el PDF por documento (o por nombre)
+        ruta_pdf = catalogo.buscar(estudiante.documento, estudiante.nombre_pdf)
         
         # Verificar que existe el PDF
-        if not os.path.exists(ruta_pdf):
-            print(f'   ❌ PDF no encontrado: {nombre_pdf}')
+        if ruta_pdf is None:
+            print(f'   ❌ PDF no encontrado: {estudiante.nombre_pdf}')
             errores.append({
                 'estudiante': nombre_completo,
                 'error': 'PDF no encontrado'
             })
             continue
         
-        # Procesar PDF
-        puntajes = procesar_pdf(ruta_pdf, nombre_completo.replace(' ', '_'))
+        trabajos.append((idx, estudiante, nombre_completo, ruta_pdf))
+    
+    extracciones = interpretar_pendientes(list(procesar_lote([ruta_pdf for _, _, _, ruta_pdf in trabajos])))
+    for (idx, estudiante, nombre_completo, ruta_pdf), extraccion in zip(trabajos, extracciones):
+        print(f'\n👤 [{idx+1}/{len(estudiantes)}] {nombre_completo}')
+        print(f'📄 {os.path.basename(ruta_pdf)}')
+        
+        if extraccion['error']:
+            print(f'   ❌ Error al procesar PDF: {extraccion["error"]}')
+            errores.append({
+                'estudiante': nombre_completo,
+                'error': extraccion['error']
+            })
+            continue
+        
+        puntajes = mostrar_puntajes_pdf(extraccion['puntajes'], extraccion['metodo'],
+                                        extraccion['texto'], nombre_completo.replace(' ', '_'))
         
         if puntajes:
             # Agregar datos del estudiante
             resultado = {
-                'Primer Apellido': estudiante['Primer Apellido'],
-                'Segundo Apellido': estudiante['Segundo Apellido'],
-                'Primer Nombre': estudiante['Primer Nombre'],
-                'Segundo Nombre': estudiante.get('Segundo Nombre', ''),
-                'Tipo documento': estudiante['Tipo documento'],
-                'Número de documento': estudiante['Número de documento'],
+                'Primer Apellido': estudiante.primer_apellido,
+                'Segundo Apellido': estudiante.segundo_apellido,
+                'Primer Nombre': estudiante.primer_nombre,
+                'Segundo Nombre': estudiante.segundo_nombre,
+                'Tipo documento': estudiante.tipo_documento,
+                'Número de documento': estudiante.documento,
+                'Grupo': estudiante.grupo,
                 **puntajes
             }
             resultados.append(resultado)
+            metodos_usados[extraccion['metodo']] = metodos_usados.get(extraccion['metodo'], 0) + 1
             print(f'   ✅ Estudiante procesado exitosamente')
         else:
             errores.append({
@@ -271,6 +1007,12 @@ def main():
                 'error': 'No se pudieron extraer puntajes'
             })
     
+    cambios_agregados = agregados.actualizar_lote(resultados)
+    if cambios_agregados['nuevo'] or cambios_agregados['corregido']:
+        agregados.guardar()
+        print(f'\n📈 Agregados actualizados: {cambios_agregados["nuevo"]} nuevo(s), '
+              f'{cambios_agregados["corregido"]} corregido(s)')
+    
     # Generar Excel de salida
     if resultados:
         print('\n' + '='*80)
@@ -281,7 +1023,7 @@ def main():
         
         # Reordenar columnas
         columnas_orden = [
-            'Primer Apellido', 'Segundo Apellido', 'Primer Nombre', 'Segundo Nombre',
+            'Grupo', 'Primer Apellido', 'Segundo Apellido', 'Primer Nombre', 'Segundo Nombre',
             'Tipo documento', 'Número de documento',
             'Lectura Crítica', 'Matemáticas', 'Sociales y Ciudadanas',
             'Ciencias Naturales', 'Inglés', 'Puntaje Global'
@@ -313,6 +1055,11 @@ def main():
     print(f'✅ Estudiantes procesados: {len(resultados)}')
     print(f'❌ Errores: {len(errores)}')
     
+    if metodos_usados:
+        print('\n🔎 Método de extracción:')
+        for metodo, cantidad in sorted(metodos_usados.items(), key=lambda item: -item[1]):
+            print(f'   - {describir_metodo(metodo)}: {cantidad}')
+    
     if errores:
         print('\n⚠️  Estudiantes con errores:')
         for error in errores:
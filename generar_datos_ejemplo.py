@@ -8,10 +8,6 @@ import pandas as pd
 import numpy as np
 import random
 
-# Configurar semilla para reproducibilidad
-np.random.seed(42)
-random.seed(42)
-
 # Listas de nombres ficticios
 nombres = [
     "Juan", "María", "Carlos", "Ana", "Luis", "Laura", "Pedro", "Sofía",
@@ -29,55 +25,74 @@ apellidos = [
     "Moreno", "Delgado", "Castillo", "Vega", "León", "Herrera"
 ]
 
-# Generar 36 estudiantes
-estudiantes = []
-
-for i in range(36):
-    # Generar puntajes con distribución realista
-    # Puntajes individuales (0-100)
-    lectura = np.random.normal(60, 15)
-    matematicas = np.random.normal(55, 18)
-    sociales = np.random.normal(58, 16)
-    ciencias = np.random.normal(57, 17)
-    ingles = np.random.normal(62, 20)
-    
-    # Limitar a rango 0-100
-    lectura = max(0, min(100, lectura))
-    matematicas = max(0, min(100, matematicas))
-    sociales = max(0, min(100, sociales))
-    ciencias = max(0, min(100, ciencias))
-    ingles = max(0, min(100, ingles))
-    
-    # Calcular puntaje global (aproximado, 0-500)
-    puntaje_global = (lectura + matematicas + sociales + ciencias + ingles) * 1.0
-    puntaje_global = max(0, min(500, puntaje_global))
-    
-    estudiante = {
-        'Grupo': '11A' if i < 18 else '11B',
-        'Primer Apellido': random.choice(apellidos),
-        'Segundo Apellido': random.choice(apellidos),
-        'Primer Nombre': nombres[i],
-        'Segundo Nombre': random.choice(nombres),
-        'Tipo documento': 'TI' if i < 5 else 'CC',
-        'Número de documento': 1000000000 + i * 1000 + random.randint(100, 999),
-        'Lectura Crítica': round(lectura, 1),
-        'Matemáticas': round(matematicas, 1),
-        'Sociales y Ciudadanas': round(sociales, 1),
-        'Ciencias Naturales': round(ciencias, 1),
-        'Inglés': round(ingles, 1),
-        'Puntaje Global': round(puntaje_global, 1)
-    }
-    
-    estudiantes.append(estudiante)
-
-# Crear DataFrame
-df = pd.DataFrame(estudiantes)
-
-# Guardar a Excel
-df.to_excel('RESULTADOS-ICFES-EJEMPLO.xlsx', index=False)
-
-print("✅ Archivo de ejemplo creado: RESULTADOS-ICFES-EJEMPLO.xlsx")
-print(f"📊 Total de estudiantes: {len(df)}")
-print(f"📈 Promedio Global: {df['Puntaje Global'].mean():.1f}")
-print(f"📊 Rango: {df['Puntaje Global'].min():.1f} - {df['Puntaje Global'].max():.1f}")
 
+def generar_estudiantes(cantidad=36, semilla=42):
+    """
+    Genera una cohorte ficticia de estudiantes con puntajes realistas
+
+    Args:
+        cantidad: Número de estudiantes (36 reproduce el archivo de ejemplo)
+        semilla: Semilla para reproducibilidad
+
+    Returns:
+        DataFrame con las columnas del archivo de resultados
+    """
+    # Configurar semilla para reproducibilidad
+    np.random.seed(semilla)
+    random.seed(semilla)
+
+    estudiantes = []
+
+    for i in range(cantidad):
+        # Generar puntajes con distribución realista
+        # Puntajes individuales (0-100)
+        lectura = np.random.normal(60, 15)
+        matematicas = np.random.normal(55, 18)
+        sociales = np.random.normal(58, 16)
+        ciencias = np.random.normal(57, 17)
+        ingles = np.random.normal(62, 20)
+
+        # Limitar a rango 0-100
+        lectura = max(0, min(100, lectura))
+        matematicas = max(0, min(100, matematicas))
+        sociales = max(0, min(100, sociales))
+        ciencias = max(0, min(100, ciencias))
+        ingles = max(0, min(100, ingles))
+
+        # Calcular puntaje global (aproximado, 0-500)
+        puntaje_global = (lectura + matematicas + sociales + ciencias + ingles) * 1.0
+        puntaje_global = max(0, min(500, puntaje_global))
+
+        estudiante = {
+            'Grupo': '11A' if i < cantidad // 2 else '11B',
+            'Primer Apellido': random.choice(apellidos),
+            'Segundo Apellido': random.choice(apellidos),
+            'Primer Nombre': nombres[i % len(nombres)],
+            'Segundo Nombre': random.choice(nombres),
+            'Tipo documento': 'TI' if i < 5 else 'CC',
+            'Número de documento': 1000000000 + i * 1000 + random.randint(100, 999),
+            'Lectura Crítica': round(lectura, 1),
+            'Matemáticas': round(matematicas, 1),
+            'Sociales y Ciudadanas': round(sociales, 1),
+            'Ciencias Naturales': round(ciencias, 1),
+            'Inglés': round(ingles, 1),
+            'Puntaje Global': round(puntaje_global, 1)
+        }
+
+        estudiantes.append(estudiante)
+
+    # Crear DataFrame
+    return pd.DataFrame(estudiantes)
+
+
+if __name__ == '__main__':
+    # Generar 36 estudiantes
+    df = generar_estudiantes(36)
+
+    # Guardar a Excel
+    df.to_excel('RESULTADOS-ICFES-EJEMPLO.xlsx', index=False)
+
+    print("✅ Archivo de ejemplo creado: RESULTADOS-ICFES-EJEMPLO.xlsx")
+    print(f"📊 Total de estudiantes: {len(df)}")
+    print(f"📈 Promedio Global: {df['Puntaje Global'].mean():.1f}")
+    print(f"📊 Rango: {df['Puntaje Global'].min():.1f} - {df['Puntaje Global'].max():.1f}")
@@ -18,7 +18,8 @@ from selenium.webdriver.firefox.options import Options
 
 # Configuración
 ARCHIVO_EXCEL = 'INSCRITOS_EXAMEN SABER 11 (36).xls'
-URL_ICFES = 'http://resultadossaber11.icfes.edu.co/'
+# ICFES_URL permite apuntar al sitio simulado (sitio_simulado_icfes.py)
+URL_ICFES = os.environ.get('ICFES_URL', 'http://resultadossaber11.icfes.edu.co/')
 
 TIPOS_DOCUMENTO = {
     'TI': 'TARJETA DE IDENTIDAD',
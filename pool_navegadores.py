@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pool de sesiones de Firefox para procesar estudiantes con varios navegadores.
+
+- El geckodriver se instala/resuelve una sola vez por proceso.
+- Cada sesión tiene su propio perfil y su propia carpeta de descargas.
+- Las sesiones se reciclan después de K estudiantes o si el navegador se cae.
+- ConsolaOperador centraliza en una sola terminal qué ventanas están
+  esperando que el operador resuelva el CAPTCHA.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from functools import lru_cache
+from selenium import webdriver
+from selenium.webdriver.firefox.service import Service
+from selenium.webdriver.firefox.options import Options
+from selenium.common.exceptions import WebDriverException
+from webdriver_manager.firefox import GeckoDriverManager
+
+RECICLAR_CADA_POR_DEFECTO = 50  # estudiantes por sesión antes de reiniciar Firefox
+
+_candado_geckodriver = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _instalar_geckodriver():
+    return GeckoDriverManager().install()
+
+
+def ruta_geckodriver():
+    """Retorna la ruta del geckodriver, instalándolo solo la primera vez"""
+    with _candado_geckodriver:
+        return _instalar_geckodriver()
+
+
+def crear_opciones_firefox(carpeta_descargas, modo_headless=False, carpeta_perfil=None):
+    """
+    Construye las opciones de Firefox usadas por los scripts de descarga
+
+    Args:
+        carpeta_descargas: Carpeta donde Firefox guarda las descargas
+        modo_headless: Si True, ejecuta el navegador sin interfaz gráfica
+        carpeta_perfil: Carpeta de perfil propia (None = perfil temporal de geckodriver)
+    """
+    firefox_options = Options()
+    if modo_headless:
+        firefox_options.add_argument('--headless')
+
+    if carpeta_perfil:
+        firefox_options.add_argument('-profile')
+        firefox_options.add_argument(carpeta_perfil)
+
+    # Configuraciones para descargar PDFs automáticamente
+    firefox_options.set_preference('browser.download.folderList', 2)
+    firefox_options.set_preference('browser.download.dir', os.path.abspath(carpeta_descargas))
+    firefox_options.set_preference('browser.download.useDownloadDir', True)
+    firefox_options.set_preference('browser.download.manager.showWhenStarting', False)
+
+    # Configurar para descargar PDFs automáticamente sin preguntar
+    firefox_options.set_preference('browser.helperApps.neverAsk.saveToDisk', 'application/pdf')
+    firefox_options.set_preference('browser.helperApps.neverAsk.openFile', 'application/pdf')
+
+    # Deshabilitar el visor de PDF integrado de Firefox
+    firefox_options.set_preference('pdfjs.disabled', True)
+
+    # Configurar para que no abra PDFs en el navegador
+    firefox_options.set_preference('browser.download.open_pdf_attachments_inline', False)
+
+    # Deshabilitar la vista previa de impresión
+    firefox_options.set_preference('print.always_print_silent', True)
+    firefox_options.set_preference('print.show_print_progress', False)
+
+    return firefox_options
+
+
+def crear_driver_firefox(carpeta_descargas, modo_headless=False, carpeta_perfil=None):
+    """Inicia un webdriver.Firefox con las opciones del proyecto"""
+    os.makedirs(carpeta_descargas, exist_ok=True)
+    opciones = crear_opciones_firefox(carpeta_descargas, modo_headless, carpeta_perfil)
+    service = Service(ruta_geckodriver())
+    driver = webdriver.Firefox(service=service, options=opciones)
+    driver.maximize_window()
+    return driver
+
+
+class SesionNavegador:
+    """Una sesión de Firefox del pool, con perfil y carpeta de descargas propios"""
+
+    def __init__(self, numero, carpeta_descargas, modo_headless=False):
+        self.numero = numero
+        self.carpeta_descargas = carpeta_descargas
+        self.modo_headless = modo_headless
+        self.carpeta_perfil = None
+        self.driver = None
+        self.estudiantes_procesados = 0
+        self.reinicios = 0
+
+    def iniciar(self):
+        """Lanza Firefox con un perfil nuevo y aislado"""
+        self.carpeta_perfil = tempfile.mkdtemp(prefix=f'icfes_perfil_{self.numero}_')
+        self.driver = crear_driver_firefox(self.carpeta_descargas, self.modo_headless,
+                                           self.carpeta_perfil)
+        self.estudiantes_procesados = 0
+
+    def cerrar(self):
+        """Cierra Firefox y borra el perfil temporal"""
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                pass
+            self.driver = None
+        if self.carpeta_perfil:
+            shutil.rmtree(self.carpeta_perfil, ignore_errors=True)
+            self.carpeta_perfil = None
+
+    def esta_viva(self):
+        """Verifica que el navegador siga respondiendo"""
+        if self.driver is None:
+            return False
+        try:
+            self.driver.current_window_handle
+            return True
+        except WebDriverException:
+            return False
+
+
+class PoolNavegadores:
+    """Conjunto de N sesiones de Firefox lanzadas una sola vez y recicladas según uso"""
+
+    def __init__(self, num_sesiones, carpeta_descargas, modo_headless=False,
+                 reciclar_cada=RECICLAR_CADA_POR_DEFECTO):
+        """
+        Args:
+            num_sesiones: Número de navegadores simultáneos
+            carpeta_descargas: Carpeta base; cada sesión usa la subcarpeta sesion_N
+            modo_headless: Si True, los navegadores no muestran interfaz
+            reciclar_cada: Reinicia una sesión tras este número de estudiantes (0 = nunca)
+        """
+        self.reciclar_cada = reciclar_cada
+        self.sesiones = [
+            SesionNavegador(numero, os.path.join(carpeta_descargas, f'sesion_{numero}'), modo_headless)
+            for numero in range(1, num_sesiones + 1)
+        ]
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def iniciar(self):
+        """Lanza todas las sesiones"""
+        print(f'\n🌐 Iniciando {len(self.sesiones)} navegador(es) Firefox...')
+        for sesion in self.sesiones:
+            sesion.iniciar()
+            print(f'   ✅ Ventana {sesion.numero} lista (descargas: {sesion.carpeta_descargas})')
+
+    def cerrar(self):
+        """Cierra todas las sesiones"""
+        for sesion in self.sesiones:
+            sesion.cerrar()
+        print('\n🔒 Navegadores cerrados')
+
+    def sesion(self, numero):
+        """Retorna la sesión con el número indicado (1..N)"""
+        return self.sesiones[numero - 1]
+
+    def reciclar(self, sesion, motivo=''):
+        """Reinicia el navegador de una sesión con un perfil nuevo"""
+        print(f'\n♻️  Reiniciando ventana {sesion.numero}{f" ({motivo})" if motivo else ""}...')
+        sesion.cerrar()
+        sesion.iniciar()
+        sesion.reinicios += 1
+
+    def registrar_uso(self, sesion):
+        """
+        Cuenta un estudiante procesado y recicla la sesión si hace falta
+
+        Returns:
+            bool: True si la sesión fue reiniciada
+        """
+        sesion.estudiantes_procesados += 1
+        if not sesion.esta_viva():
+            self.reciclar(sesion, 'el navegador dejó de responder')
+            return True
+        if self.reciclar_cada and sesion.estudiantes_procesados >= self.reciclar_cada:
+            self.reciclar(sesion, f'{sesion.estudiantes_procesados} estudiantes procesados')
+            return True
+        return False
+
+
+class ConsolaOperador:
+    """
+    Única terminal del operador para varias ventanas esperando CAPTCHA
+
+    Los hilos trabajadores se bloquean en esperar_operador(); un hilo lector
+    muestra qué ventanas están esperando y libera la que el operador indique.
+    """
+
+    def __init__(self, entrada=input):
+        self.entrada = entrada
+        self._pendientes = {}
+        self._condicion = threading.Condition()
+        self._activa = False
+        self._hilo = None
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    @property
+    def activa(self):
+        """False cuando la consola se cerró (fin de la ejecución o la terminal ya no tiene entrada)"""
+        return self._activa
+
+    def iniciar(self):
+        """Arranca el hilo que lee la terminal"""
+        self._activa = True
+        self._hilo = threading.Thread(target=self._leer, name='consola-operador', daemon=True)
+        self._hilo.start()
+
+    def cerrar(self):
+        """Detiene la consola y libera cualquier ventana que siga esperando"""
+        with self._condicion:
+            self._activa = False
+            for _, evento in self._pendientes.values():
+                evento.set()
+            self._pendientes.clear()
+            self._condicion.notify_all()
+
+    def esperar_operador(self, numero, descripcion):
+        """
+        Bloquea al trabajador hasta que el operador confirme su ventana
+
+        Args:
+            numero: Número de la ventana que espera el CAPTCHA
+            descripcion: Texto para identificar al estudiante
+
+        Raises:
+            RuntimeError: Si la consola se cerró antes de que el operador respondiera
+        """
+        evento = threading.Event()
+        with self._condicion:
+            if not self._activa:
+                raise RuntimeError('La consola del operador está cerrada')
+            self._pendientes[numero] = (descripcion, evento)
+            self._condicion.notify_all()
+        self.mostrar_pendientes()
+        evento.wait()
+        if not self._activa:
+            raise RuntimeError('La consola del operador se cerró sin confirmar la ventana')
+
+    def mostrar_pendientes(self):
+        """Muestra las ventanas que están esperando al operador"""
+        with self._condicion:
+            pendientes = list(self._pendientes.items())
+        if not pendientes:
+            return
+        print('\n' + '='*80)
+        print('🪟 VENTANAS ESPERANDO CAPTCHA')
+        for numero, (descripcion, _) in pendientes:
+            print(f'   [{numero}] {descripcion}')
+        print('👉 Resuelve el CAPTCHA, haz clic en "Ingresar" y espera los resultados;')
+        print('   luego escribe el número de la ventana (ENTER = la que lleva más tiempo)')
+        print('='*80)
+
+    def _leer(self):
+        """Bucle del hilo lector: libera ventanas según lo que escriba el operador"""
+        while True:
+            with self._condicion:
+                while self._activa and not self._pendientes:
+                    self._condicion.wait()
+                if not self._activa:
+                    return
+
+            try:
+                respuesta = self.entrada('\nVentana lista: ').strip()
+            except EOFError:
+                # Sin terminal no habrá más respuestas: liberar a los que esperan para que aborten
+                print('\n⚠️  La entrada del operador se cerró; se detienen las ventanas en espera')
+                self.cerrar()
+                return
+
+            with self._condicion:
+                if not self._pendientes:
+                    continue
+                if respuesta.isdigit() and int(respuesta) in self._pendientes:
+                    numero = int(respuesta)
+                elif respuesta == '':
+                    numero = next(iter(self._pendientes))
+                else:
+                    print(f'   ⚠️  La ventana "{respuesta}" no está esperando CAPTCHA')
+                    continue
+                _, evento = self._pendientes.pop(numero)
+            evento.set()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Archivo de resultados de los dashboards: lectura del Excel y formato Parquet.
+
+El Excel RESULTADOS-ICFES-*.xlsx es el formato de intercambio (lo produce el
+extractor y lo edita la institución), pero leerlo con openpyxl es lo más
+lento del arranque de los dashboards. convertir_a_parquet() lo separa una vez
+en dos tablas tipadas:
+- <base>.parquet: un estudiante por fila con COLUMNAS_CANONICAS.
+- <base>.resumen.parquet: promedios por año y avance (filas sin grupo del
+  final del Excel), con el rótulo en la columna 'Fila'.
+
+En ejecución, cargar_resultados() lee el Parquet con memory-map y solo cae al
+Excel si el Parquet no existe o fue escrito desde otra versión del Excel (el
+Parquet guarda el tamaño y el SHA-256 del Excel en sus metadatos; la fecha
+de modificación no sirve: copiar o sincronizar el Excel la cambia). Sin pyarrow se
+lee siempre el Excel. exportar_excel() regenera el Excel desde las tablas.
+"""
+
+import os
+import re
+
+import pandas as pd
+
+from cache_ocr import hash_archivo
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_DISPONIBLE = True
+except ImportError:
+    PARQUET_DISPONIBLE = False
+
+AREAS = ['Lectura Crítica', 'Matemáticas', 'Sociales y Ciudadanas', 'Ciencias Naturales', 'Inglés']
+COLUMNAS_PUNTAJE = AREAS + ['Puntaje Global']
+COLUMNAS_TEXTO = ['Grupo', 'Primer Apellido', 'Segundo Apellido', 'Primer Nombre', 'Segundo Nombre',
+                  'Tipo documento', 'Número de documento']
+COLUMNAS_CANONICAS = COLUMNAS_TEXTO + COLUMNAS_PUNTAJE
+
+# Variantes de rótulo que llegan en los Excel (el almacén del extractor usa 'Tipo de documento')
+ALIAS_COLUMNAS = {
+    'Tipo de documento': 'Tipo documento',
+    'Segundo Nombre ': 'Segundo Nombre',
+}
+
+# Año de los resultados del archivo; el anterior es el de comparación
+ANIO_RESULTADOS = 2025
+PATRON_ANIO = re.compile(r'\b(?:19|20)\d{2}\b')
+# Diferencia admitida al reconocer la fila de avance como resta de las dos de promedios
+TOLERANCIA_AVANCE = 1.0
+
+if PARQUET_DISPONIBLE:
+    ESQUEMA_ESTUDIANTES = pa.schema(
+        [(columna, pa.string()) for columna in COLUMNAS_TEXTO]
+        + [(columna, pa.float64()) for columna in COLUMNAS_PUNTAJE]
+    )
+    ESQUEMA_RESUMEN = pa.schema(
+        [('Fila', pa.string())] + [(columna, pa.float64()) for columna in COLUMNAS_PUNTAJE]
+    )
+
+
+def texto_documento(valor):
+    """Número de documento como texto (1000000000.0 -> '1000000000')"""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor).strip()
+
+
+def documento_para_excel(valor):
+    """Número de documento como número al exportar a Excel ('1000000000' -> 1000000000), si es solo dígitos"""
+    texto = str(valor).strip() if valor is not None and not pd.isna(valor) else ''
+    return int(texto) if texto.isdigit() else (texto or None)
+
+
+def filas_estudiantes(crudo):
+    """Máscara de las filas que son estudiantes: con documento y, si existe la columna, con Grupo"""
+    mascara = crudo['Número de documento'].notna()
+    if 'Grupo' in crudo.columns:
+        mascara &= crudo['Grupo'].notna()
+    return mascara
+
+
+def nombre_completo(df):
+    """'NOMBRE1 NOMBRE2 APELLIDO1 APELLIDO2' a partir de las columnas de nombres (texto)"""
+    return (
+        df['Primer Nombre'] + ' ' +
+        df['Segundo Nombre'] + ' ' +
+        df['Primer Apellido'] + ' ' +
+        df['Segundo Apellido']
+    ).str.strip().str.replace(r'\s+', ' ', regex=True)
+
+
+def separar_estudiantes(crudo):
+    """
+    Tabla de estudiantes tipada a partir de la hoja completa
+
+    Las filas de resumen del final (promedios por año y avance) no tienen
+    grupo ni documento y quedan fuera.
+
+    Returns:
+        DataFrame con COLUMNAS_CANONICAS (texto y float) y 'Nombre Completo'
+    """
+    crudo = crudo.rename(columns=ALIAS_COLUMNAS)
+    df = crudo[filas_estudiantes(crudo)].copy()
+
+    for columna in COLUMNAS_TEXTO:
+        if columna not in df.columns:
+            df[columna] = ''
+        df[columna] = df[columna].fillna('').map(texto_documento).astype(str)
+    for area in COLUMNAS_PUNTAJE:
+        df[area] = pd.to_numeric(df[area], errors='coerce').astype(float)
+    df = df[COLUMNAS_CANONICAS].copy()
+
+    df['Nombre Completo'] = nombre_completo(df)
+    return df.reset_index(drop=True)
+
+
+def separar_resumen(crudo):
+    """
+    Filas de resumen (promedios por año y avance), ubicadas por su contenido
+
+    Una fila de resumen no es de estudiante y sí tiene puntajes. Si trae un
+    rótulo (en cualquier columna de texto) se usa: 'avance' o 'diferencia'
+    para el avance y un año (2024, 2025, ...) para los promedios. Si no trae
+    rótulos se buscan tres filas seguidas donde la tercera es la resta de las
+    dos primeras: promedios de ANIO_RESULTADOS, del año anterior y avance.
+
+    Returns:
+        DataFrame con índice '<año>'/'Avance' y columnas COLUMNAS_PUNTAJE,
+        o None si no hay filas de resumen reconocibles
+    """
+    crudo = crudo.rename(columns=ALIAS_COLUMNAS)
+    resto = crudo[~filas_estudiantes(crudo)]
+    puntajes = resto[COLUMNAS_PUNTAJE].apply(pd.to_numeric, errors='coerce').astype(float)
+    puntajes = puntajes[puntajes.notna().any(axis=1)]
+    columnas_rotulo = [columna for columna in crudo.columns if columna not in COLUMNAS_PUNTAJE]
+
+    filas = {}
+    sin_rotulo = []
+    for indice, valores in puntajes.iterrows():
+        rotulo = ' '.join(str(valor) for valor in resto.loc[indice, columnas_rotulo] if pd.notna(valor)).lower()
+        anio = PATRON_ANIO.search(rotulo)
+        if 'avance' in rotulo or 'diferencia' in rotulo:
+            filas['Avance'] = valores
+        elif anio:
+            filas[anio.group(0)] = valores
+        else:
+            sin_rotulo.append(valores)
+
+    if not filas:
+        for inicio in range(len(sin_rotulo) - 2):
+            actual, anterior, avance = sin_rotulo[inicio:inicio + 3]
+            diferencia = (actual - anterior - avance).abs()
+            if diferencia.notna().any() and (diferencia.dropna() <= TOLERANCIA_AVANCE).all():
+                filas = {str(ANIO_RESULTADOS): actual, str(ANIO_RESULTADOS - 1): anterior, 'Avance': avance}
+                break
+
+    if not filas:
+        return None
+    return pd.DataFrame(filas).T[COLUMNAS_PUNTAJE]
+
+
+def leer_excel(ruta):
+    """
+    Lee el Excel de resultados una sola vez y lo separa en sus dos tablas
+
+    Returns:
+        dict con 'estudiantes' (DataFrame) y 'resumen' (DataFrame o None)
+    """
+    crudo = pd.read_excel(ruta)
+    return {
+        'estudiantes': separar_estudiantes(crudo),
+        'resumen': separar_resumen(crudo),
+    }
+
+
+def rutas_parquet(ruta_excel):
+    """(estudiantes, resumen): los Parquet que acompañan a un Excel de resultados"""
+    base = os.path.splitext(ruta_excel)[0]
+    return f'{base}.parquet', f'{base}.resumen.parquet'
+
+
+def huella_excel(ruta_excel):
+    """
+    Metadatos que identifican la versión de un Excel (tamaño y SHA-256)
+
+    Returns:
+        dict de bytes a bytes (el formato de los metadatos de Arrow), o {} si no existe
+    """
+    if not os.path.exists(ruta_excel):
+        return {}
+    return {
+        b'excel_tamano': str(os.path.getsize(ruta_excel)).encode('ascii'),
+        b'excel_sha256': hash_archivo(ruta_excel).encode('ascii'),
+    }
+
+
+def escribir_tabla(tabla, ruta):
+    """Escribe una tabla de Arrow de forma atómica"""
+    ruta_temporal = f'{ruta}.{os.getpid()}.tmp'
+    pq.write_table(tabla, ruta_temporal)
+    os.replace(ruta_temporal, ruta)
+
+
+def guardar_parquet(libro, ruta_excel):
+    """
+    Guarda las tablas de un libro en los Parquet del Excel
+
+    Si el libro no tiene resumen se borra el Parquet de resumen anterior. El
+    Parquet de estudiantes lleva la huella del Excel (ver huella_excel).
+
+    Returns:
+        str: Ruta del Parquet de estudiantes
+    """
+    ruta_estudiantes, ruta_resumen = rutas_parquet(ruta_excel)
+    estudiantes = libro['estudiantes'][COLUMNAS_CANONICAS]
+    tabla = pa.Table.from_pandas(estudiantes, schema=ESQUEMA_ESTUDIANTES, preserve_index=False)
+    tabla = tabla.replace_schema_metadata({**(tabla.schema.metadata or {}), **huella_excel(ruta_excel)})
+    escribir_tabla(tabla, ruta_estudiantes)
+
+    if libro['resumen'] is None:
+        if os.path.exists(ruta_resumen):
+            os.remove(ruta_resumen)
+    else:
+        resumen = libro['resumen'].rename_axis('Fila').reset_index()
+        escribir_tabla(pa.Table.from_pandas(resumen, schema=ESQUEMA_RESUMEN, preserve_index=False),
+                       ruta_resumen)
+    return ruta_estudiantes
+
+
+def leer_parquet(ruta_excel):
+    """
+    Tablas de un Excel leídas desde sus Parquet (memory-map, sin copiar el archivo)
+
+    Returns:
+        dict como el de leer_excel
+    """
+    ruta_estudiantes, ruta_resumen = rutas_parquet(ruta_excel)
+    estudiantes = pq.read_table(ruta_estudiantes, memory_map=True).to_pandas()
+    estudiantes['Nombre Completo'] = nombre_completo(estudiantes)
+
+    resumen = None
+    if os.path.exists(ruta_resumen):
+        resumen = pq.read_table(ruta_resumen, memory_map=True).to_pandas().set_index('Fila')
+        resumen.index.name = None
+    return {'estudiantes': estudiantes, 'resumen': resumen}
+
+
+def parquet_vigente(ruta_excel):
+    """
+    True si existe el Parquet del Excel y fue escrito desde su versión actual
+
+    Solo se lee el pie del Parquet; el Excel se hashea únicamente si su tamaño
+    coincide con el guardado.
+    """
+    ruta_estudiantes = rutas_parquet(ruta_excel)[0]
+    if not PARQUET_DISPONIBLE or not os.path.exists(ruta_estudiantes):
+        return False
+    if not os.path.exists(ruta_excel):
+        return True
+    try:
+        metadatos = pq.read_schema(ruta_estudiantes).metadata or {}
+    except Exception:
+        return False
+    if metadatos.get(b'excel_tamano') != str(os.path.getsize(ruta_excel)).encode('ascii'):
+        return False
+    return metadatos.get(b'excel_sha256') == hash_archivo(ruta_excel).encode('ascii')
+
+
+def existen_resultados(ruta_excel):
+    """True si hay datos para este Excel: el Excel o su Parquet"""
+    return os.path.exists(ruta_excel) or (PARQUET_DISPONIBLE and os.path.exists(rutas_parquet(ruta_excel)[0]))
+
+
+def convertir_a_parquet(ruta_excel):
+    """
+    Lee el Excel y escribe sus Parquet
+
+    Returns:
+        dict: El libro leído (como leer_excel)
+    """
+    libro = leer_excel(ruta_excel)
+    guardar_parquet(libro, ruta_excel)
+    return libro
+
+
+def cargar_resultados(ruta_excel):
+    """
+    Tablas de resultados para los dashboards
+
+    Usa el Parquet si está vigente; si no, lee el Excel y deja el Parquet
+    escrito para la próxima vez (si no se puede escribir, solo avisa).
+
+    Returns:
+        dict con 'estudiantes' y 'resumen' (como leer_excel)
+    """
+    if parquet_vigente(ruta_excel):
+        try:
+            return leer_parquet(ruta_excel)
+        except Exception as e:
+            print(f'⚠️  No se pudo leer el Parquet de {ruta_excel}, se lee el Excel: {e}')
+
+    libro = leer_excel(ruta_excel)
+    if PARQUET_DISPONIBLE:
+        try:
+            guardar_parquet(libro, ruta_excel)
+        except Exception as e:
+            print(f'⚠️  No se pudo guardar el Parquet de {ruta_excel}: {e}')
+    return libro
+
+
+def exportar_excel(libro, ruta_excel):
+    """
+    Escribe el Excel de resultados: estudiantes, una fila vacía y el resumen
+
+    Las filas de resumen llevan su rótulo ('Promedio 2025', 'Avance') en
+    'Primer Apellido', así que separar_resumen las reconoce al volver a leerlo.
+
+    Returns:
+        int: Número de estudiantes exportados
+    """
+    estudiantes = libro['estudiantes'][COLUMNAS_CANONICAS].copy()
+    # En el Excel el documento va como número, igual que en los archivos originales
+    estudiantes['Número de documento'] = estudiantes['Número de documento'].map(documento_para_excel).astype(object)
+    partes = [estudiantes]
+    if libro['resumen'] is not None:
+        resumen = libro['resumen'].copy()
+        resumen['Primer Apellido'] = [fila if fila == 'Avance' else f'Promedio {fila}' for fila in resumen.index]
+        partes += [pd.DataFrame([{}], columns=COLUMNAS_CANONICAS), resumen.reset_index(drop=True)]
+    pd.concat(partes, ignore_index=True)[COLUMNAS_CANONICAS].to_excel(ruta_excel, index=False)
+    return len(estudiantes)
@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sitio local que simula el portal de resultados ICFES Saber 11.
+
+Reproduce el flujo completo que usan los scripts de automatización, sin red:
+- Formulario con ng-select de tipo de documento, campos identificacion /
+  numeroRegistro y botón "Ingresar" con un reto configurable
+- Página de resultados (tras un POST y una redirección 303, es decir, una
+  página nueva) con "Imprimir PDF", el puntaje global y el de cada área
+  (llegan de /api/resultados) y enlaces a las vistas de detalle de cada área
+- Menú desplegable del usuario con la opción "Salir"
+
+Permite configurar la latencia y la inyección de fallos para medir
+estudiantes por minuto y detectar regresiones del descargador y del
+extractor web.
+
+Uso:
+    python sitio_simulado_icfes.py --puerto 8765 --latencia-ms 150 --reto casilla
+    ICFES_URL=http://127.0.0.1:8765/ python 12-descargar_resultados_icfes.py
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+AREAS = ['Lectura Crítica', 'Matemáticas', 'Sociales y Ciudadanas', 'Ciencias Naturales', 'Inglés']
+
+TIPOS_DOCUMENTO = [
+    'TARJETA DE IDENTIDAD',
+    'CÉDULA DE CIUDADANÍA',
+    'CÉDULA DE EXTRANJERÍA',
+    'CONTRASEÑA REGISTRADURÍA',
+    'PASAPORTE COLOMBIANO',
+    'PASAPORTE EXTRANJERO',
+    'PERMISO ESPECIAL DE PERMANENCIA',
+    'NÚMERO ÚNICO DE IDENTIFICACIÓN PERSONAL',
+    'REGISTRO CIVIL DE NACIMIENTO',
+]
+
+RETOS = ('ninguno', 'casilla', 'suma')
+
+
+def slug_area(area):
+    """Convierte el nombre de un área en un segmento de URL"""
+    reemplazos = str.maketrans('áéíóúñ', 'aeioun')
+    return area.lower().translate(reemplazos).replace(' ', '-')
+
+
+AREAS_POR_SLUG = {slug_area(area): area for area in AREAS}
+
+
+def calcular_puntaje_global(puntajes_areas):
+    """Puntaje global ICFES: promedio ponderado (peso 3 las cuatro primeras, 1 inglés) x 5"""
+    ponderado = sum(3 * puntajes_areas[area] for area in AREAS[:4]) + puntajes_areas['Inglés']
+    return int(round(ponderado / 13 * 5))
+
+
+def puntajes_simulados(documento):
+    """Genera puntajes deterministas a partir del número de documento"""
+    semilla = int(hashlib.sha256(str(documento).encode('utf-8')).hexdigest()[:12], 16)
+    generador = random.Random(semilla)
+    puntajes = {area: max(20, min(100, int(generador.gauss(52, 12)))) for area in AREAS}
+    puntajes['Puntaje Global'] = calcular_puntaje_global(puntajes)
+    return puntajes
+
+
+def _texto_pdf(texto):
+    """Escapa un texto para un literal de cadena PDF en WinAnsiEncoding"""
+    datos = texto.encode('cp1252', errors='replace')
+    return datos.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def generar_pdf_resultados(nombre, documento, puntajes):
+    """
+    Genera un PDF de una página con capa de texto, similar al reporte oficial
+
+    Returns:
+        bytes: Contenido del PDF
+    """
+    lineas = [
+        (16, 'Resultados del Examen Saber 11'),
+        (11, f'{nombre} - Documento {documento}'),
+        (11, 'Reporte general'),
+        (14, f'Puntaje global {puntajes["Puntaje Global"]}/500'),
+        (12, 'Puntaje por pruebas'),
+    ]
+    lineas += [(11, f'{area} {puntajes[area]}/100') for area in AREAS]
+
+    contenido = b'BT\n'
+    y = 780
+    for tamano, texto in lineas:
+        contenido += b'/F1 %d Tf 1 0 0 1 56 %d Tm (%s) Tj\n' % (tamano, y, _texto_pdf(texto))
+        y -= tamano + 14
+    contenido += b'ET\n'
+
+    objetos = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+        b'/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Length %d >>\nstream\n%sendstream' % (len(contenido), contenido),
+    ]
+
+    pdf = b'%PDF-1.4\n'
+    posiciones = []
+    for numero, objeto in enumerate(objetos, 1):
+        posiciones.append(len(pdf))
+        pdf += b'%d 0 obj\n%s\nendobj\n' % (numero, objeto)
+
+    inicio_xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1)
+    for posicion in posiciones:
+        pdf += b'%010d 00000 n \n' % posicion
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+        len(objetos) + 1, inicio_xref)
+    return pdf
+
+
+class ConfiguracionSitio:
+    """Parámetros de comportamiento del sitio simulado"""
+
+    def __init__(self, latencia_ms=0, variacion_ms=0, reto='ninguno', tasa_fallos=0.0,
+                 tasa_sin_resultados=0.0, semilla=None):
+        """
+        Args:
+            latencia_ms: Latencia base de cada respuesta del servidor
+            variacion_ms: Variación aleatoria (+/-) sobre la latencia base
+            reto: 'ninguno', 'casilla' (No soy un robot) o 'suma' (aritmética)
+            tasa_fallos: Probabilidad de responder 503 a una petición
+            tasa_sin_resultados: Probabilidad de que un login no tenga resultados
+            semilla: Semilla del generador aleatorio (reproducibilidad)
+        """
+        if reto not in RETOS:
+            raise ValueError(f'Reto desconocido: {reto} (opciones: {", ".join(RETOS)})')
+        self.latencia_ms = latencia_ms
+        self.variacion_ms = variacion_ms
+        self.reto = reto
+        self.tasa_fallos = tasa_fallos
+        self.tasa_sin_resultados = tasa_sin_resultados
+        self.aleatorio = random.Random(semilla)
+        self.sesiones = {}
+        self.candado = threading.Lock()
+        self.contadores = {'peticiones': 0, 'logins': 0, 'pdfs': 0, 'fallos': 0}
+
+    def sortear(self, probabilidad):
+        with self.candado:
+            return self.aleatorio.random() < probabilidad
+
+    def contar(self, clave):
+        with self.candado:
+            self.contadores[clave] += 1
+
+
+ESTILOS = """
+body { font-family: sans-serif; margin: 2rem; }
+ng-select { display: block; position: relative; width: 24rem; border: 1px solid #999; cursor: pointer; }
+.ng-select-container { padding: .4rem; min-height: 1.2rem; }
+.ng-dropdown-panel { position: absolute; left: 0; right: 0; background: #fff; border: 1px solid #999; z-index: 10; }
+.ng-option { padding: .3rem; } .ng-option:hover { background: #def; }
+.dropdown-menu { display: none; border: 1px solid #999; padding: .5rem; }
+.dropdown-menu.show { display: block; }
+input { text-transform: uppercase; }
+"""
+
+# Simula las "testabilities" de Angular: estable cuando no hay tareas pendientes
+JS_BASE = """
+window.__pendientes = 0;
+window.getAllAngularTestabilities = function () {
+  return [{ isStable: function () { return window.__pendientes === 0; } }];
+};
+function tareaDiferida(fn, ms) {
+  window.__pendientes++;
+  setTimeout(function () { try { fn(); } finally { window.__pendientes--; } }, ms);
+}
+"""
+
+JS_LOGIN = """
+var opciones = %(opciones)s;
+var ngSelect = document.querySelector('ng-select');
+var contenedorValor = ngSelect.querySelector('.ng-value-container');
+ngSelect.addEventListener('click', function (evento) {
+  if (evento.target.classList.contains('ng-option')) { return; }
+  var panel = ngSelect.querySelector('.ng-dropdown-panel');
+  if (panel) { panel.remove(); return; }
+  tareaDiferida(function () {
+    var nuevo = document.createElement('div');
+    nuevo.className = 'ng-dropdown-panel';
+    opciones.forEach(function (texto) {
+      var opcion = document.createElement('div');
+      opcion.className = 'ng-option';
+      opcion.textContent = texto;
+      opcion.addEventListener('click', function () {
+        contenedorValor.innerHTML = '<div class="ng-value"><span class="ng-value-label"></span></div>';
+        contenedorValor.querySelector('.ng-value-label').textContent = texto;
+        document.getElementById('tipoDocumento').value = texto;
+        nuevo.remove();
+      });
+      nuevo.appendChild(opcion);
+    });
+    ngSelect.appendChild(nuevo);
+  }, %(retardo)d);
+});
+"""
+
+JS_RESULTADOS = """
+window.__pendientes++;
+fetch('/api/resultados', { credentials: 'same-origin' })
+  .then(function (respuesta) { return respuesta.json(); })
+  .then(function (datos) {
+    document.getElementById('nombre-usuario').textContent = datos.nombre;
+    document.getElementById('puntaje-global').textContent = datos.puntajes['Puntaje Global'] + '/500';
+    document.querySelectorAll('.puntaje-area').forEach(function (elemento) {
+      elemento.textContent = datos.puntajes[elemento.dataset.area] + '/100';
+    });
+  })
+  .finally(function () { window.__pendientes--; });
+document.querySelector('button.dropdown-toggle').addEventListener('click', function () {
+  var menu = document.querySelector('.dropdown-menu');
+  tareaDiferida(function () { menu.classList.toggle('show'); }, %(retardo)d);
+});
+document.getElementById('imprimir-pdf').addEventListener('click', function () {
+  window.location.href = '/reporte.pdf';
+});
+"""
+
+
+def pagina(titulo, cuerpo, script=''):
+    """Arma un documento HTML completo"""
+    return f"""<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>{html.escape(titulo)}</title>
+<style>{ESTILOS}</style><script>{JS_BASE}</script></head>
+<body>{cuerpo}<script>{script}</script></body></html>"""
+
+
+class ManejadorSitio(BaseHTTPRequestHandler):
+    """Atiende las rutas del sitio simulado"""
+
+    configuracion = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, formato, *args):
+        pass
+
+    # Utilidades
+
+    def _simular_red(self):
+        """Aplica latencia y, según la tasa configurada, falla la petición"""
+        config = self.configuracion
+        config.contar('peticiones')
+        if config.latencia_ms or config.variacion_ms:
+            variacion = config.aleatorio.uniform(-config.variacion_ms, config.variacion_ms)
+            time.sleep(max(0.0, config.latencia_ms + variacion) / 1000)
+        if config.tasa_fallos and config.sortear(config.tasa_fallos):
+            config.contar('fallos')
+            self._responder(503, pagina('Servicio no disponible',
+                                        '<h1>Servicio temporalmente no disponible</h1>'))
+            return False
+        return True
+
+    def _responder(self, codigo, cuerpo, tipo='text/html; charset=utf-8', encabezados=None):
+        datos = cuerpo if isinstance(cuerpo, bytes) else cuerpo.encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(datos)))
+        self.send_header('Cache-Control', 'no-store')
+        for clave, valor in (encabezados or {}).items():
+            self.send_header(clave, valor)
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _redirigir(self, destino, encabezados=None):
+        encabezados = dict(encabezados or {})
+        encabezados['Location'] = destino
+        self._responder(303, b'', encabezados=encabezados)
+
+    def _sesion(self):
+        """Retorna los datos de la sesión activa (o None)"""
+        for galleta in self.headers.get('Cookie', '').split(';'):
+            clave, _, valor = galleta.strip().partition('=')
+            if clave == 'sesion':
+                with self.configuracion.candado:
+                    return self.configuracion.sesiones.get(valor)
+        return None
+
+    # Rutas
+
+    def do_GET(self):
+        if not self._simular_red():
+            return
+        ruta = urlparse(self.path).path
+
+        if ruta == '/':
+            self._pagina_login()
+        elif ruta == '/resultados':
+            self._pagina_resultados()
+        elif ruta == '/api/resultados':
+            self._api_resultados()
+        elif ruta.startswith('/area/'):
+            self._pagina_area(ruta[len('/area/'):])
+        elif ruta == '/reporte.pdf':
+            self._reporte_pdf()
+        elif ruta == '/salir':
+            self._salir()
+        else:
+            self._responder(404, pagina('No encontrado', '<h1>Página no encontrada</h1>'))
+
+    def do_POST(self):
+        if not self._simular_red():
+            return
+        if urlparse(self.path).path != '/ingresar':
+            self._responder(404, pagina('No encontrado', '<h1>Página no encontrada</h1>'))
+            return
+
+        longitud = int(self.headers.get('Content-Length', 0))
+        campos = parse_qs(self.rfile.read(longitud).decode('utf-8'))
+        valor = lambda clave: campos.get(clave, [''])[0].strip()
+        self._ingresar(valor('tipoDocumento'), valor('identificacion').upper(),
+                       valor('numeroRegistro').upper(), valor('reto'), valor('reto_esperado'))
+
+    def _pagina_login(self, mensaje=''):
+        config = self.configuracion
+        if config.reto == 'casilla':
+            reto = ('<label><input type="checkbox" id="reto-casilla" name="reto" value="ok"> '
+                    'No soy un robot</label><input type="hidden" name="reto_esperado" value="ok">')
+        elif config.reto == 'suma':
+            a, b = config.aleatorio.randint(1, 9), config.aleatorio.randint(1, 9)
+            reto = (f'<label>¿Cuánto es {a} + {b}? <input id="reto-respuesta" name="reto"></label>'
+                    f'<input type="hidden" name="reto_esperado" value="{a + b}">')
+        else:
+            reto = ''
+
+        aviso = f'<p class="alert alert-danger">{html.escape(mensaje)}</p>' if mensaje else ''
+        cuerpo = f"""
+<h1>Resultados Saber 11</h1>{aviso}
+<form method="post" action="/ingresar">
+  <p>Tipo de documento</p>
+  <ng-select formcontrolname="tipoDocumento" class="ng-select">
+    <div class="ng-select-container"><div class="ng-value-container">
+      <div class="ng-placeholder">Seleccione</div></div></div>
+  </ng-select>
+  <input type="hidden" id="tipoDocumento" name="tipoDocumento">
+  <p><label>Número de documento
+     <input id="identificacion" formcontrolname="numeroDocumento" name="identificacion" maxlength="20"></label></p>
+  <p><label>Número de registro
+     <input id="numeroRegistro" formcontrolname="numeroRegistro" name="numeroRegistro" maxlength="16"></label></p>
+  <div class="reto">{reto}</div>
+  <p><button type="submit" class="btn btn-primary">Ingresar</button></p>
+</form>"""
+        script = JS_LOGIN % {'opciones': json.dumps(TIPOS_DOCUMENTO),
+                             'retardo': config.latencia_ms // 4}
+        self._responder(200, pagina('Resultados Saber 11', cuerpo, script))
+
+    def _ingresar(self, tipo_documento, documento, registro, reto, reto_esperado):
+        config = self.configuracion
+        if tipo_documento not in TIPOS_DOCUMENTO or not documento:
+            self._pagina_login('Seleccione el tipo de documento e ingrese el número de documento')
+            return
+        if config.reto != 'ninguno' and (not reto or reto != reto_esperado):
+            self._pagina_login('Verificación fallida: resuelva el reto antes de ingresar')
+            return
+
+        config.contar('logins')
+        if config.tasa_sin_resultados and config.sortear(config.tasa_sin_resultados):
+            self._pagina_login('No se encontraron resultados para los datos ingresados')
+            return
+
+        token = secrets.token_hex(16)
+        with config.candado:
+            config.sesiones[token] = {
+                'documento': documento,
+                'registro': registro,
+                'tipo_documento': tipo_documento,
+                'nombre': f'ESTUDIANTE {documento}',
+                'puntajes': puntajes_simulados(documento),
+            }
+        self._redirigir('/resultados', {'Set-Cookie': f'sesion={token}; Path=/; HttpOnly'})
+
+    def _pagina_resultados(self):
+        sesion = self._sesion()
+        if sesion is None:
+            self._redirigir('/')
+            return
+
+        enlaces = ''.join(
+            f'<li><a class="prueba" href="/area/{slug_area(area)}">{html.escape(area)}</a> '
+            f'<span class="puntaje-area" data-area="{html.escape(area)}"></span></li>'
+            for area in AREAS
+        )
+        cuerpo = f"""
+<nav>
+  <button class="btn dropdown-toggle" type="button"><span id="nombre-usuario"></span></button>
+  <div class="dropdown-menu"><a class="dropdown-item" href="/salir">Salir</a></div>
+</nav>
+<h1>Resultados del Examen Saber 11</h1>
+<p>Reporte general <button id="imprimir-pdf" type="button">Imprimir PDF</button></p>
+<p>Puntaje global <strong id="puntaje-global"></strong></p>
+<h2>Puntaje por pruebas</h2>
+<ul class="pruebas">{enlaces}</ul>
+<p>Conoce a detalle tus resultados. Da clic sobre una de las pruebas.</p>"""
+        script = JS_RESULTADOS % {'retardo': self.configuracion.latencia_ms // 4}
+        self._responder(200, pagina('Resultados', cuerpo, script))
+
+    def _api_resultados(self):
+        sesion = self._sesion()
+        if sesion is None:
+            self._responder(401, json.dumps({'error': 'sesión no válida'}), 'application/json')
+            return
+        datos = {'nombre': sesion['nombre'], 'documento': sesion['documento'],
+                 'puntajes': sesion['puntajes']}
+        self._responder(200, json.dumps(datos, ensure_ascii=False), 'application/json; charset=utf-8')
+
+    def _pagina_area(self, slug):
+        sesion = self._sesion()
+        area = AREAS_POR_SLUG.get(slug)
+        if sesion is None:
+            self._redirigir('/')
+            return
+        if area is None:
+            self._responder(404, pagina('No encontrado', '<h1>Prueba no encontrada</h1>'))
+            return
+
+        puntaje = sesion['puntajes'][area]
+        cuerpo = f"""
+<h1>{html.escape(area)}</h1>
+<p class="puntaje-prueba">Tu puntaje {puntaje}/100</p>
+<p><a href="/resultados">Volver al reporte general</a></p>"""
+        self._responder(200, pagina(area, cuerpo))
+
+    def _reporte_pdf(self):
+        sesion = self._sesion()
+        if sesion is None:
+            self._redirigir('/')
+            return
+
+        self.configuracion.contar('pdfs')
+        contenido = generar_pdf_resultados(sesion['nombre'], sesion['documento'], sesion['puntajes'])
+        self._responder(200, contenido, 'application/pdf', {
+            'Content-Disposition': f'attachment; filename="resultados_{sesion["documento"]}.pdf"'
+        })
+
+    def _salir(self):
+        for galleta in self.headers.get('Cookie', '').split(';'):
+            clave, _, valor = galleta.strip().partition('=')
+            if clave == 'sesion':
+                with self.configuracion.candado:
+                    self.configuracion.sesiones.pop(valor, None)
+        self._redirigir('/', {'Set-Cookie': 'sesion=; Path=/; Max-Age=0'})
+
+
+def crear_servidor(configuracion, host='127.0.0.1', puerto=0):
+    """
+    Crea el servidor HTTP del sitio simulado (puerto 0 = uno libre)
+
+    Returns:
+        ThreadingHTTPServer listo para serve_forever()
+    """
+    manejador = type('ManejadorConfigurado', (ManejadorSitio,), {'configuracion': configuracion})
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def iniciar_en_segundo_plano(configuracion=None, host='127.0.0.1', puerto=0):
+    """
+    Arranca el sitio simulado en un hilo
+
+    Returns:
+        tuple: (servidor, url_base). Llamar servidor.shutdown() al terminar.
+    """
+    servidor = crear_servidor(configuracion or ConfiguracionSitio(), host, puerto)
+    hilo = threading.Thread(target=servidor.serve_forever, name='sitio-simulado', daemon=True)
+    hilo.start()
+    return servidor, f'http://{host}:{servidor.server_address[1]}/'
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Sitio local que simula el portal de resultados ICFES')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--latencia-ms', type=int, default=0, help='Latencia base por petición')
+    parser.add_argument('--variacion-ms', type=int, default=0, help='Variación aleatoria de la latencia')
+    parser.add_argument('--reto', choices=RETOS, default='casilla', help='Reto antes de "Ingresar"')
+    parser.add_argument('--tasa-fallos', type=float, default=0.0, help='Probabilidad de responder 503')
+    parser.add_argument('--tasa-sin-resultados', type=float, default=0.0,
+                        help='Probabilidad de que un login no tenga resultados')
+    parser.add_argument('--semilla', type=int, default=None)
+    args = parser.parse_args()
+
+    configuracion = ConfiguracionSitio(args.latencia_ms, args.variacion_ms, args.reto,
+                                       args.tasa_fallos, args.tasa_sin_resultados, args.semilla)
+    servidor = crear_servidor(configuracion, args.host, args.puerto)
+    url = f'http://{args.host}:{servidor.server_address[1]}/'
+
+    print('='*80)
+    print('🧪 SITIO SIMULADO DEL PORTAL ICFES')
+    print('='*80)
+    print(f'🌐 URL: {url}')
+    print(f'⏱️  Latencia: {args.latencia_ms} ± {args.variacion_ms} ms')
+    print(f'🧩 Reto: {args.reto}')
+    print(f'💥 Tasa de fallos: {args.tasa_fallos:.0%}  |  Sin resultados: {args.tasa_sin_resultados:.0%}')
+    print(f'\n👉 Ejecuta los scripts con: ICFES_URL={url}')
+    print('   Ctrl+C para detener')
+
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        print(f'\n📊 Contadores: {configuracion.contadores}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Telemetría por fases del descargador de resultados ICFES.
+
+Cada estudiante se mide con un reloj monotónico fase por fase (navegar,
+llenar formulario, esperar CAPTCHA, ingresar, descargar PDF, cerrar sesión)
+y al terminar se escribe un evento JSONL con sus tiempos. El resumen muestra
+p50/p95/máximo por fase y cuánto del tiempo fue automatización, espera del
+operador o tiempo inactivo entre fases.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Orden en que se muestran las fases del flujo de un estudiante
+FASES = ('navegar_a_login', 'llenar_formulario', 'esperar_captcha',
+         'hacer_clic_ingresar', 'descargar_pdf', 'hacer_logout')
+
+# Fases en las que el tiempo corre mientras se espera a una persona
+FASES_HUMANAS = ('esperar_captcha',)
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) con interpolación lineal; None si no hay valores"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    fraccion = posicion - inferior
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * fraccion
+
+
+class MedicionEstudiante:
+    """Tiempos de las fases de un solo estudiante"""
+
+    def __init__(self, documento, nombre, ventana=None):
+        self.documento = documento
+        self.nombre = nombre
+        self.ventana = ventana
+        self.inicio = time.monotonic()
+        self.fin = None
+        self.fases = {}
+
+    @contextmanager
+    def fase(self, nombre):
+        """Mide la duración de una fase (se acumula si la fase se repite)"""
+        inicio = time.monotonic()
+        try:
+            yield
+        finally:
+            self.fases[nombre] = self.fases.get(nombre, 0.0) + time.monotonic() - inicio
+
+    def evento(self, estado, error=None):
+        """
+        Cierra la medición y la convierte en un evento serializable
+
+        Returns:
+            dict con la duración total, las fases y el tiempo inactivo
+        """
+        if self.fin is None:
+            self.fin = time.monotonic()
+        duracion = self.fin - self.inicio
+        evento = {
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'documento': self.documento,
+            'nombre': self.nombre,
+            'estado': estado,
+            'duracion': round(duracion, 4),
+            'fases': {fase: round(segundos, 4) for fase, segundos in self.fases.items()},
+            'inactivo': round(max(0.0, duracion - sum(self.fases.values())), 4),
+        }
+        if self.ventana is not None:
+            evento['ventana'] = self.ventana
+        if error:
+            evento['error'] = error
+        return evento
+
+
+class Telemetria:
+    """Registro de eventos por estudiante compartido por todas las ventanas de una ejecución"""
+
+    def __init__(self, ruta_eventos=None):
+        """
+        Args:
+            ruta_eventos: Archivo .jsonl donde se anexa un evento por estudiante
+                          (None = solo en memoria)
+        """
+        self.ruta_eventos = ruta_eventos
+        self.eventos = []
+        self.inicio = time.monotonic()
+        self._candado = threading.Lock()
+        if ruta_eventos:
+            carpeta = os.path.dirname(ruta_eventos)
+            if carpeta:
+                os.makedirs(carpeta, exist_ok=True)
+
+    def iniciar_estudiante(self, documento, nombre, ventana=None):
+        """Empieza la medición de un estudiante"""
+        return MedicionEstudiante(documento, nombre, ventana)
+
+    def finalizar_estudiante(self, medicion, estado, error=None):
+        """
+        Registra el evento del estudiante y lo anexa al archivo JSONL
+
+        Args:
+            medicion: MedicionEstudiante retornada por iniciar_estudiante
+            estado: Estado final del estudiante (exitoso, sin_resultados, error)
+            error: Mensaje de error (solo errores)
+        """
+        evento = medicion.evento(estado, error)
+        with self._candado:
+            self.eventos.append(evento)
+            if self.ruta_eventos:
+                try:
+                    with open(self.ruta_eventos, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(evento, ensure_ascii=False) + '\n')
+                except OSError as e:
+                    print(f'   ⚠️  No se pudo escribir la telemetría de {medicion.documento}: {e}')
+        return evento
+
+    def resumen(self):
+        """
+        Calcula percentiles por fase y el reparto del tiempo de la ejecución
+
+        Returns:
+            dict con 'fases' ({fase: {n, total, p50, p95, max}}) y el reparto
+            entre automatización, operador e inactividad
+        """
+        with self._candado:
+            eventos = list(self.eventos)
+
+        tiempos = {}
+        for evento in eventos:
+            for fase, segundos in evento['fases'].items():
+                tiempos.setdefault(fase, []).append(segundos)
+
+        orden = list(FASES) + sorted(fase for fase in tiempos if fase not in FASES)
+        fases = {
+            fase: {
+                'n': len(tiempos[fase]),
+                'total': sum(tiempos[fase]),
+                'p50': percentil(tiempos[fase], 50),
+                'p95': percentil(tiempos[fase], 95),
+                'max': max(tiempos[fase]),
+            }
+            for fase in orden if fase in tiempos
+        }
+
+        humano = sum(datos['total'] for fase, datos in fases.items() if fase in FASES_HUMANAS)
+        automatizado = sum(datos['total'] for fase, datos in fases.items() if fase not in FASES_HUMANAS)
+        inactivo = sum(evento['inactivo'] for evento in eventos)
+        tiempo_ejecucion = time.monotonic() - self.inicio
+
+        return {
+            'estudiantes': len(eventos),
+            'tiempo_ejecucion': tiempo_ejecucion,
+            'estudiantes_por_minuto': len(eventos) / tiempo_ejecucion * 60 if tiempo_ejecucion else 0,
+            'fases': fases,
+            'humano': humano,
+            'automatizado': automatizado,
+            'inactivo': inactivo,
+        }
+
+    def guardar_resumen(self, ruta):
+        """Guarda el resumen en JSON"""
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(self.resumen(), f, ensure_ascii=False, indent=2)
+
+    def mostrar_resumen(self):
+        """Imprime la tabla de fases y el reparto del tiempo"""
+        resumen = self.resumen()
+        if not resumen['estudiantes']:
+            return
+
+        print('\n⏱️  TIEMPO POR FASE')
+        print('-'*80)
+        print(f'   {"Fase":<22}{"n":>6}{"p50 (s)":>11}{"p95 (s)":>11}{"máx (s)":>11}{"total (s)":>12}')
+        for fase, datos in resumen['fases'].items():
+            print(f'   {fase:<22}{datos["n"]:>6}{datos["p50"]:>11.2f}{datos["p95"]:>11.2f}'
+                  f'{datos["max"]:>11.2f}{datos["total"]:>12.1f}')
+
+        medido = resumen['humano'] + resumen['automatizado'] + resumen['inactivo']
+        if medido:
+            print('-'*80)
+            print(f'   Esperando al operador: {resumen["humano"] / medido:6.1%}')
+            print(f'   Automatización:        {resumen["automatizado"] / medido:6.1%}')
+            print(f'   Inactivo entre fases:  {resumen["inactivo"] / medido:6.1%}')
+        print(f'   Estudiantes/minuto:    {resumen["estudiantes_por_minuto"]:6.2f}')